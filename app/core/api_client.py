@@ -0,0 +1,74 @@
+
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from app.core.search.models import SearchEvidence, SearchResult, Suggestion
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+
+class ApiClientError(RuntimeError):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class ApiClient:
+    """
+    Client for app.core.api_server. Returns the same models as SearchService.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_URL, timeout: float = 10.0, session: Optional[requests.Session] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, body: Optional[Dict[str, Any]] = None):
+        resp = self.session.request(method, f"{self.base_url}{path}", params=params, json=body, timeout=self.timeout)
+        try:
+            payload = resp.json()
+        except ValueError:
+            payload = {"error": resp.text}
+        if resp.status_code >= 400:
+            raise ApiClientError(resp.status_code, payload.get("error", resp.reason))
+        return payload
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, mode: str = "lexical",
+               filters: Optional[Dict[str, Any]] = None, collapse: bool = False) -> SearchResult:
+        params = {"q": query, "limit": limit, "offset": offset, "mode": mode, **{k: v for k, v in (filters or {}).items() if v}}
+        if collapse:
+            params["collapse"] = "1"
+        payload = self._request("GET", "/search", params)
+        items = []
+        for item in payload["items"]:
+            item["match_offsets"] = [tuple(o) for o in item.get("match_offsets", [])]
+            items.append(SearchEvidence(**item))
+        return SearchResult(items=items, facets=payload.get("facets") or {}, total=payload.get("total") or len(items))
+
+    def suggest(self, text: str, limit: int = 10) -> List[Suggestion]:
+        payload = self._request("GET", "/suggest", {"q": text, "limit": limit})
+        return [Suggestion(**s) for s in payload["suggestions"]]
+
+    def status(self) -> Dict[str, Any]:
+        return self._request("GET", "/status")
+
+    def enqueue_index(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queues a file or directory (default: the server's ingest_dir). Returns the job.
+        """
+        return self._request("POST", "/index", body={"path": path} if path else {})
+
+    def job(self, job_id: int) -> Dict[str, Any]:
+        return self._request("GET", f"/index/{job_id}")
+
+    def wait_for_job(self, job_id: int, timeout: float = 300.0, poll: float = 0.2) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.job(job_id)
+            if job["status"] in ("done", "failed"):
+                return job
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Index job {job_id} still {job['status']} after {timeout}s")
+            time.sleep(poll)
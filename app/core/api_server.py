@@ -0,0 +1,367 @@
+
+import argparse
+import datetime
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.core.profiling import INDEXING_HOT_PATHS, SEARCH_HOT_PATHS, Profiler
+from app.core.search.service import SearchService
+
+# Local JSON API over one long-lived, warm repo (pooled connections, result/suggestion caches):
+#
+#   python -m app.core.api_server --port 8765
+#   curl 'http://127.0.0.1:8765/search?q=relief+valve&ext=.pdf'
+#   curl -X POST http://127.0.0.1:8765/index -H 'Content-Type: application/json' -d '{"path": "ingest/new.pdf"}'
+#
+# Endpoints: GET /health, /search, /suggest, /status, /index/<job_id>; POST /index
+# (JSON body, Content-Type: application/json; paths must be inside paths.ingest_dir).
+
+DEFAULT_HOST = "127.0.0.1" # Local only: there is no authentication
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+MAX_LIMIT = 200
+MAX_BODY_BYTES = 64 * 1024
+JOB_HISTORY = 100 # Finished index jobs kept for /index/<job_id>
+FILTER_KEYS = ("ext", "status", "year", "month", "folder")
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class IndexQueue:
+    """
+    Serialises index requests on one writer thread (SQLite allows one writer anyway).
+    A job indexes a directory (index_all) or a single file (index_file).
+    """
+
+    def __init__(self, indexer: IndexingService):
+        self.indexer = indexer
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._jobs: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._thread = threading.Thread(target=self._run, name="api-indexer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, path: str) -> Dict[str, Any]:
+        job = {"id": next(self._ids), "path": path, "status": "queued", "result": None, "error": None,
+               "queued_at": datetime.datetime.now().isoformat(), "finished_at": None}
+        with self._lock:
+            self._jobs[job["id"]] = job
+            finished = [j for j in self._jobs.values() if j["finished_at"]]
+            for old in finished[:max(0, len(finished) - JOB_HISTORY)]:
+                del self._jobs[old["id"]]
+        self._queue.put(job)
+        return dict(job)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            self._update(job, status="running")
+            try:
+                if os.path.isdir(job["path"]):
+                    result = self.indexer.index_all(job["path"])
+                else:
+                    status = self.indexer.index_file(job["path"])
+                    self.indexer.maybe_rebuild_ann_index()
+                    self.indexer.evaluate_standing_queries()
+                    result = {status: 1}
+                self._update(job, status="done", result=result)
+            except Exception as e:
+                logger.exception(f"Index job {job['id']} failed: {job['path']}")
+                self._update(job, status="failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def _update(self, job: Dict[str, Any], **changes):
+        with self._lock:
+            job.update(changes)
+            if changes.get("status") in ("done", "failed"):
+                job["finished_at"] = datetime.datetime.now().isoformat()
+
+    def join(self):
+        """
+        Blocks until every queued job has run.
+        """
+        self._queue.join()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class SearchApi:
+    """
+    Routes (method, path, params, body) to the services; HTTP-free so it can be tested directly.
+    Returns (status, JSON-serialisable payload); raises ApiError for client errors.
+    """
+
+    def __init__(self, repo: ArtifactsRepo, indexer: IndexingService, ingest_dir: Optional[str] = None):
+        self.repo = repo
+        self.search_service = SearchService(repo)
+        self.index_queue = IndexQueue(indexer)
+        self.ingest_dir = ingest_dir
+        self.started_at = datetime.datetime.now().isoformat()
+
+    def handle(self, method: str, path: str, params: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        route = path.rstrip("/") or "/"
+        if method == "GET":
+            if route == "/health":
+                return 200, {"ok": True}
+            if route == "/search":
+                return 200, self.search(params)
+            if route == "/suggest":
+                return 200, self.suggest(params)
+            if route == "/status":
+                return 200, self.status()
+            if route.startswith("/index/"):
+                return 200, self.job(route[len("/index/"):])
+        elif method == "POST" and route == "/index":
+            return 202, self.enqueue_index(body)
+        raise ApiError(404, f"No route: {method} {path}")
+
+    def search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        query = params.get("q", "")
+        limit = min(_int_param(params, "limit", 20), MAX_LIMIT)
+        offset = _int_param(params, "offset", 0)
+        mode = params.get("mode", "lexical")
+        collapse = params.get("collapse", "").lower() in ("1", "true", "yes")
+        filters = {k: params[k] for k in FILTER_KEYS if params.get(k)}
+
+        try:
+            if mode == "lexical":
+                result = self.search_service.search_with_facets(query, limit=limit, offset=offset, filters=filters,
+                                                                root=self.ingest_dir, collapse=collapse)
+                items, facets, total = result.items, result.facets, result.total
+            else:
+                items = self.search_service.search(query, limit=limit, offset=offset, mode=mode, collapse=collapse)
+                facets, total = {}, None
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return {"query": query, "mode": mode, "items": [asdict(ev) for ev in items], "facets": facets, "total": total}
+
+    def suggest(self, params: Dict[str, str]) -> Dict[str, Any]:
+        limit = min(_int_param(params, "limit", 10), MAX_LIMIT)
+        return {"suggestions": [asdict(s) for s in self.search_service.suggest(params.get("q", ""), limit=limit)]}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "db_path": str(self.repo.db_path),
+            "generation": self.repo.get_generation(),
+            "fts_enabled": self.repo.fts_enabled,
+            "artifacts": self.repo.count_by_status(),
+            "index_jobs": self.index_queue.stats(),
+            "ingest_dir": self.ingest_dir,
+            "started_at": self.started_at,
+        }
+
+    def enqueue_index(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queues path (default: ingest_dir). Only paths inside ingest_dir are accepted, after
+        resolving symlinks and "..": anything else would end up in the searchable DB.
+        """
+        if not self.ingest_dir:
+            raise ApiError(403, "Indexing over the API needs paths.ingest_dir configured")
+        path = body.get("path") or self.ingest_dir
+        if not isinstance(path, str):
+            raise ApiError(400, "path must be a string")
+        root = os.path.realpath(self.ingest_dir)
+        real = os.path.realpath(path)
+        if os.path.commonpath([root, real]) != root:
+            raise ApiError(403, f"Path is outside the ingest directory: {path}")
+        if not os.path.exists(real):
+            raise ApiError(400, f"Path not found: {path}")
+        return self.index_queue.enqueue(real)
+
+    def job(self, job_id: str) -> Dict[str, Any]:
+        job = self.index_queue.get(int(job_id)) if job_id.isdigit() else None
+        if job is None:
+            raise ApiError(404, f"Unknown index job: {job_id}")
+        return job
+
+    def close(self):
+        self.index_queue.stop()
+        self.search_service.close()
+        self.repo.close()
+
+
+def _int_param(params: Dict[str, str], name: str, default: int) -> int:
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+    if value < 0:
+        raise ApiError(400, f"{name} must be >= 0")
+    return value
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ProjectCopilotAPI/1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            body = self._read_body() if method == "POST" else {}
+            status, payload = self.server.api.handle(method, url.path, params, body)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            logger.exception(f"API error on {method} {self.path}")
+            status, payload = 500, {"error": str(e)}
+        self._send_json(status, payload)
+
+    def _read_body(self) -> Dict[str, Any]:
+        # Browsers can't send application/json cross-origin without a CORS preflight (which we never
+        # answer), so this keeps arbitrary web pages from POSTing text/plain "simple requests"
+        if self.headers.get_content_type() != "application/json":
+            raise ApiError(415, "Content-Type must be application/json")
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length).decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            raise ApiError(400, "Body must be JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        return body
+
+    def _send_json(self, status: int, payload: Any):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class ApiServer(HTTPServer):
+    """
+    HTTPServer whose requests run on a fixed worker pool (ThreadingHTTPServer spawns a
+    thread per request). Each worker keeps its own pooled repo connection.
+    """
+
+    def __init__(self, api: SearchApi, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS):
+        super().__init__((host, port), ApiRequestHandler)
+        self.api = api
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def process_request(self, request, client_address):
+        self._workers.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._workers.shutdown(wait=True)
+        self.api.close()
+
+
+def create_server(db_path: str, config: Optional[Dict[str, Any]] = None, host: str = DEFAULT_HOST,
+                  port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS) -> ApiServer:
+    """
+    Builds the server around one pooled repo. port=0 picks a free port (see server.url).
+    config: app config data (features, paths.ingest_dir, optional profiling section).
+    """
+    config = config or {}
+    repo = ArtifactsRepo(db_path, pooled=True)
+    indexer = IndexingService(repo, config.get("features", {}))
+    api = SearchApi(repo, indexer, config.get("paths", {}).get("ingest_dir"))
+    profiler = Profiler.from_config(config)
+    if profiler:
+        profiler.instrument(indexer, INDEXING_HOT_PATHS)
+        profiler.instrument(api.search_service, SEARCH_HOT_PATHS)
+    return ApiServer(api, host, port, workers)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.db import migrator
+    from app.ui.config_loader import load_config
+
+    parser = argparse.ArgumentParser(description="Local JSON API for search, suggestions, status and indexing.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Request worker threads.")
+    parser.add_argument("--db", help="DB path (default: from the app config).")
+    parser.add_argument("--ingest-dir", help="Default directory for POST /index (default: from the app config).")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    app_config = load_config()
+    config = app_config.get("data", {})
+    db_path = args.db or app_config.get("db_path")
+    if not db_path:
+        logger.error(f"No DB configured: {app_config.get('error')}")
+        return 1
+    if args.ingest_dir:
+        config.setdefault("paths", {})["ingest_dir"] = args.ingest_dir
+
+    migrator.init_or_upgrade_db(Path(db_path), Path(__file__).resolve().parents[2] / "db" / "migrations")
+    server = create_server(db_path, config, args.host, args.port, args.workers)
+    logger.info(f"API listening on {server.url} (db: {db_path}, {args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
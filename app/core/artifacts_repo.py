@@ -1,35 +1,120 @@
 
+import re
+import json
 import sqlite3
 import datetime
 import logging
-from typing import Optional, Dict, List, Any
+import threading
+from typing import Optional, Dict, List, Any, Tuple
+
+from app.db.migrator import ensure_fts
+from app.core.search.models import FACET_NONE
+from app.core.search.query import compile_fts_query
 
 logger = logging.getLogger(__name__)
 
+POOLED_BUSY_TIMEOUT = 10.0 # Seconds a pooled connection waits on a writer lock
+
+# Sources inbox status, mirrors IndexingService.scan_workspace (0.1s mtime tolerance)
+_WORKSPACE_STATUS_SQL = """
+    CASE
+        WHEN a.id IS NULL THEN 'NEW'
+        WHEN abs(COALESCE(a.modified_at, 0) - w.modified_at) > 0.1 OR COALESCE(a.size_bytes, 0) != w.size_bytes THEN 'DIRTY'
+        ELSE upper(COALESCE(a.ingest_status, 'new'))
+    END
+"""
+
+WORKSPACE_SORTS = {
+    "name": "filename COLLATE NOCASE, path",
+    "modified": "modified_at DESC, path",
+    "size": "size_bytes DESC, path",
+    "status": "status, filename COLLATE NOCASE",
+}
+
+# Directory of a.path with its trailing separator (path minus the basename)
+_DIR_SQL = "rtrim(a.path, replace(replace(a.path, '\\', ''), '/', ''))"
+
+# Sentinels for FTS5 highlight(): private-use code points never produced by extractors
+HIGHLIGHT_OPEN = "\ue000"
+HIGHLIGHT_CLOSE = "\ue001"
+
+def _highlight_offsets(marked: str) -> List[Tuple[int, int]]:
+    """
+    Converts highlight() output into (start, end) offsets in the unmarked text.
+    """
+    offsets = []
+    pos = 0
+    start = None
+    for part in re.split(f"({HIGHLIGHT_OPEN}|{HIGHLIGHT_CLOSE})", marked):
+        if part == HIGHLIGHT_OPEN:
+            start = pos
+        elif part == HIGHLIGHT_CLOSE:
+            if start is not None:
+                offsets.append((start, pos))
+            start = None
+        else:
+            pos += len(part)
+    return offsets
+
 class ArtifactsRepo:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pooled: bool = False):
+        """
+        pooled: keep one connection per thread for the repo's lifetime instead of opening
+        one per call (long-lived processes such as the API server). Call close() when done.
+        """
         self.db_path = db_path
+        self.pooled = pooled
+        self._local = threading.local()
+        self._pool: Dict[int, sqlite3.Connection] = {} # Thread ident -> pooled connection
+        self._pool_lock = threading.Lock()
         self._fts_enabled = False
         self._check_and_init_fts()
 
     def _get_conn(self):
-        return sqlite3.connect(self.db_path)
+        if not self.pooled:
+            return sqlite3.connect(self.db_path)
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Used only by its own thread; check_same_thread=False lets close() run from any thread
+            conn = sqlite3.connect(self.db_path, timeout=POOLED_BUSY_TIMEOUT, check_same_thread=False)
+            self._local.conn = conn
+            with self._pool_lock:
+                self._pool[threading.get_ident()] = conn
+        # Some methods switch to sqlite3.Row; reset so every caller sees plain tuples
+        conn.row_factory = None
+        return conn
+
+    def close(self):
+        """
+        Closes pooled connections (no-op for per-call connections).
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, {}
+        for conn in pool.values():
+            conn.close()
+        self._local = threading.local()
+
+    def interrupt(self, thread_ident: int) -> bool:
+        """
+        Aborts the statement running on that thread's pooled connection (it raises
+        OperationalError 'interrupted'). Safe to call from any thread. False if there is none.
+        """
+        with self._pool_lock:
+            conn = self._pool.get(thread_ident)
+        if conn is None:
+            return False
+        conn.interrupt()
+        return True
 
     def _check_and_init_fts(self):
         """
-        Attempts to create FTS5 table. If fails, fallback to LIKE.
+        Attempts to create (or upgrade) the FTS5 table. If fails, fallback to LIKE.
         """
         try:
             with self._get_conn() as conn:
                 # Using ref_id to avoid potential naming collision/syntax issues with artifact_id
-                conn.execute("""
-                    CREATE VIRTUAL TABLE IF NOT EXISTS artifact_fts USING fts5(
-                        filename, 
-                        path, 
-                        text, 
-                        ref_id
-                    );
-                """)
+                ensure_fts(conn)
                 self._fts_enabled = True
         except sqlite3.OperationalError as e:
             logger.warning(f"FTS5 not available, falling back to LIKE: {e}")
@@ -56,7 +141,13 @@ class ArtifactsRepo:
                 ON CONFLICT(path) DO UPDATE SET
                     size_bytes=excluded.size_bytes,
                     modified_at=excluded.modified_at,
-                    sha256=COALESCE(excluded.sha256, artifacts.sha256),
+                    sha256=CASE
+                        WHEN excluded.sha256 IS NOT NULL THEN excluded.sha256
+                        -- A stored digest is only valid for the size/mtime it was computed on
+                        WHEN artifacts.size_bytes IS excluded.size_bytes
+                             AND abs(COALESCE(artifacts.modified_at, 0) - COALESCE(excluded.modified_at, 0)) <= 0.1
+                        THEN artifacts.sha256
+                    END,
                     updated_at=CURRENT_TIMESTAMP
                 RETURNING id;
             """, (
@@ -66,6 +157,52 @@ class ArtifactsRepo:
             row = cur.fetchone()
             return row[0]
 
+    def get_sha256(self, path: str, size_bytes: int, modified_at: float) -> Optional[str]:
+        """
+        Stored digest of path, only if it was computed on this size/mtime (0.1s tolerance).
+        """
+        with self._get_conn() as conn:
+            row = conn.execute("""
+                SELECT sha256 FROM artifacts
+                WHERE path = ? AND size_bytes = ? AND abs(modified_at - ?) <= 0.1
+            """, (path, size_bytes, modified_at)).fetchone()
+        return row[0] if row else None
+
+    def save_sha256(self, meta: Dict[str, Any], digest: str) -> bool:
+        """
+        Stores digest for the file described by meta (path, filename, ext, size_bytes, modified_at).
+        Ignored if the artifact row already describes another size/mtime. Returns True if stored.
+        """
+        with self._get_conn() as conn:
+            cur = conn.execute("""
+                INSERT INTO artifacts (path, filename, ext, size_bytes, modified_at, sha256, ingest_status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 'new', CURRENT_TIMESTAMP)
+                ON CONFLICT(path) DO UPDATE SET sha256 = excluded.sha256
+                WHERE artifacts.size_bytes = excluded.size_bytes
+                  AND abs(artifacts.modified_at - excluded.modified_at) <= 0.1
+            """, (meta["path"], meta["filename"], meta["ext"], meta["size_bytes"], meta["modified_at"], digest))
+            return cur.rowcount > 0
+
+    def iter_missing_sha256(self, batch: int = 500):
+        """
+        Yields paths of artifacts without a digest, in id order (keyset-paginated).
+        """
+        last_id = 0
+        while True:
+            with self._get_conn() as conn:
+                rows = conn.execute("""
+                    SELECT id, path FROM artifacts WHERE sha256 IS NULL AND id > ? ORDER BY id LIMIT ?
+                """, (last_id, batch)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for _, path in rows:
+                yield path
+
+    def count_missing_sha256(self) -> int:
+        with self._get_conn() as conn:
+            return conn.execute("SELECT COUNT(*) FROM artifacts WHERE sha256 IS NULL").fetchone()[0]
+
     def set_index_status(self, artifact_id: int, status: str, error: Optional[str] = None):
         with self._get_conn() as conn:
             conn.execute("""
@@ -73,6 +210,8 @@ class ArtifactsRepo:
                 SET ingest_status = ?, error = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             """, (status, error, artifact_id))
+            # Status facets are cached per generation
+            self._bump_generation(conn)
 
     def save_extracted_text(self, artifact_id: int, text: str, extractor: str, chars: int, filename: str, path: str):
         with self._get_conn() as conn:
@@ -87,90 +226,750 @@ class ArtifactsRepo:
                     chars=excluded.chars;
             """, (artifact_id, text, extractor, chars))
             
-            # 2. Update status
-            conn.execute("UPDATE artifacts SET ingest_status='indexed', updated_at=CURRENT_TIMESTAMP WHERE id=?", (artifact_id,))
+            # 2. Update status, stamp the new index generation (standing queries match on it)
+            self._bump_generation(conn)
+            conn.execute("""
+                UPDATE artifacts
+                SET ingest_status='indexed', updated_at=CURRENT_TIMESTAMP,
+                    index_generation=(SELECT CAST(value AS INTEGER) FROM index_meta WHERE key = 'generation')
+                WHERE id=?
+            """, (artifact_id,))
 
             # 3. Update FTS
             if self._fts_enabled:
-                conn.execute("DELETE FROM artifact_fts WHERE ref_id = ?", (artifact_id,))
+                conn.execute("DELETE FROM artifact_fts WHERE rowid = ?", (artifact_id,))
                 conn.execute("""
-                    INSERT INTO artifact_fts (filename, path, text, ref_id)
-                    VALUES (?, ?, ?, ?)
-                """, (filename, path, text, artifact_id))
+                    INSERT INTO artifact_fts (rowid, filename, path, text, ref_id)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (artifact_id, filename, path, text, artifact_id))
 
-    def search_artifacts(self, query: str, limit: int = 20, offset: int = 0, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        filters = filters or {}
-        results = []
-        
+    def clear_extracted_data(self, artifact_id: int):
+        """
+        Drops everything derived from the artifact's last successful extraction: text and FTS row,
+        chunks (stale ANN entries are filtered by live_chunk_ids), page spans and MinHash signature.
+        """
+        with self._get_conn() as conn:
+            conn.execute("DELETE FROM artifact_text WHERE artifact_id = ?", (artifact_id,))
+            if self._fts_enabled:
+                conn.execute("DELETE FROM artifact_fts WHERE rowid = ?", (artifact_id,))
+            conn.execute("DELETE FROM chunks WHERE artifact_id = ?", (artifact_id,))
+            conn.execute("DELETE FROM artifact_pages WHERE artifact_id = ?", (artifact_id,))
+            conn.execute("DELETE FROM minhash_bands WHERE artifact_id = ?", (artifact_id,))
+            conn.execute("DELETE FROM artifact_minhash WHERE artifact_id = ?", (artifact_id,))
+            self._bump_generation(conn)
+
+    def save_chunks(self, artifact_id: int, chunks: List[Dict[str, Any]]):
+        """
+        Replaces all chunks of an artifact.
+        Chunk keys: content_text, embedding (bytes or None), page (optional), chunk_type (default 'text').
+        Returns the new chunk_ids in input order.
+        """
+        chunk_ids = []
+        with self._get_conn() as conn:
+            conn.execute("DELETE FROM chunks WHERE artifact_id = ?", (artifact_id,))
+            for c in chunks:
+                cur = conn.execute("""
+                    INSERT INTO chunks (artifact_id, chunk_type, content_text, page, embedding)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (artifact_id, c.get('chunk_type', 'text'), c['content_text'], c.get('page'), c.get('embedding')))
+                chunk_ids.append(cur.lastrowid)
+            self._bump_generation(conn)
+        return chunk_ids
+
+    def iter_chunk_embeddings(self):
+        """
+        Yields (chunk_id, artifact_id, embedding_blob) for every embedded chunk.
+        """
+        with self._get_conn() as conn:
+            cursor = conn.execute("SELECT chunk_id, artifact_id, embedding FROM chunks WHERE embedding IS NOT NULL ORDER BY chunk_id")
+            while True:
+                batch = cursor.fetchmany(1000)
+                if not batch:
+                    break
+                yield from batch
+
+    def get_chunks(self, chunk_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        if not chunk_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in chunk_ids)
         with self._get_conn() as conn:
             conn.row_factory = sqlite3.Row
-            
-            # Base query structure for LIKE fallback if FTS not used or initial
-            sql_select = """
-                SELECT a.id, a.path, a.filename, a.ext, a.ingest_status, a.modified_at, LENGTH(t.text) as text_len, 
-                       substr(t.text, 1, 400) as snippet
-                FROM artifacts a
-                LEFT JOIN artifact_text t ON a.id = t.artifact_id
-            """
-            
-            params = []
-            where_clauses = ["1=1"]
-            
-            # Filters
-            if filters.get('ext'):
+            rows = conn.execute(f"""
+                SELECT chunk_id, artifact_id, chunk_type, content_text, page
+                FROM chunks WHERE chunk_id IN ({placeholders})
+            """, list(chunk_ids)).fetchall()
+        return {r['chunk_id']: dict(r) for r in rows}
+
+    def live_chunk_ids(self, chunk_ids: List[int]) -> set:
+        """
+        Returns the subset of chunk_ids that still exist (ANN entries may be stale).
+        """
+        if not chunk_ids:
+            return set()
+        placeholders = ", ".join("?" for _ in chunk_ids)
+        with self._get_conn() as conn:
+            rows = conn.execute(f"SELECT chunk_id FROM chunks WHERE chunk_id IN ({placeholders})", list(chunk_ids)).fetchall()
+        return {r[0] for r in rows}
+
+    def count_chunk_embeddings(self) -> int:
+        with self._get_conn() as conn:
+            return conn.execute("SELECT COUNT(*) FROM chunks WHERE embedding IS NOT NULL").fetchone()[0]
+
+    def iter_vocabulary(self):
+        """
+        Yields (term, document_count) from the FTS5 vocabulary, sorted by term.
+        """
+        with self._get_conn() as conn:
+            cursor = conn.execute("SELECT term, doc FROM artifact_fts_vocab ORDER BY term")
+            while True:
+                batch = cursor.fetchmany(5000)
+                if not batch:
+                    break
+                yield from batch
+
+    def iter_filenames(self):
+        with self._get_conn() as conn:
+            for (name,) in conn.execute("SELECT filename FROM artifacts"):
+                yield name
+
+    def count_by_status(self) -> Dict[str, int]:
+        """
+        Artifact counts per ingest_status.
+        """
+        with self._get_conn() as conn:
+            return dict(conn.execute("SELECT ingest_status, COUNT(*) FROM artifacts GROUP BY ingest_status").fetchall())
+
+    def get_generation(self) -> int:
+        """
+        Index generation: a counter bumped on every index write. Used as a cache key.
+        """
+        with self._get_conn() as conn:
+            row = conn.execute("SELECT value FROM index_meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _bump_generation(self, conn: sqlite3.Connection):
+        conn.execute("""
+            INSERT INTO index_meta (key, value) VALUES ('generation', 1)
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """)
+
+    def search_artifacts(self, query: str, limit: int = 20, offset: int = 0, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Convenience wrapper: ranks IDs (phase one) and hydrates the page (phase two).
+        """
+        ranked = self.rank_artifact_ids(query, limit=limit, offset=offset, filters=filters)
+        return self.hydrate_artifacts(ranked, query)
+
+    def _filter_clauses(self, filters: Dict[str, Any]):
+        """
+        WHERE clauses for facet filters. FACET_NONE selects the rows the facet rollup
+        put in its "(none)" bucket (missing ext/status/date, or a path without a folder).
+        """
+        where_clauses = []
+        params = []
+        if filters.get('ext'):
+            if filters['ext'] == FACET_NONE:
+                where_clauses.append("(a.ext IS NULL OR a.ext = '')")
+            else:
                 where_clauses.append("a.ext = ?")
                 params.append(filters['ext'])
-            if filters.get('status'):
+        if filters.get('status'):
+            if filters['status'] == FACET_NONE:
+                where_clauses.append("(a.ingest_status IS NULL OR a.ingest_status = '')")
+            else:
                 where_clauses.append("a.ingest_status = ?")
                 params.append(filters['status'])
-                
-            # Search Logic
-            if query and self._fts_enabled:
-                # FTS Search
-                # Join with FTS table
-                sql = """
-                    SELECT a.id, a.path, a.filename, a.ext, a.ingest_status, a.modified_at, LENGTH(t.text) as text_len,
-                           snippet(artifact_fts, 2, '**', '**', '...', 64) as snippet
+        if filters.get('year'):
+            if filters['year'] == FACET_NONE:
+                where_clauses.append("strftime('%Y', a.modified_at, 'unixepoch') IS NULL")
+            else:
+                where_clauses.append("strftime('%Y', a.modified_at, 'unixepoch') = ?")
+                params.append(str(filters['year']))
+        if filters.get('month'): # 'YYYY-MM'
+            if filters['month'] == FACET_NONE:
+                where_clauses.append("strftime('%Y-%m', a.modified_at, 'unixepoch') IS NULL")
+            else:
+                where_clauses.append("strftime('%Y-%m', a.modified_at, 'unixepoch') = ?")
+                params.append(filters['month'])
+        if filters.get('folder'): # Directory prefix (with trailing separator)
+            if filters['folder'] == FACET_NONE:
+                where_clauses.append("(instr(a.path, '/') = 0 AND instr(a.path, '\\') = 0)")
+            else:
+                where_clauses.append("substr(a.path, 1, length(?)) = ?")
+                params.extend([filters['folder'], filters['folder']])
+        if filters.get('dir'): # Exact directory (with trailing separator): its files, not subfolders
+            where_clauses.append(f"{_DIR_SQL} = ?")
+            params.append(filters['dir'])
+        return where_clauses, params
+
+    def _match_query(self, query: str, filters: Dict[str, Any], scope: Optional[Tuple[str, list]] = None):
+        """
+        Builds the match-set SQL: SELECT <id>, <raw score> ... (no ORDER/LIMIT).
+        scope: optional (subquery selecting artifact ids, params) the match is restricted to.
+        Returns (sql, params, order_by).
+        """
+        where_clauses, params = self._filter_clauses(filters)
+        scope_sql, scope_params = scope if scope else (None, [])
+
+        if query and self._fts_enabled:
+            match = compile_fts_query(query)
+            if match is None:
+                # Nothing searchable (e.g. only punctuation)
+                return "SELECT a.id AS id, NULL AS score FROM artifacts a WHERE 0", [], "a.id"
+
+            # FTS Search. Join artifacts only when metadata filters need it.
+            sql = "SELECT artifact_fts.ref_id AS id, artifact_fts.rank AS score FROM artifact_fts"
+            if where_clauses:
+                sql += " JOIN artifacts a ON a.id = artifact_fts.ref_id"
+            sql += " WHERE artifact_fts MATCH ?"
+            if scope_sql:
+                # rowid = artifacts.id: FTS5 seeks to those rows instead of matching the whole corpus
+                sql += f" AND artifact_fts.rowid IN ({scope_sql})"
+            for clause in where_clauses:
+                sql += f" AND {clause}"
+            # Deterministic Sort: FTS Rank
+            return sql, [match] + scope_params + params, "artifact_fts.rank"
+
+        if query:
+            # LIKE Fallback
+            sql = """
+                SELECT a.id AS id, NULL AS score FROM artifacts a
+                LEFT JOIN artifact_text t ON a.id = t.artifact_id
+                WHERE (a.filename LIKE ? OR a.path LIKE ? OR t.text LIKE ?)
+            """
+            p = f"%{query}%"
+            if scope_sql:
+                sql += f" AND a.id IN ({scope_sql})"
+            for clause in where_clauses:
+                sql += f" AND {clause}"
+            # Deterministic Sort: snippet length (min(chars, 400)) as proxy for conciseness + ID
+            return sql, [p, p, p] + scope_params + params, "MIN(t.chars, 400) ASC, a.id ASC"
+
+        # No query, just filters
+        if scope_sql:
+            where_clauses = [f"a.id IN ({scope_sql})"] + where_clauses
+            params = scope_params + params
+        sql = "SELECT a.id AS id, NULL AS score FROM artifacts a WHERE " + " AND ".join(["1=1"] + where_clauses)
+        return sql, params, "a.id DESC"
+
+    def rank_artifact_ids(self, query: str, limit: int = 20, offset: int = 0, filters: Dict[str, Any] = None,
+                          collapse: bool = False) -> List[Tuple[int, Optional[float]]]:
+        """
+        Phase one: returns ranked (artifact_id, score) pairs for one page.
+        Touches only the FTS index and artifacts metadata, never artifact_text blobs
+        (the LIKE fallback has to scan text to match, but does not rank on it).
+        Score is -bm25 for FTS (higher is better), None otherwise.
+        collapse: keep only the best-ranked artifact of each near-duplicate group.
+        """
+        if collapse:
+            return self._rank_collapsed(query, limit, offset, filters)
+
+        sql, params, order_by = self._match_query(query, filters or {})
+        sql += f" ORDER BY {order_by} LIMIT ? OFFSET ?"
+        params = params + [int(limit), int(offset)]
+
+        with self._get_conn() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        return [(r[0], -r[1] if r[1] is not None else None) for r in rows]
+
+    def _rank_collapsed(self, query: str, limit: int, offset: int, filters: Dict[str, Any]) -> List[Tuple[int, Optional[float]]]:
+        """
+        Streams the ranking in batches and skips artifacts whose group was already seen.
+        Stops as soon as the page is full: no pairwise comparison at query time.
+        """
+        wanted = offset + limit
+        seen_groups = set()
+        kept = []
+        with self._get_conn() as conn:
+            for ranked in self._iter_ranked_batches(conn, query, filters, batch_size=max(wanted, 100)):
+                groups = self._dup_groups(conn, [aid for aid, _ in ranked])
+                for aid, score in ranked:
+                    key = groups.get(aid, -aid)
+                    if key in seen_groups:
+                        continue
+                    seen_groups.add(key)
+                    kept.append((aid, score))
+                if len(kept) >= wanted:
+                    break
+        return kept[offset:wanted]
+
+    def _dup_groups(self, conn: sqlite3.Connection, artifact_ids: List[int]) -> Dict[int, int]:
+        if not artifact_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in artifact_ids)
+        rows = conn.execute(f"SELECT artifact_id, dup_group FROM artifact_minhash WHERE artifact_id IN ({placeholders})", list(artifact_ids)).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def get_dup_groups(self, artifact_ids: List[int]) -> Dict[int, int]:
+        """
+        Returns {artifact_id: dup_group} for artifacts that have a MinHash signature.
+        """
+        with self._get_conn() as conn:
+            return self._dup_groups(conn, artifact_ids)
+
+    def find_minhash_candidates(self, band_keys: List[Tuple[int, int]], exclude_id: int) -> List[Tuple[int, bytes, int]]:
+        """
+        Returns (artifact_id, signature, dup_group) of artifacts sharing at least one LSH bucket.
+        """
+        if not band_keys:
+            return []
+        clauses = " OR ".join("(b.band = ? AND b.bucket = ?)" for _ in band_keys)
+        params = [v for key in band_keys for v in key]
+        with self._get_conn() as conn:
+            rows = conn.execute(f"""
+                SELECT m.artifact_id, m.signature, m.dup_group
+                FROM artifact_minhash m
+                WHERE m.artifact_id != ? AND m.artifact_id IN (SELECT b.artifact_id FROM minhash_bands b WHERE {clauses})
+            """, [exclude_id] + params).fetchall()
+        return [tuple(r) for r in rows]
+
+    def save_minhash(self, artifact_id: int, signature: bytes, band_keys: List[Tuple[int, int]],
+                     dup_group: Optional[int] = None, merge_groups: List[int] = None) -> int:
+        """
+        Replaces the artifact's signature and LSH buckets. dup_group None allocates a new group.
+        merge_groups are folded into dup_group. Returns the group.
+        """
+        with self._get_conn() as conn:
+            conn.execute("DELETE FROM minhash_bands WHERE artifact_id = ?", (artifact_id,))
+            if dup_group is None:
+                # Fresh id: the artifact may have been the last link of a group others still use
+                dup_group = conn.execute("SELECT COALESCE(MAX(dup_group), 0) + 1 FROM artifact_minhash").fetchone()[0]
+            conn.execute("""
+                INSERT INTO artifact_minhash (artifact_id, signature, dup_group) VALUES (?, ?, ?)
+                ON CONFLICT(artifact_id) DO UPDATE SET signature = excluded.signature, dup_group = excluded.dup_group
+            """, (artifact_id, signature, dup_group))
+            conn.executemany("INSERT OR IGNORE INTO minhash_bands (band, bucket, artifact_id) VALUES (?, ?, ?)",
+                             [(band, bucket, artifact_id) for band, bucket in band_keys])
+            if merge_groups:
+                placeholders = ", ".join("?" for _ in merge_groups)
+                conn.execute(f"UPDATE artifact_minhash SET dup_group = ? WHERE dup_group IN ({placeholders})",
+                             [dup_group] + list(merge_groups))
+        return dup_group
+
+    def delete_minhash(self, artifact_id: int):
+        with self._get_conn() as conn:
+            conn.execute("DELETE FROM minhash_bands WHERE artifact_id = ?", (artifact_id,))
+            conn.execute("DELETE FROM artifact_minhash WHERE artifact_id = ?", (artifact_id,))
+
+    def facet_counts(self, query: str, filters: Dict[str, Any] = None) -> List[Tuple[str, str, str, str, int]]:
+        """
+        Aggregates the full match set in one SQL pass.
+        Returns rows of (ext, ingest_status, 'YYYY-MM', directory, count), one per combination;
+        callers roll these up into per-facet counts.
+        """
+        sql, params, _ = self._match_query(query, filters or {})
+        with self._get_conn() as conn:
+            rows = conn.execute(f"""
+                SELECT a.ext, a.ingest_status,
+                       strftime('%Y-%m', a.modified_at, 'unixepoch') AS month,
+                       {_DIR_SQL} AS dir,
+                       COUNT(*)
+                FROM ({sql}) m
+                JOIN artifacts a ON a.id = m.id
+                GROUP BY 1, 2, 3, 4
+            """, params).fetchall()
+        return [tuple(r) for r in rows]
+
+    def hydrate_artifacts(self, ranked: List[Tuple[int, Optional[float]]], query: str = "") -> List[Dict[str, Any]]:
+        """
+        Phase two: loads metadata, text_len (from artifact_text.chars) and snippets
+        for the given ranked IDs only. Preserves the input order.
+        """
+        if not ranked:
+            return []
+
+        ids = [r[0] for r in ranked]
+        placeholders = ", ".join("?" for _ in ids)
+        results = []
+
+        with self._get_conn() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(f"""
+                SELECT a.id, a.path, a.filename, a.ext, a.ingest_status, a.modified_at, a.size_bytes,
+                       t.chars as text_len, substr(t.text, 1, 400) as snippet
+                FROM artifacts a
+                LEFT JOIN artifact_text t ON a.id = t.artifact_id
+                WHERE a.id IN ({placeholders})
+            """, ids).fetchall()
+            by_id = {r['id']: dict(r) for r in rows}
+
+            # FTS snippets are computed only for the hydrated page
+            match = compile_fts_query(query) if query and self._fts_enabled else None
+            if match:
+                snippets = conn.execute(f"""
+                    SELECT ref_id, snippet(artifact_fts, 2, '**', '**', '...', 64)
+                    FROM artifact_fts
+                    WHERE artifact_fts MATCH ? AND rowid IN ({placeholders})
+                """, [match] + ids).fetchall()
+                for ref_id, snip in snippets:
+                    if ref_id in by_id:
+                        by_id[ref_id]['snippet'] = snip
+
+        for artifact_id, score in ranked:
+            row = by_id.get(artifact_id)
+            if row is None:
+                continue # Deleted between phases
+            row['score'] = score
+            results.append(row)
+
+        return results
+
+    def _iter_ranked_batches(self, conn: sqlite3.Connection, query: str, filters: Dict[str, Any], batch_size: int):
+        sql, params, order_by = self._match_query(query, filters or {})
+        cursor = conn.execute(f"{sql} ORDER BY {order_by}", params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield [(r[0], -r[1] if r[1] is not None else None) for r in batch]
+
+    def iter_export(self, query: str = "", filters: Dict[str, Any] = None, include_text: bool = False, batch_size: int = 500):
+        """
+        Streams the whole match set (every artifact when query is empty) in rank order, one dict per artifact.
+        Ranked IDs come from a fetchmany cursor and rows are hydrated per batch,
+        so memory is bounded by batch_size, not by the index size.
+        """
+        text_col = "t.text" if include_text else "NULL"
+        with self._get_conn() as conn:
+            conn.row_factory = sqlite3.Row
+            for ranked in self._iter_ranked_batches(conn, query, filters, batch_size):
+                placeholders = ", ".join("?" for _ in ranked)
+                rows = conn.execute(f"""
+                    SELECT a.id, a.path, a.filename, a.ext, a.ingest_status, a.modified_at, a.size_bytes,
+                           t.chars as text_len, {text_col} as text
                     FROM artifacts a
-                    JOIN artifact_fts f ON a.id = f.ref_id
                     LEFT JOIN artifact_text t ON a.id = t.artifact_id
-                    WHERE artifact_fts MATCH ?
-                """
-                # Re-add filters to WHERE
-                for clause in where_clauses[1:]: # skip 1=1
-                    sql += f" AND {clause}"
-                
-                # Deterministic Sort: FTS Rank
-                sql += " ORDER BY rank"
-                
-                # Params: query + filter params
-                params = [query] + params
-                
-            elif query:
-                # LIKE Fallback
-                sql = sql_select + " WHERE " + " AND ".join(where_clauses)
-                sql += " AND (a.filename LIKE ? OR a.path LIKE ? OR t.text LIKE ?)"
-                p = f"%{query}%"
-                params.extend([p, p, p])
-                
-                # Deterministic Sort: Snippet length (as proxy for relevance/conciseness) + ID
-                sql += " ORDER BY length(snippet) ASC, a.id ASC"
-                
-            else:
-                # No query, just filters
-                sql = sql_select + " WHERE " + " AND ".join(where_clauses)
-                sql += " ORDER BY a.id DESC"
-
-            # Apply Limit and Offset
-            sql += f" LIMIT {limit} OFFSET {offset}"
-
-            cursor = conn.execute(sql, params)
-            rows = cursor.fetchall()
-            for r in rows:
-                results.append(dict(r))
-                
+                    WHERE a.id IN ({placeholders})
+                """, [r[0] for r in ranked]).fetchall()
+                by_id = {r['id']: r for r in rows}
+
+                for artifact_id, score in ranked:
+                    row = by_id.get(artifact_id)
+                    if row is None:
+                        continue
+                    out = dict(row)
+                    if not include_text:
+                        del out['text']
+                    out['score'] = score
+                    yield out
+
+    def iter_export_chunks(self, query: str = "", filters: Dict[str, Any] = None, batch_size: int = 500):
+        """
+        Like iter_export, but yields one dict per chunk (artifacts in rank order, chunks in document order).
+        Chunks are read per artifact through idx_chunks_artifact_id.
+        """
+        with self._get_conn() as conn:
+            conn.row_factory = sqlite3.Row
+            for ranked in self._iter_ranked_batches(conn, query, filters, batch_size):
+                for artifact_id, score in ranked:
+                    rows = conn.execute("""
+                        SELECT c.chunk_id, c.artifact_id, a.path, a.filename, c.chunk_type, c.page, c.content_text
+                        FROM chunks c
+                        JOIN artifacts a ON a.id = c.artifact_id
+                        WHERE c.artifact_id = ?
+                        ORDER BY c.chunk_id
+                    """, (artifact_id,))
+                    for row in rows:
+                        out = dict(row)
+                        out['score'] = score
+                        yield out
+
+    def add_saved_query(self, name: str, query: str, filters: Dict[str, Any] = None) -> int:
+        """
+        Stores a standing query. It starts at the current generation: only artifacts
+        indexed from now on produce hits.
+        """
+        with self._get_conn() as conn:
+            cur = conn.execute("""
+                INSERT INTO saved_queries (name, query, filters, last_evaluated_generation)
+                VALUES (?, ?, ?, COALESCE((SELECT CAST(value AS INTEGER) FROM index_meta WHERE key = 'generation'), 0))
+            """, (name, query, json.dumps(filters) if filters else None))
+            return cur.lastrowid
+
+    def delete_saved_query(self, query_id: int):
+        with self._get_conn() as conn:
+            conn.execute("DELETE FROM saved_query_hits WHERE query_id = ?", (query_id,))
+            conn.execute("DELETE FROM saved_queries WHERE id = ?", (query_id,))
+
+    def list_saved_queries(self) -> List[Dict[str, Any]]:
+        """
+        Returns saved queries with their unseen hit counts ('new_hits'). Filters are decoded.
+        """
+        with self._get_conn() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT q.id, q.name, q.query, q.filters, q.created_at, q.last_evaluated_generation, q.last_evaluated_at,
+                       (SELECT COUNT(*) FROM saved_query_hits h WHERE h.query_id = q.id AND h.seen = 0) AS new_hits
+                FROM saved_queries q
+                ORDER BY q.id
+            """).fetchall()
+        results = []
+        for r in rows:
+            row = dict(r)
+            row['filters'] = json.loads(row['filters']) if row['filters'] else {}
+            results.append(row)
         return results
 
+    def match_new_artifacts(self, query: str, filters: Dict[str, Any], after_generation: int, up_to_generation: int) -> List[int]:
+        """
+        Matches a query against artifacts indexed in (after_generation, up_to_generation] only.
+        The generation range (idx_artifacts_index_generation) bounds the match, so the cost follows
+        the number of newly indexed artifacts, not the corpus size. Returns artifact IDs.
+        """
+        scope = ("SELECT id FROM artifacts WHERE index_generation > ? AND index_generation <= ?",
+                 [after_generation, up_to_generation])
+        sql, params, _ = self._match_query(query, filters or {}, scope)
+        with self._get_conn() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [r[0] for r in rows]
+
+    def record_saved_query_hits(self, query_id: int, artifact_ids: List[int], generation: int):
+        """
+        Records new hits (existing ones keep their seen flag) and advances the query to generation.
+        """
+        with self._get_conn() as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO saved_query_hits (query_id, artifact_id, generation)
+                VALUES (?, ?, ?)
+            """, [(query_id, aid, generation) for aid in artifact_ids])
+            conn.execute("""
+                UPDATE saved_queries SET last_evaluated_generation = ?, last_evaluated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (generation, query_id))
+
+    def get_saved_query_hits(self, query_id: int, unseen_only: bool = True, limit: int = 50) -> List[Dict[str, Any]]:
+        sql = """
+            SELECT h.query_id, h.artifact_id, h.generation, h.matched_at, h.seen,
+                   a.path, a.filename, a.ext, a.modified_at
+            FROM saved_query_hits h
+            JOIN artifacts a ON a.id = h.artifact_id
+            WHERE h.query_id = ?
+        """
+        if unseen_only:
+            sql += " AND h.seen = 0"
+        sql += " ORDER BY h.generation DESC, h.artifact_id DESC LIMIT ?"
+        with self._get_conn() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(sql, (query_id, int(limit))).fetchall()
+        return [dict(r) for r in rows]
+
+    def mark_saved_query_hits_seen(self, query_id: Optional[int] = None):
+        with self._get_conn() as conn:
+            if query_id is None:
+                conn.execute("UPDATE saved_query_hits SET seen = 1 WHERE seen = 0")
+            else:
+                conn.execute("UPDATE saved_query_hits SET seen = 1 WHERE seen = 0 AND query_id = ?", (query_id,))
+
+    def match_offsets(self, artifact_ids: List[int], query: str, max_per_artifact: int = 200) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Character offsets of query matches within artifact_text.text, per artifact.
+        FTS: every matched token/phrase via highlight() with sentinel markers.
+        LIKE fallback: first case-insensitive occurrence of the query.
+        """
+        if not artifact_ids or not query:
+            return {}
+        placeholders = ", ".join("?" for _ in artifact_ids)
+
+        with self._get_conn() as conn:
+            if self._fts_enabled:
+                match = compile_fts_query(query)
+                if match is None:
+                    return {}
+                rows = conn.execute(f"""
+                    SELECT rowid, highlight(artifact_fts, 2, ?, ?)
+                    FROM artifact_fts
+                    WHERE artifact_fts MATCH ? AND rowid IN ({placeholders})
+                """, [HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE, match] + list(artifact_ids)).fetchall()
+                return {rowid: _highlight_offsets(marked or "")[:max_per_artifact] for rowid, marked in rows}
+
+            rows = conn.execute(f"""
+                SELECT artifact_id, instr(lower(text), lower(?))
+                FROM artifact_text WHERE artifact_id IN ({placeholders})
+            """, [query] + list(artifact_ids)).fetchall()
+            return {aid: [(pos - 1, pos - 1 + len(query))] for aid, pos in rows if pos}
+
+    def get_text_window(self, artifact_id: int, start: int, length: int) -> Tuple[Optional[str], int]:
+        """
+        Returns (text[start:start + length], total characters) from artifact_text, or (None, 0).
+        """
+        with self._get_conn() as conn:
+            row = conn.execute("""
+                SELECT substr(text, ?, ?), COALESCE(chars, length(text))
+                FROM artifact_text WHERE artifact_id = ?
+            """, (int(start) + 1, int(length), artifact_id)).fetchone()
+        if row is None or row[0] is None:
+            return None, 0
+        return row[0], row[1]
+
+    def save_pages(self, artifact_id: int, spans: List[Tuple[int, int]]):
+        """
+        Replaces the page spans of an artifact: spans[i] = (start_char, length) of page i + 1.
+        """
+        with self._get_conn() as conn:
+            conn.execute("DELETE FROM artifact_pages WHERE artifact_id = ?", (artifact_id,))
+            conn.executemany("""
+                INSERT INTO artifact_pages (artifact_id, page, start_char, length) VALUES (?, ?, ?, ?)
+            """, [(artifact_id, i + 1, int(start), int(length)) for i, (start, length) in enumerate(spans)])
+
+    def get_page_spans(self, artifact_id: int) -> List[Tuple[int, int, int]]:
+        """
+        (page, start_char, length) for each stored page, in page order. Empty if none.
+        """
+        with self._get_conn() as conn:
+            return [tuple(r) for r in conn.execute("""
+                SELECT page, start_char, length FROM artifact_pages WHERE artifact_id = ? ORDER BY page
+            """, (artifact_id,)).fetchall()]
+
+    def count_pages(self, artifact_id: int) -> int:
+        with self._get_conn() as conn:
+            return conn.execute("SELECT COUNT(*) FROM artifact_pages WHERE artifact_id = ?", (artifact_id,)).fetchone()[0]
+
+    def get_page_text(self, artifact_id: int, page: int) -> Optional[str]:
+        """
+        Stored text of one page (a substring of artifact_text), or None.
+        """
+        with self._get_conn() as conn:
+            row = conn.execute("""
+                SELECT substr(t.text, p.start_char + 1, p.length)
+                FROM artifact_pages p JOIN artifact_text t ON t.artifact_id = p.artifact_id
+                WHERE p.artifact_id = ? AND p.page = ?
+            """, (artifact_id, page)).fetchone()
+        return row[0] if row else None
+
+    def sync_workspace_snapshot(self, root: str, files: List[Dict[str, Any]]) -> int:
+        """
+        Syncs the filesystem snapshot of root (keys: path, filename, ext, size_bytes, modified_at).
+        Unchanged rows keep their version, changed ones are bumped, vanished ones removed.
+        Returns the number of new, changed or removed paths.
+        """
+        scanned_at = datetime.datetime.now().isoformat()
+        seen = {f["path"] for f in files}
+        with self._get_conn() as conn:
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT INTO workspace_files (path, root, filename, ext, size_bytes, modified_at, scanned_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    root = excluded.root,
+                    size_bytes = excluded.size_bytes,
+                    modified_at = excluded.modified_at,
+                    scanned_at = excluded.scanned_at,
+                    version = version + 1
+                WHERE size_bytes IS NOT excluded.size_bytes OR modified_at IS NOT excluded.modified_at
+            """, [(f["path"], root, f["filename"], f["ext"], f["size_bytes"], f["modified_at"], scanned_at) for f in files])
+
+            existing = [r[0] for r in conn.execute("SELECT path FROM workspace_files WHERE root = ?", (root,))]
+            conn.executemany("DELETE FROM workspace_files WHERE path = ?", [(p,) for p in existing if p not in seen])
+            changed = conn.total_changes - before
+
+            conn.execute("""
+                INSERT INTO index_meta (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """, (f"workspace_scanned_at:{root}", scanned_at))
+        return changed
+
+    def touch_workspace_file(self, meta: Dict[str, Any]) -> bool:
+        """
+        Refreshes one snapshot row after the file was (re)indexed, without rescanning the folder.
+        Returns True if the row existed and its size/mtime changed (version bumped).
+        """
+        with self._get_conn() as conn:
+            cur = conn.execute("""
+                UPDATE workspace_files SET size_bytes = ?, modified_at = ?, version = version + 1
+                WHERE path = ? AND (size_bytes IS NOT ? OR modified_at IS NOT ?)
+            """, (meta["size_bytes"], meta["modified_at"], meta["path"], meta["size_bytes"], meta["modified_at"]))
+            return cur.rowcount > 0
+
+    def workspace_scanned_at(self, root: str) -> Optional[str]:
+        with self._get_conn() as conn:
+            row = conn.execute("SELECT value FROM index_meta WHERE key = ?", (f"workspace_scanned_at:{root}",)).fetchone()
+        return row[0] if row else None
+
+    def _workspace_where(self, root: str, search: Optional[str], ext: Optional[str]):
+        clauses, params = ["w.root = ?"], [root]
+        if ext:
+            clauses.append("w.ext = ?")
+            params.append(ext)
+        if search:
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("w.filename LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        return " AND ".join(clauses), params
+
+    def workspace_page(self, root: str, search: Optional[str] = None, ext: Optional[str] = None,
+                       status: Optional[str] = None, sort: str = "name", limit: int = 50,
+                       offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of the Sources inbox and the total matching rows.
+        Status is derived against artifacts like IndexingService.scan_workspace
+        (NEW / DIRTY / INDEXED / FAILED / NOT_EXTRACTABLE).
+        sort: name, modified (newest first), size (largest first) or status.
+        """
+        where, params = self._workspace_where(root, search, ext)
+        order = WORKSPACE_SORTS.get(sort)
+        if order is None:
+            raise ValueError(f"Unknown sort: {sort}")
+        status_clause = ""
+        if status:
+            status_clause = "WHERE status = ?"
+            params = params + [status]
+
+        sql = f"""
+            SELECT * FROM (
+                SELECT w.path, w.filename, w.ext, w.size_bytes, w.modified_at, w.version, a.id, {_WORKSPACE_STATUS_SQL} AS status
+                FROM workspace_files w LEFT JOIN artifacts a ON a.path = w.path
+                WHERE {where}
+            ) {status_clause}
+        """
+        with self._get_conn() as conn:
+            conn.row_factory = sqlite3.Row
+            total = conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+            rows = conn.execute(f"{sql} ORDER BY {order} LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+        return [dict(r) for r in rows], total
+
+    def get_workspace_file(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._get_conn() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(f"""
+                SELECT w.path, w.filename, w.ext, w.size_bytes, w.modified_at, w.version, a.id, {_WORKSPACE_STATUS_SQL} AS status
+                FROM workspace_files w LEFT JOIN artifacts a ON a.path = w.path
+                WHERE w.path = ?
+            """, (path,)).fetchone()
+        return dict(row) if row else None
+
+    def workspace_counts(self, root: str) -> Dict[str, Dict[str, int]]:
+        """
+        {"status": {...}, "ext": {...}} over the whole snapshot of root.
+        """
+        with self._get_conn() as conn:
+            rows = conn.execute(f"""
+                SELECT {_WORKSPACE_STATUS_SQL} AS status, w.ext, COUNT(*)
+                FROM workspace_files w LEFT JOIN artifacts a ON a.path = w.path
+                WHERE w.root = ?
+                GROUP BY status, w.ext
+            """, (root,)).fetchall()
+        counts: Dict[str, Dict[str, int]] = {"status": {}, "ext": {}}
+        for status, ext, n in rows:
+            counts["status"][status] = counts["status"].get(status, 0) + n
+            counts["ext"][ext or ""] = counts["ext"].get(ext or "", 0) + n
+        return counts
+
+    def workspace_paths(self, root: str, statuses: List[str]) -> List[str]:
+        """
+        Snapshot paths of root whose derived status is one of statuses (e.g. NEW, DIRTY).
+        """
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._get_conn() as conn:
+            rows = conn.execute(f"""
+                SELECT path FROM (
+                    SELECT w.path, w.filename, {_WORKSPACE_STATUS_SQL} AS status
+                    FROM workspace_files w LEFT JOIN artifacts a ON a.path = w.path
+                    WHERE w.root = ?
+                ) WHERE status IN ({placeholders}) ORDER BY filename
+            """, [root] + list(statuses)).fetchall()
+        return [r[0] for r in rows]
+
     def record_index_run(self, run_meta: Dict[str, Any]):
         """
         Records statistics about an indexing run.
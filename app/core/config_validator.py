@@ -28,6 +28,8 @@ class ConfigValidator:
         else:
             ConfigValidator._check_bool(features, "search_enabled", errors)
             ConfigValidator._check_bool(features, "fts_enabled", errors)
+            ConfigValidator._check_bool(features, "semantic_enabled", errors)
+            ConfigValidator._check_bool(features, "dedup_enabled", errors)
             
             # Extraction
             extraction = features.get("extraction", {})
@@ -71,7 +73,22 @@ class ConfigValidator:
                         except Exception as e:
                             errors.append(f"Path 'paths.{p}' ({val}) is invalid or not creatable: {e}")
 
-        # 4. Strict Logging of Results (DoD)
+        # 4. Profiling (optional section)
+        profiling = config.get("profiling")
+        if profiling is not None:
+            if not isinstance(profiling, dict):
+                errors.append("'profiling' must be a dictionary")
+            else:
+                ConfigValidator._check_bool(profiling, "enabled", errors)
+                ConfigValidator._check_bool(profiling, "tracemalloc", errors)
+                rate = profiling.get("sample_rate", 1.0)
+                if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+                    errors.append(f"'profiling.sample_rate' must be a number between 0 and 1, got {rate!r}")
+                top_n = profiling.get("top_n", 1)
+                if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 1:
+                    errors.append(f"'profiling.top_n' must be a positive integer, got {top_n!r}")
+
+        # 5. Strict Logging of Results (DoD)
         if errors:
             logger.error(f"Config Validation Failed: {errors}")
         else:
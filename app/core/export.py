@@ -0,0 +1,104 @@
+
+import argparse
+import csv
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from app.core.artifacts_repo import ArtifactsRepo
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("jsonl", "csv")
+ARTIFACT_FIELDS = ["id", "path", "filename", "ext", "ingest_status", "modified_at", "size_bytes", "text_len", "score"]
+CHUNK_FIELDS = ["chunk_id", "artifact_id", "path", "filename", "chunk_type", "page", "score", "content_text"]
+
+
+def iter_records(repo: ArtifactsRepo, query: str = "", filters: Optional[Dict[str, Any]] = None,
+                 include_text: bool = False, chunks: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Streams export records: one per artifact, or one per chunk when chunks=True.
+    An empty query exports the whole index.
+    """
+    if chunks:
+        return repo.iter_export_chunks(query, filters)
+    return repo.iter_export(query, filters, include_text=include_text)
+
+
+def export_fields(include_text: bool = False, chunks: bool = False) -> List[str]:
+    if chunks:
+        return list(CHUNK_FIELDS)
+    return ARTIFACT_FIELDS + (["text"] if include_text else [])
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], out: TextIO) -> int:
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(records: Iterable[Dict[str, Any]], out: TextIO, fields: List[str]) -> int:
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def export(repo: ArtifactsRepo, out: TextIO, fmt: str = "jsonl", query: str = "",
+           filters: Optional[Dict[str, Any]] = None, include_text: bool = False, chunks: bool = False) -> int:
+    """
+    Writes the export incrementally to out. Returns the number of records written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {EXPORT_FORMATS})")
+
+    records = iter_records(repo, query, filters, include_text=include_text, chunks=chunks)
+    if fmt == "csv":
+        return write_csv(records, out, export_fields(include_text, chunks))
+    return write_jsonl(records, out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.db.database import resolve_db_path
+
+    parser = argparse.ArgumentParser(description="Stream search results or the whole index to JSONL/CSV.")
+    parser.add_argument("--config", required=True, help="Path to config YAML (dev or prod).")
+    parser.add_argument("--query", default="", help="Search query (same syntax as the Search page). Empty = whole index.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    parser.add_argument("--output", default="-", help="Output file ('-' = stdout).")
+    parser.add_argument("--text", action="store_true", help="Include full extracted text.")
+    parser.add_argument("--chunks", action="store_true", help="One row per chunk instead of per artifact.")
+    parser.add_argument("--ext", help="Filter: extension, e.g. .pdf")
+    parser.add_argument("--status", help="Filter: ingest status")
+    parser.add_argument("--month", help="Filter: modified month, YYYY-MM")
+    parser.add_argument("--folder", help="Filter: path prefix")
+    args = parser.parse_args(argv)
+
+    db_path = resolve_db_path(Path(args.config).resolve())
+    if not db_path.exists():
+        print(f"ERROR: DB not found at {db_path}", file=sys.stderr)
+        return 1
+
+    filters = {k: getattr(args, k) for k in ("ext", "status", "month", "folder") if getattr(args, k)}
+    repo = ArtifactsRepo(str(db_path))
+
+    if args.output == "-":
+        count = export(repo, sys.stdout, args.format, args.query, filters, args.text, args.chunks)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            count = export(repo, f, args.format, args.query, filters, args.text, args.chunks)
+
+    print(f"OK: exported {count} records", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
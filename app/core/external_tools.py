@@ -42,6 +42,15 @@ class ExternalTools:
             
         return results
 
+    @staticmethod
+    def pdftoppm_path(config: Dict[str, Any] = None) -> Optional[str]:
+        """
+        Full path of Poppler's pdftoppm (same lookup as check_binaries), or None.
+        """
+        extraction = (config or {}).get("features", {}).get("extraction", {})
+        ocr = extraction.get("ocr", {})
+        return ExternalTools._find_binary("pdftoppm", "pdftoppm.exe", ocr.get("poppler_path") if isinstance(ocr, dict) else None)
+
     @staticmethod
     def _find_binary(name: str, win_name: str, config_path: Optional[str] = None) -> Optional[str]:
         # 1. Config override
@@ -17,6 +17,13 @@ class PdfExtractor(BaseExtractor):
                     text.append(f"[IMAGE page={i+1} index=1 extractable=false]")
             
             full_text = "\n".join(text)
+
+            # Character span of each page in full_text, so previews can show a page without re-parsing
+            pages = []
+            start = 0
+            for page_text in text:
+                pages.append((start, len(page_text)))
+                start += len(page_text) + 1
             
             # If mostly empty/placeholder, check for Scanned
             has_real_text = any(t for t in text if not t.startswith("[IMAGE"))
@@ -38,7 +45,7 @@ class PdfExtractor(BaseExtractor):
                 # OCR disabled
                 return ExtractResult(content=None, metadata={"source": "image_only"})
                 
-            return ExtractResult(content=full_text, metadata={"source": "text"})
+            return ExtractResult(content=full_text, metadata={"source": "text", "pages": pages})
             
         except Exception as e:
             return ExtractResult(content=None, error=str(e), metadata={"source": "error"})
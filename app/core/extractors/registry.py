@@ -1,14 +1,23 @@
 
-from typing import Dict, Optional, Type
+import importlib
+from typing import Dict, Optional, Tuple, Type
 from .base import BaseExtractor
 from .plain import PlainTextExtractor
-from .pdf import PdfExtractor
-from .docx import DocxExtractor
 from app.core.external_tools import ExternalTools
 
+# Backends with heavy dependencies (pypdf, python-docx) are imported on first use:
+# most sessions never extract anything, so they should not pay for those imports.
+_LAZY_BACKENDS = {
+    "docx": ("app.core.extractors.docx", "DocxExtractor"),
+    "pdf": ("app.core.extractors.pdf", "PdfExtractor"),
+    "image": ("app.core.extractors.image", "ImageExtractor"),
+}
+
 class ExtractorRegistry:
     def __init__(self, config: Optional[dict] = None):
         self._extractors: Dict[str, BaseExtractor] = {}
+        self._lazy: Dict[str, Tuple[str, str]] = {} # ext -> (module, class), imported by get()
+        self._instances: Dict[Tuple[str, str], BaseExtractor] = {}
         self.config = config or {}
         # Get extraction features or default
         # If partial dict, get defaults? 
@@ -29,9 +38,26 @@ class ExtractorRegistry:
 
     def register(self, ext: str, extractor: BaseExtractor):
         self._extractors[ext.lower()] = extractor
+        self._lazy.pop(ext.lower(), None)
+
+    def register_lazy(self, ext: str, module: str, class_name: str):
+        """
+        Registers an extractor by import path; the module is imported on the first get(ext).
+        """
+        self._lazy[ext.lower()] = (module, class_name)
 
     def get(self, ext: str) -> Optional[BaseExtractor]:
-        return self._extractors.get(ext.lower())
+        ext = ext.lower()
+        extractor = self._extractors.get(ext)
+        if extractor is None and ext in self._lazy:
+            # One instance per backend, shared by all of its extensions
+            key = self._lazy.pop(ext)
+            extractor = self._instances.get(key)
+            if extractor is None:
+                cls = getattr(importlib.import_module(key[0]), key[1])
+                extractor = self._instances[key] = cls(self.config)
+            self._extractors[ext] = extractor
+        return extractor
 
     def register_defaults(self):
         plain = PlainTextExtractor(self.config)
@@ -40,15 +66,13 @@ class ExtractorRegistry:
         
         # DOCX
         if self.features.get("docx", True):
-            self.register(".docx", DocxExtractor(self.config))
+            self.register_lazy(".docx", *_LAZY_BACKENDS["docx"])
 
         # PDF
         if self.features.get("pdf", True):
-             self.register(".pdf", PdfExtractor(self.config))
+            self.register_lazy(".pdf", *_LAZY_BACKENDS["pdf"])
         
         # Images
         if self.features.get("images", True):
-            from .image import ImageExtractor
-            img = ImageExtractor(self.config)
             for ext in [".png", ".jpg", ".jpeg"]:
-                self.register(ext, img)
+                self.register_lazy(ext, *_LAZY_BACKENDS["image"])
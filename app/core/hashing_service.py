@@ -0,0 +1,196 @@
+
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from app.core.artifacts_repo import ArtifactsRepo
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK = 1024 * 1024 # Bytes per read; hashlib releases the GIL on blocks this size
+HASH_WORKERS = 2
+BACKFILL_BATCH = 500
+
+def hash_file(path: str, progress: Optional[Callable[[int], None]] = None, block: int = HASH_BLOCK) -> str:
+    """
+    Streaming SHA-256 of path in block-sized reads into one reused buffer.
+    progress(bytes_done) is called after every block.
+    """
+    digest = hashlib.sha256()
+    buf = bytearray(block)
+    view = memoryview(buf)
+    done = 0
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            digest.update(view[:n])
+            done += n
+            if progress:
+                progress(done)
+    return digest.hexdigest()
+
+@dataclass
+class HashJob:
+    path: str
+    size: int
+    modified_at: float
+    done_bytes: int = 0
+    digest: Optional[str] = None
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.digest is not None or self.error is not None
+
+    @property
+    def fraction(self) -> float:
+        return 1.0 if not self.size else min(self.done_bytes / self.size, 1.0)
+
+@dataclass
+class BackfillStatus:
+    running: bool = False
+    queued: int = 0
+    hashed: int = 0
+    failed: int = 0
+
+class HashingService:
+    """
+    Hashes files on a small thread pool and persists digests to artifacts.sha256.
+    A digest is only valid for the (size, mtime) it was computed on: it is stored only if the
+    file did not change while hashing, and re-indexing a changed file clears it.
+    """
+
+    def __init__(self, repo: ArtifactsRepo, workers: int = HASH_WORKERS):
+        self.repo = repo
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hasher")
+        self._jobs: Dict[str, HashJob] = {}
+        self._lock = threading.Lock()
+        self._backfill = BackfillStatus()
+        self._backfill_thread: Optional[threading.Thread] = None
+
+    def current_digest(self, path: str) -> Optional[str]:
+        """
+        Digest of path if one was computed on its current size/mtime (persisted or from a finished job).
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stored = self.repo.get_sha256(path, st.st_size, st.st_mtime)
+        if stored:
+            return stored
+        # Not persisted when the artifact row describes another version of the file
+        job = self._jobs.get(path)
+        if job and job.digest and job.size == st.st_size and abs(job.modified_at - st.st_mtime) <= 0.1:
+            return job.digest
+        return None
+
+    def submit(self, path: str) -> HashJob:
+        """
+        Starts hashing path in the background (or returns the job already running for it).
+        """
+        with self._lock:
+            job = self._jobs.get(path)
+            if job is not None and not job.finished:
+                return job
+            st = os.stat(path)
+            job = HashJob(path=path, size=st.st_size, modified_at=st.st_mtime)
+            self._jobs[path] = job
+            job.future = self._pool.submit(self._run, job)
+            return job
+
+    def job(self, path: str) -> Optional[HashJob]:
+        return self._jobs.get(path)
+
+    def _run(self, job: HashJob) -> Optional[str]:
+        def progress(done: int):
+            job.done_bytes = done
+
+        try:
+            digest = hash_file(job.path, progress)
+            # 1. Changed while hashing: the digest belongs to no (size, mtime) we know
+            st = os.stat(job.path)
+            if st.st_size != job.size or abs(st.st_mtime - job.modified_at) > 0.1:
+                raise RuntimeError("File changed while hashing")
+            # 2. Persist keyed by the (size, mtime) that was hashed
+            p = Path(job.path)
+            self.repo.save_sha256({"path": str(p), "filename": p.name, "ext": p.suffix.lower(),
+                                   "size_bytes": job.size, "modified_at": job.modified_at}, digest)
+            job.digest = digest
+            return digest
+        except Exception as e:
+            logger.warning(f"Hashing failed for {job.path}: {e}")
+            job.error = str(e)
+            return None
+
+    def start_backfill(self) -> bool:
+        """
+        Hashes every artifact without a digest, in the background. False if already running.
+        """
+        with self._lock:
+            if self._backfill_thread is not None and self._backfill_thread.is_alive():
+                return False
+            self._backfill = BackfillStatus(running=True)
+            self._backfill_thread = threading.Thread(target=self._run_backfill, name="hash-backfill", daemon=True)
+            self._backfill_thread.start()
+            return True
+
+    def backfill_status(self) -> BackfillStatus:
+        return self._backfill
+
+    def _run_backfill(self):
+        status = self._backfill
+        # Bounded in-flight jobs: the pool queue never holds the whole corpus
+        slots = threading.Semaphore(self.workers * 2)
+        counts_lock = threading.Lock()
+
+        def on_done(job: HashJob, future: Future):
+            with counts_lock:
+                if not future.cancelled() and future.result():
+                    status.hashed += 1
+                else:
+                    status.failed += 1
+            # The digest is persisted: don't keep one job per corpus file in memory
+            with self._lock:
+                if self._jobs.get(job.path) is job:
+                    del self._jobs[job.path]
+            slots.release()
+
+        try:
+            for path in self.repo.iter_missing_sha256(BACKFILL_BATCH):
+                if not os.path.exists(path):
+                    continue
+                slots.acquire()
+                try:
+                    job = self.submit(path)
+                except OSError:
+                    with counts_lock:
+                        status.failed += 1
+                    slots.release()
+                    continue
+                status.queued += 1
+                job.future.add_done_callback(lambda f, j=job: on_done(j, f))
+            # Wait for the tail
+            for _ in range(self.workers * 2):
+                slots.acquire()
+        except Exception as e:
+            logger.error(f"Hash backfill failed: {e}")
+        finally:
+            status.running = False
+
+    def wait_backfill(self, timeout: Optional[float] = None):
+        thread = self._backfill_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
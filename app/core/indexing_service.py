@@ -2,7 +2,7 @@
 import os
 import logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 from app.core.artifacts_repo import ArtifactsRepo
 from app.core.extractors.registry import ExtractorRegistry
@@ -14,6 +14,100 @@ class IndexingService:
         self.repo = repo
         self.config = config or {}
         self.registry = ExtractorRegistry(config)
+        self._embedder = None
+        self._minhasher = None
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return bool(self.config.get("semantic_enabled", True))
+
+    def _save_embeddings(self, artifact_id: int, content: str, pages: Optional[List[Tuple[int, int]]] = None):
+        """
+        Chunks the extracted text and stores float16 embeddings in chunks.embedding.
+        With page spans (PDF), chunks never cross a page and record their page number.
+        Failures are logged only: lexical search must not depend on embeddings.
+        """
+        try:
+            from app.core.search.embeddings import HashingEmbedder, chunk_text, encode_vectors
+
+            if self._embedder is None:
+                self._embedder = HashingEmbedder()
+
+            if pages:
+                paged = [(piece, i + 1) for i, (start, length) in enumerate(pages)
+                         for piece in chunk_text(content[start:start + length])]
+            else:
+                paged = [(piece, None) for piece in chunk_text(content)]
+            pieces = [piece for piece, _ in paged]
+            vectors = self._embedder.embed(pieces) if pieces else []
+            blobs = encode_vectors(vectors) if pieces else []
+            chunk_ids = self.repo.save_chunks(artifact_id, [
+                {"content_text": text, "embedding": blob, "page": page}
+                for (text, page), blob in zip(paged, blobs)
+            ])
+
+            # Keep an existing ANN index current (append-only delta)
+            if chunk_ids and os.path.exists(self._ann_path()):
+                from app.core.search.ann_index import IvfIndex
+                IvfIndex(self._ann_path(), self._embedder.dim).append(chunk_ids, [artifact_id] * len(chunk_ids), vectors)
+        except Exception as e:
+            logger.warning(f"Embedding failed for artifact {artifact_id}: {e}")
+
+    @property
+    def dedup_enabled(self) -> bool:
+        return bool(self.config.get("dedup_enabled", True))
+
+    def _save_minhash(self, artifact_id: int, content: str):
+        """
+        Stores the MinHash signature / LSH buckets and assigns the near-duplicate group.
+        Failures are logged only, like embeddings.
+        """
+        try:
+            from app.core.search.minhash import MinHasher, assign_duplicate_group
+
+            if self._minhasher is None:
+                self._minhasher = MinHasher()
+            assign_duplicate_group(self.repo, artifact_id, content, self._minhasher)
+        except Exception as e:
+            logger.warning(f"MinHash failed for artifact {artifact_id}: {e}")
+
+    def _ann_path(self) -> str:
+        from app.core.search.ann_index import ann_index_path
+        return ann_index_path(self.repo.db_path)
+
+    def maybe_rebuild_ann_index(self) -> bool:
+        """
+        (Re)builds the on-disk ANN index once the corpus is large enough for it to pay off,
+        or when the append-only delta has grown too large. Returns True if rebuilt.
+        """
+        if not self.semantic_enabled:
+            return False
+        try:
+            from app.core.search.ann_index import IvfIndex, build_ivf_index, ANN_MIN_VECTORS
+
+            min_vectors = self.config.get("ann_min_vectors", ANN_MIN_VECTORS)
+            index = IvfIndex(self._ann_path())
+            if index.exists():
+                if not index.needs_rebuild():
+                    return False
+            elif self.repo.count_chunk_embeddings() < min_vectors:
+                return False
+
+            return build_ivf_index(self.repo, self._ann_path()) > 0
+        except Exception as e:
+            logger.error(f"ANN index rebuild failed: {e}")
+            return False
+
+    def evaluate_standing_queries(self) -> Dict[int, int]:
+        """
+        Records saved-query hits for artifacts indexed since each query's last evaluation.
+        """
+        try:
+            from app.core.search.standing import StandingQueryService
+            return StandingQueryService(self.repo).evaluate()
+        except Exception as e:
+            logger.error(f"Standing query evaluation failed: {e}")
+            return {}
 
     def index_file(self, path: str) -> str:
         """
@@ -42,14 +136,15 @@ class IndexingService:
             # artifacts_repo.upsert updates timestamp.
             
             artifact_id = self.repo.upsert_artifact(meta)
+            # Keep the Sources inbox snapshot current for this path only
+            self.repo.touch_workspace_file(meta)
             
             # 2. Extract Text
             ext = meta["ext"]
             extractor = self.registry.get(ext)
             
             if not extractor:
-                self.repo.set_index_status(artifact_id, "not_extractable")
-                return "not_extractable"
+                return self._mark_unindexed(artifact_id, "not_extractable")
                 
             try:
                 result = extractor.extract(str(p))
@@ -63,24 +158,26 @@ class IndexingService:
                         meta["filename"],
                         meta["path"]
                     )
+                    pages = result.metadata.get("pages")
+                    self.repo.save_pages(artifact_id, pages or [])
+                    if self.semantic_enabled:
+                        self._save_embeddings(artifact_id, result.content, pages)
+                    if self.dedup_enabled:
+                        self._save_minhash(artifact_id, result.content)
                     return "indexed"
                 else:
                     # If content is None, it might be failed or not_extractable
                     # Check error
                     if result.error:
-                        self.repo.set_index_status(artifact_id, "failed", result.error)
-                        return "failed"
+                        return self._mark_unindexed(artifact_id, "failed", result.error)
                     else:
-                        self.repo.set_index_status(artifact_id, "not_extractable")
-                        return "not_extractable"
+                        return self._mark_unindexed(artifact_id, "not_extractable")
             except Exception as e:
                 logger.error(f"Extraction exception for {path}: {e}")
-                self.repo.set_index_status(artifact_id, "failed", str(e))
-                return "failed"
+                return self._mark_unindexed(artifact_id, "failed", str(e))
             except Exception as e:
                 logger.error(f"Extraction failed for {path}: {e}")
-                self.repo.set_index_status(artifact_id, "failed", str(e))
-                return "failed"
+                return self._mark_unindexed(artifact_id, "failed", str(e))
                 
         except Exception as e:
             logger.error(f"Indexing error for {path}: {e}")
@@ -88,6 +185,15 @@ class IndexingService:
             return "failed"
 
 
+    def _mark_unindexed(self, artifact_id: int, status: str, error: Optional[str] = None) -> str:
+        """
+        Records a failed/not_extractable result. A previously indexed version of the file must not
+        stay searchable, so its text, chunks, pages and signature are dropped first.
+        """
+        self.repo.clear_extracted_data(artifact_id)
+        self.repo.set_index_status(artifact_id, status, error)
+        return status
+
     def scan_workspace(self, ingest_dir: str) -> List[Dict[str, Any]]:
         """
         Scans directory and compares with DB to determine status.
@@ -197,6 +303,32 @@ class IndexingService:
 
         return results
 
+    def snapshot_workspace(self, ingest_dir: str) -> int:
+        """
+        Stats the files in ingest_dir into workspace_files (Sources inbox). Only the filesystem
+        is read; statuses are derived in SQL against artifacts. Returns the file count.
+        """
+        files = []
+        if os.path.exists(ingest_dir):
+            for entry in os.scandir(ingest_dir):
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError as e:
+                    logger.warning(f"Error scanning {entry.path}: {e}")
+                    continue
+                p = Path(entry.path)
+                files.append({
+                    "path": str(p),
+                    "filename": p.name,
+                    "ext": p.suffix.lower(),
+                    "size_bytes": stat.st_size,
+                    "modified_at": stat.st_mtime,
+                })
+        self.repo.sync_workspace_snapshot(ingest_dir, files)
+        return len(files)
+
     def index_needed(self, ingest_dir: str) -> List[Dict[str, Any]]:
         """
         Returns only files that need indexing (NEW or DIRTY).
@@ -234,6 +366,9 @@ class IndexingService:
                 results[status] = results.get(status, 0) + 1
                 files_count += 1
                 
+        self.maybe_rebuild_ann_index()
+        self.evaluate_standing_queries()
+
         ended_at = datetime.datetime.now().isoformat()
         
         # Record Run
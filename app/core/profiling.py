@@ -0,0 +1,178 @@
+
+import cProfile
+import datetime
+import functools
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Opt-in profiling of the indexing/search hot paths. Off unless enabled by
+#   PROJECT_COPILOT_PROFILE=1 (or a sample rate, e.g. 0.1; 0 forces it off), or config:
+#
+#   profiling:
+#     enabled: true
+#     sample_rate: 0.1   # Fraction of calls profiled
+#     tracemalloc: true  # Also report the top allocations (PROJECT_COPILOT_PROFILE_MEMORY=1)
+#     top_n: 25
+#
+# Each profiled call writes <logs_dir>/profiles/<stamp>-<label>.pstats (and .alloc.txt).
+# Disabled means the methods are never wrapped: no per-call cost at all.
+
+PROFILE_ENV = "PROJECT_COPILOT_PROFILE"
+PROFILE_MEMORY_ENV = "PROJECT_COPILOT_PROFILE_MEMORY"
+INDEXING_HOT_PATHS = ("index_file", "index_all", "scan_workspace")
+SEARCH_HOT_PATHS = ("search",)
+DEFAULT_TOP_N = 25
+TRACEMALLOC_FRAMES = 10
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off", "")
+
+@dataclass
+class ProfilingSettings:
+    output_dir: str
+    sample_rate: float = 1.0
+    tracemalloc: bool = False
+    top_n: int = DEFAULT_TOP_N
+
+def settings_from_config(config: Dict[str, Any]) -> Optional[ProfilingSettings]:
+    """
+    Profiling settings from app config data (profiling section, paths.logs_dir) and the env
+    overrides; None when profiling is disabled or there is no logs_dir to write to.
+    """
+    section = config.get("profiling") or {}
+    enabled = bool(section.get("enabled", False))
+    rate = float(section.get("sample_rate", 1.0))
+    memory = bool(section.get("tracemalloc", False))
+
+    # 1. Env overrides config
+    env = os.environ.get(PROFILE_ENV)
+    if env is not None:
+        value = env.strip().lower()
+        if value in _TRUE:
+            enabled = True
+        elif value in _FALSE:
+            enabled = False
+        else:
+            try:
+                rate = float(value)
+                enabled = rate > 0
+            except ValueError:
+                logger.warning(f"Ignoring {PROFILE_ENV}={env!r}: expected 0/1 or a sample rate")
+    if os.environ.get(PROFILE_MEMORY_ENV, "").strip().lower() in _TRUE:
+        memory = True
+    if not enabled:
+        return None
+
+    # 2. Reports go next to the logs
+    logs_dir = (config.get("paths") or {}).get("logs_dir")
+    if not logs_dir:
+        logger.warning("Profiling enabled but paths.logs_dir is not set; profiling disabled")
+        return None
+    return ProfilingSettings(output_dir=os.path.join(str(logs_dir), "profiles"), sample_rate=min(max(rate, 0.0), 1.0),
+                             tracemalloc=memory, top_n=int(section.get("top_n", DEFAULT_TOP_N)))
+
+class Profiler:
+    """
+    Wraps methods of service instances with sampled cProfile (and optional tracemalloc) runs.
+    One profiled run at a time per process: calls nested in a profiled run (index_all ->
+    index_file) or made concurrently on other threads run unprofiled.
+    """
+
+    def __init__(self, settings: ProfilingSettings, rng: Optional[random.Random] = None):
+        self.settings = settings
+        self._rng = rng or random.Random()
+        self._busy = threading.Lock()
+        self._seq = itertools.count(1)
+        self.reports = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["Profiler"]:
+        settings = settings_from_config(config)
+        if settings is None:
+            return None
+        logger.info(f"Profiling enabled: sample_rate={settings.sample_rate}, tracemalloc={settings.tracemalloc}, "
+                    f"reports in {settings.output_dir}")
+        return cls(settings)
+
+    def instrument(self, obj: Any, methods: Iterable[str]):
+        """
+        Replaces obj.<method> (instance attribute) with a profiling wrapper. Internal self.<method>
+        calls go through the wrapper too.
+        """
+        for name in methods:
+            label = f"{type(obj).__name__}.{name}"
+            setattr(obj, name, self.wrap(label, getattr(obj, name)))
+
+    def wrap(self, label: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self._rng.random() >= self.settings.sample_rate or not self._busy.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                return self._profile(label, func, args, kwargs)
+            finally:
+                self._busy.release()
+        return wrapper
+
+    def _profile(self, label: str, func: Callable, args: tuple, kwargs: dict):
+        # 1. Allocations: per-run peak; stop tracing afterwards only if we started it
+        started_tracing = False
+        if self.settings.tracemalloc:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+                started_tracing = True
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            snapshot, peak = None, None
+            if self.settings.tracemalloc:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            # 2. A failed report must never fail the profiled call
+            try:
+                self._write(label, profile, elapsed, snapshot, peak)
+            except OSError as e:
+                logger.warning(f"Could not write profile for {label}: {e}")
+
+    def _write(self, label: str, profile: cProfile.Profile, elapsed: float,
+               snapshot: Optional[tracemalloc.Snapshot], peak: Optional[int]):
+        out_dir = Path(self.settings.output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = out_dir / f"{stamp}-{os.getpid()}-{next(self._seq):04d}-{label}"
+
+        profile.dump_stats(f"{base}.pstats")
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            lines = [f"{label}: {elapsed * 1000:.1f} ms, peak traced memory {peak / 1024:.1f} KiB",
+                     f"Top {self.settings.top_n} allocation sites (live at the end of the run):", ""]
+            for stat in snapshot.statistics("lineno")[:self.settings.top_n]:
+                frame = stat.traceback[0]
+                lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+            Path(f"{base}.alloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        self.reports += 1
+        logger.info(f"Profiled {label} in {elapsed * 1000:.1f} ms -> {base}.pstats")
@@ -0,0 +1,266 @@
+
+import os
+import logging
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.search.embeddings import EMBEDDING_DIM, decode_vectors
+
+logger = logging.getLogger(__name__)
+
+ANN_MAGIC = b"PCIVF001"
+ANN_DEFAULT_NPROBE = 8
+ANN_MIN_VECTORS = 20_000 # Below this, brute force is fast enough
+ANN_DELTA_REBUILD_RATIO = 0.2 # Rebuild when the delta exceeds this share of the base
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50_000
+
+# File layout (little-endian, all sections 8-byte aligned):
+#   header | centroids f32[nlist, dim] | offsets i64[nlist + 1] | chunk_ids i64[n] | artifact_ids i64[n] | vectors f16[n, dim]
+# Lists are contiguous: list j holds rows offsets[j]:offsets[j + 1].
+_HEADER = np.dtype([("magic", "S8"), ("dim", "<i8"), ("nlist", "<i8"), ("n", "<i8")])
+
+
+def ann_index_path(db_path: str) -> str:
+    return f"{db_path}.ivf"
+
+
+def _delta_dtype(dim: int) -> np.dtype:
+    return np.dtype([("chunk_id", "<i8"), ("artifact_id", "<i8"), ("vec", "<f2", (dim,))])
+
+
+def _section_offsets(dim: int, nlist: int, n: int):
+    centroids = _HEADER.itemsize
+    offsets = centroids + nlist * dim * 4
+    chunk_ids = offsets + (nlist + 1) * 8
+    artifact_ids = chunk_ids + n * 8
+    vectors = artifact_ids + n * 8
+    return centroids, offsets, chunk_ids, artifact_ids, vectors
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch: int = 65_536) -> np.ndarray:
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch):
+        labels[start:start + batch] = np.argmax(vectors[start:start + batch] @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means (vectors are L2-normalized, similarity is the dot product).
+    Trains on a sample of at most KMEANS_SAMPLE vectors.
+    """
+    rng = np.random.default_rng(seed)
+    sample = vectors
+    if len(vectors) > KMEANS_SAMPLE:
+        sample = vectors[rng.choice(len(vectors), KMEANS_SAMPLE, replace=False)]
+
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=nlist)
+        empty = counts == 0
+        # Re-seed empty lists with random points
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=True)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+def build_ivf_index(repo: ArtifactsRepo, path: Optional[str] = None, nlist: Optional[int] = None, dim: int = EMBEDDING_DIM) -> int:
+    """
+    Builds the IVF index file from all chunk embeddings and clears the delta.
+    Written to a temp file and swapped in with os.replace. Returns the vector count.
+    """
+    path = path or ann_index_path(repo.db_path)
+    expected = dim * 2
+    chunk_ids, artifact_ids, blobs = [], [], []
+    for chunk_id, artifact_id, blob in repo.iter_chunk_embeddings():
+        if len(blob) == expected:
+            chunk_ids.append(chunk_id)
+            artifact_ids.append(artifact_id)
+            blobs.append(blob)
+
+    n = len(chunk_ids)
+    if n == 0:
+        logger.info("ANN build skipped: no embeddings.")
+        return 0
+
+    vectors = decode_vectors(blobs, dim)
+    nlist = nlist or max(1, int(4 * np.sqrt(n)))
+    nlist = min(nlist, n)
+
+    centroids = train_centroids(vectors, nlist)
+    labels = _assign(vectors, centroids)
+    order = np.argsort(labels, kind="stable")
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(labels, minlength=nlist))
+
+    header = np.zeros(1, dtype=_HEADER)
+    header["magic"], header["dim"], header["nlist"], header["n"] = ANN_MAGIC, dim, nlist, n
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(centroids.astype("<f4").tobytes())
+        f.write(offsets.astype("<i8").tobytes())
+        f.write(np.asarray(chunk_ids, dtype="<i8")[order].tobytes())
+        f.write(np.asarray(artifact_ids, dtype="<i8")[order].tobytes())
+        f.write(vectors[order].astype("<f2").tobytes())
+
+    try:
+        os.replace(tmp_path, path)
+    except PermissionError as e:
+        # Windows: a reader still maps the old file. The delta keeps results correct.
+        logger.warning(f"ANN index swap failed, keeping previous index: {e}")
+        os.remove(tmp_path)
+        return 0
+
+    delta_path = f"{path}.delta"
+    if os.path.exists(delta_path):
+        os.remove(delta_path)
+
+    logger.info(f"ANN index built: {n} vectors, {nlist} lists -> {path}")
+    return n
+
+
+class IvfIndex:
+    """
+    Reader/appender for the on-disk IVF index.
+    Base sections are opened with numpy.memmap (zero-copy) and reopened when the file changes.
+    New vectors are appended to '<path>.delta' and scanned exhaustively until the next rebuild.
+    Entries may be stale (chunks are replaced on re-index): callers filter by live chunk ids.
+    """
+
+    def __init__(self, path: str, dim: int = EMBEDDING_DIM):
+        self.path = path
+        self.delta_path = f"{path}.delta"
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._base_key = None
+        self._delta_key = None
+        self._centroids = self._offsets = self._chunk_ids = self._artifact_ids = self._vectors = None
+        self._delta = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    @property
+    def size(self) -> int:
+        self._refresh()
+        return len(self._chunk_ids) if self._chunk_ids is not None else 0
+
+    @property
+    def delta_count(self) -> int:
+        self._refresh()
+        return len(self._delta) if self._delta is not None else 0
+
+    def _refresh(self):
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+                base_key = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                base_key = None
+            if base_key != self._base_key:
+                self._open_base(base_key)
+
+            try:
+                # mtime too: a delta truncated or recreated to the same size must be re-mapped
+                st = os.stat(self.delta_path)
+                delta_key = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                delta_key = None
+            if delta_key != self._delta_key:
+                self._open_delta(delta_key)
+
+    def _open_base(self, base_key):
+        self._base_key = base_key
+        self._centroids = self._offsets = self._chunk_ids = self._artifact_ids = self._vectors = None
+        if base_key is None:
+            return
+
+        header = np.fromfile(self.path, dtype=_HEADER, count=1)[0]
+        if header["magic"] != ANN_MAGIC or header["dim"] != self.dim:
+            logger.warning(f"Ignoring incompatible ANN index: {self.path}")
+            return
+
+        nlist, n = int(header["nlist"]), int(header["n"])
+        c_off, o_off, id_off, a_off, v_off = _section_offsets(self.dim, nlist, n)
+        self._centroids = np.memmap(self.path, dtype="<f4", mode="r", offset=c_off, shape=(nlist, self.dim))
+        self._offsets = np.memmap(self.path, dtype="<i8", mode="r", offset=o_off, shape=(nlist + 1,))
+        self._chunk_ids = np.memmap(self.path, dtype="<i8", mode="r", offset=id_off, shape=(n,))
+        self._artifact_ids = np.memmap(self.path, dtype="<i8", mode="r", offset=a_off, shape=(n,))
+        self._vectors = np.memmap(self.path, dtype="<f2", mode="r", offset=v_off, shape=(n, self.dim))
+
+    def _open_delta(self, delta_key):
+        self._delta_key = delta_key
+        self._delta = None
+        dtype = _delta_dtype(self.dim)
+        if delta_key:
+            count = delta_key[1] // dtype.itemsize
+            if count:
+                self._delta = np.memmap(self.delta_path, dtype=dtype, mode="r", shape=(count,))
+
+    def append(self, chunk_ids, artifact_ids, vectors):
+        """
+        Incremental update: appends vectors to the delta file (base stays immutable).
+        """
+        records = np.zeros(len(chunk_ids), dtype=_delta_dtype(self.dim))
+        records["chunk_id"] = chunk_ids
+        records["artifact_id"] = artifact_ids
+        records["vec"] = np.asarray(vectors, dtype="<f2")
+        with self._lock:
+            with open(self.delta_path, "ab") as f:
+                f.write(records.tobytes())
+
+    def needs_rebuild(self) -> bool:
+        return self.delta_count > ANN_DELTA_REBUILD_RATIO * max(self.size, 1)
+
+    def search(self, q: np.ndarray, k: int, nprobe: int = ANN_DEFAULT_NPROBE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scores the nprobe lists closest to q plus the whole delta.
+        Returns (chunk_ids, artifact_ids, scores) of the best k candidates, best first.
+        Higher nprobe -> better recall, more latency.
+        """
+        self._refresh()
+        parts_ids, parts_aids, parts_scores = [], [], []
+
+        if self._centroids is not None and len(self._centroids):
+            nprobe = max(1, min(nprobe, len(self._centroids)))
+            probe = np.argpartition(-(self._centroids @ q), nprobe - 1)[:nprobe]
+            for j in probe:
+                start, end = int(self._offsets[j]), int(self._offsets[j + 1])
+                if end > start:
+                    parts_scores.append(self._vectors[start:end].astype(np.float32) @ q)
+                    parts_ids.append(np.asarray(self._chunk_ids[start:end]))
+                    parts_aids.append(np.asarray(self._artifact_ids[start:end]))
+
+        if self._delta is not None:
+            parts_scores.append(self._delta["vec"].astype(np.float32) @ q)
+            parts_ids.append(np.asarray(self._delta["chunk_id"]))
+            parts_aids.append(np.asarray(self._delta["artifact_id"]))
+
+        if not parts_ids:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float32)
+
+        ids = np.concatenate(parts_ids)
+        aids = np.concatenate(parts_aids)
+        scores = np.concatenate(parts_scores)
+
+        # A re-appended chunk id supersedes older copies: keep the last occurrence
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = len(ids) - 1 - last
+        ids, aids, scores = ids[keep], aids[keep], scores[keep]
+
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(ids) else np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return ids[top], aids[top], scores[top]
@@ -0,0 +1,162 @@
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from app.core.artifacts_repo import ArtifactsRepo
+from .models import SearchEvidence, SearchResult, Suggestion
+from .service import SearchService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_READERS = 4
+DEFAULT_QUERY_TIMEOUT = 5.0 # Seconds before a query is interrupted (None = no limit)
+
+
+class SearchCancelled(Exception):
+    """
+    The query was superseded by a newer one from the same session (or cancelled explicitly).
+    """
+
+
+class SearchTimeout(TimeoutError):
+    """
+    The query ran past its timeout and was interrupted.
+    """
+
+
+class _Ticket:
+    __slots__ = ("thread", "cancelled")
+
+    def __init__(self):
+        self.thread: Optional[int] = None # Reader thread running the query
+        self.cancelled: Optional[str] = None # Reason, once cancelled
+
+
+class AsyncSearchService:
+    """
+    asyncio front end for SearchService. Queries run on a reader thread pool, each reader on its
+    own pooled connection; superseded or timed-out queries are stopped with Connection.interrupt().
+
+    session: any hashable (e.g. a UI session id). A new query for a session cancels the
+    previous in-flight one, so fast typing never queues behind stale queries.
+    A cancelled query never returns results, even if it finished between statements
+    (where interrupt() has nothing to stop). Hybrid legs run on the reader itself, not on
+    SearchService's own threads, so the interrupt reaches all of their SQL.
+    """
+
+    def __init__(self, repo: ArtifactsRepo, readers: int = DEFAULT_READERS,
+                 timeout: Optional[float] = DEFAULT_QUERY_TIMEOUT):
+        if not repo.pooled:
+            raise ValueError("AsyncSearchService needs a pooled ArtifactsRepo (ArtifactsRepo(db_path, pooled=True))")
+        self.repo = repo
+        self.service = SearchService(repo, parallel_hybrid=False)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="search-reader")
+        self._lock = threading.Lock()
+        self._latest: Dict[Hashable, _Ticket] = {}
+
+    async def search(self, query: str, session: Optional[Hashable] = None, timeout: Optional[float] = -1,
+                     **kwargs) -> List[SearchEvidence]:
+        """
+        SearchService.search on a reader. timeout=-1 uses the service default.
+        Raises SearchCancelled or SearchTimeout.
+        """
+        return await self._run(self.service.search, (query,), kwargs, session, timeout)
+
+    async def search_with_facets(self, query: str, session: Optional[Hashable] = None, timeout: Optional[float] = -1,
+                                 **kwargs) -> SearchResult:
+        return await self._run(self.service.search_with_facets, (query,), kwargs, session, timeout)
+
+    async def suggest(self, text: str, limit: int = 10, session: Optional[Hashable] = None,
+                      timeout: Optional[float] = -1) -> List[Suggestion]:
+        return await self._run(self.service.suggest, (text,), {"limit": limit}, session, timeout)
+
+    def cancel(self, session: Hashable) -> bool:
+        """
+        Cancels the session's in-flight query, if any.
+        """
+        with self._lock:
+            ticket = self._latest.pop(session, None)
+        if ticket is None:
+            return False
+        self._cancel(ticket, "cancelled")
+        return True
+
+    def close(self):
+        with self._lock:
+            tickets, self._latest = list(self._latest.values()), {}
+        for ticket in tickets:
+            self._cancel(ticket, "service closed")
+        self._executor.shutdown(wait=True)
+        self.service.close()
+
+    async def _run(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any],
+                   session: Optional[Hashable], timeout: Optional[float]):
+        timeout = self.timeout if timeout == -1 else timeout
+        ticket = _Ticket()
+
+        # 1. Supersede the session's previous query
+        if session is not None:
+            with self._lock:
+                previous = self._latest.get(session)
+                self._latest[session] = ticket
+            if previous is not None:
+                self._cancel(previous, "superseded")
+
+        # 2. Run on a reader; interrupt it on timeout or if the awaiting task is cancelled
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._call, ticket, fn, args, kwargs)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._cancel(ticket, "timeout")
+            raise SearchTimeout(f"Query exceeded {timeout}s: {args[0]!r}")
+        except asyncio.CancelledError:
+            self._cancel(ticket, "cancelled")
+            raise
+        finally:
+            if session is not None:
+                with self._lock:
+                    if self._latest.get(session) is ticket:
+                        del self._latest[session]
+
+    def _call(self, ticket: _Ticket, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]):
+        with self._lock:
+            if ticket.cancelled:
+                raise SearchCancelled(ticket.cancelled) # Dropped while still queued
+            ticket.thread = threading.get_ident()
+        try:
+            for attempt in range(2):
+                try:
+                    result = fn(*args, **kwargs)
+                except sqlite3.OperationalError as e:
+                    if "interrupt" not in str(e):
+                        raise
+                    if ticket.cancelled:
+                        raise SearchCancelled(ticket.cancelled) from e
+                    if attempt:
+                        raise
+                    # Late interrupt aimed at the previous query on this connection: retry once
+                    logger.debug(f"Retrying stray interrupt: {args[0]!r}")
+                    continue
+                # Cancelled while outside SQL (Python work between statements): drop the result
+                with self._lock:
+                    if ticket.cancelled:
+                        raise SearchCancelled(ticket.cancelled)
+                return result
+        finally:
+            with self._lock:
+                ticket.thread = None
+
+    def _cancel(self, ticket: _Ticket, reason: str):
+        # Under the lock the ticket's thread cannot move on to another query before the interrupt lands
+        with self._lock:
+            if ticket.cancelled:
+                return
+            ticket.cancelled = reason
+            if ticket.thread is not None:
+                self.repo.interrupt(ticket.thread)
@@ -0,0 +1,126 @@
+
+import re
+import zlib
+from functools import lru_cache
+from typing import List, Tuple
+
+# numpy is imported lazily: most sessions never embed anything.
+
+EMBEDDING_DIM = 256
+HASH_BUCKETS = 4096
+PROJECTION_SEED = 20260103
+CHUNK_MAX_CHARS = 1000
+EMBED_BATCH_SIZE = 64
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def chunk_text(text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[str]:
+    """
+    Splits text into consecutive chunks of at most max_chars.
+    Cuts prefer paragraph, then line, then word boundaries.
+    Chunks partition the text exactly: "".join(chunks) == text.
+    """
+    if not text:
+        return []
+
+    chunks = []
+    start = 0
+    n = len(text)
+    while start < n:
+        end = min(start + max_chars, n)
+        if end < n:
+            window = text[start:end]
+            cut = -1
+            for sep in ("\n\n", "\n", " "):
+                cut = window.rfind(sep)
+                if cut > max_chars // 2:
+                    cut += len(sep)
+                    break
+                cut = -1
+            if cut > 0:
+                end = start + cut
+        chunks.append(text[start:end])
+        start = end
+
+    return chunks
+
+
+@lru_cache(maxsize=200_000)
+def _token_features(token: str) -> Tuple[Tuple[int, float], ...]:
+    """
+    Hashed features for one token: the word itself plus boundary-marked char 3-grams.
+    crc32 is used (not hash()) so buckets are stable across processes.
+    """
+    grams = [token]
+    marked = f"<{token}>"
+    if len(marked) > 3:
+        grams.extend(marked[i:i + 3] for i in range(len(marked) - 2))
+
+    feats = []
+    for g in grams:
+        h = zlib.crc32(g.encode("utf-8"))
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        feats.append((h % HASH_BUCKETS, sign))
+    return tuple(feats)
+
+
+class HashingEmbedder:
+    """
+    Offline text embedder: signed feature hashing of words and char 3-grams
+    (sublinear TF weighting), then a fixed seeded Gaussian random projection.
+    Deterministic, no network, no GPU. Output rows are L2-normalized float32.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, buckets: int = HASH_BUCKETS, seed: int = PROJECTION_SEED):
+        import numpy as np
+
+        self.dim = dim
+        self.buckets = buckets
+        rng = np.random.default_rng(seed)
+        self._projection = (rng.standard_normal((buckets, dim)) / np.sqrt(dim)).astype(np.float32)
+
+    def embed(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE):
+        import numpy as np
+
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for b_start in range(0, len(texts), batch_size):
+            batch = texts[b_start:b_start + batch_size]
+            hashed = np.zeros((len(batch), self.buckets), dtype=np.float32)
+
+            for row, text in enumerate(batch):
+                counts = {}
+                for token in _TOKEN_RE.findall(text.lower()):
+                    counts[token] = counts.get(token, 0) + 1
+                for token, tf in counts.items():
+                    weight = 1.0 + np.log(tf)
+                    for bucket, sign in _token_features(token):
+                        hashed[row, bucket] += sign * weight
+
+            projected = hashed @ self._projection
+            norms = np.linalg.norm(projected, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            out[b_start:b_start + len(batch)] = projected / norms
+
+        return out
+
+    def embed_query(self, query: str):
+        return self.embed([query])[0]
+
+
+def encode_vectors(vectors) -> List[bytes]:
+    """
+    Encodes a (n, dim) array into compact float16 little-endian blobs.
+    """
+    import numpy as np
+    return [row.tobytes() for row in np.asarray(vectors, dtype="<f2")]
+
+
+def decode_vectors(blobs: List[bytes], dim: int = EMBEDDING_DIM):
+    """
+    Decodes float16 blobs into a (n, dim) float32 matrix.
+    """
+    import numpy as np
+    if not blobs:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.frombuffer(b"".join(blobs), dtype="<f2").reshape(-1, dim).astype(np.float32)
@@ -0,0 +1,114 @@
+
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+# numpy is imported lazily, as in embeddings.
+
+NUM_PERM = 128
+LSH_BANDS = 16 # 16 bands x 8 rows: candidate pairs start at ~0.7 Jaccard
+LSH_ROWS = 8
+SHINGLE_WORDS = 5
+DUP_THRESHOLD = 0.8 # Estimated Jaccard at which two artifacts are near-duplicates
+MINHASH_SEED = 20260118
+_PRIME = (1 << 31) - 1 # Mersenne prime; a * x stays below 2**62 in uint64
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_WORDS) -> List[int]:
+    """
+    crc32 of each distinct w-shingle (size consecutive lowercased words).
+    Short texts (fewer words than size) yield one shingle.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return []
+    if len(words) <= size:
+        return [zlib.crc32(" ".join(words).encode("utf-8"))]
+    return list({zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)})
+
+
+class MinHasher:
+    """
+    MinHash over word shingles with NUM_PERM universal hash functions (a * x + b) mod p.
+    Signatures are uint32 arrays; equal positions estimate Jaccard similarity.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = MINHASH_SEED):
+        import numpy as np
+
+        self.num_perm = num_perm
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text: str, batch: int = 4096):
+        """
+        Returns the signature of text, or None when it has no words.
+        """
+        import numpy as np
+
+        hashes = shingle_hashes(text)
+        if not hashes:
+            return None
+        x = np.asarray(hashes, dtype=np.uint64) % _PRIME
+        sig = np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        for start in range(0, len(x), batch):
+            hashed = (self._a * x[start:start + batch] + self._b) % _PRIME
+            np.minimum(sig, hashed.min(axis=1), out=sig)
+        return sig.astype(np.uint32)
+
+
+def encode_signature(sig) -> bytes:
+    import numpy as np
+    return np.asarray(sig, dtype="<u4").tobytes()
+
+
+def decode_signature(blob: bytes):
+    import numpy as np
+    return np.frombuffer(blob, dtype="<u4")
+
+
+def similarity(sig_a, sig_b) -> float:
+    """
+    Estimated Jaccard similarity (share of equal signature positions).
+    """
+    return float((sig_a == sig_b).mean())
+
+
+def band_keys(sig, bands: int = LSH_BANDS, rows: int = LSH_ROWS) -> List[Tuple[int, int]]:
+    """
+    LSH buckets: (band, crc32 of the band's rows). Artifacts sharing any bucket are candidates.
+    """
+    data = encode_signature(sig)
+    width = rows * 4
+    return [(band, zlib.crc32(data[band * width:(band + 1) * width])) for band in range(bands)]
+
+
+def assign_duplicate_group(repo, artifact_id: int, text: str, hasher: Optional[MinHasher] = None,
+                           threshold: float = DUP_THRESHOLD) -> Optional[int]:
+    """
+    Computes the artifact's signature, finds LSH candidates sharing a bucket, verifies them
+    against the threshold and stores the signature + buckets with a duplicate group.
+    Matching groups are merged into the smallest group id. Returns the group (None for empty text).
+    """
+    hasher = hasher or MinHasher()
+    sig = hasher.signature(text)
+    if sig is None:
+        repo.delete_minhash(artifact_id)
+        return None
+
+    keys = band_keys(sig)
+    groups = set()
+    for candidate_id, blob, group in repo.find_minhash_candidates(keys, exclude_id=artifact_id):
+        if similarity(sig, decode_signature(blob)) >= threshold:
+            groups.add(group)
+
+    group = min(groups) if groups else None
+    return repo.save_minhash(artifact_id, encode_signature(sig), keys, group, merge_groups=sorted(groups - {group}))
+
+
+def collapse_key(artifact_id: int, groups: Dict[int, int]) -> int:
+    # Artifacts without a signature are their own group (negative ids never clash with group ids)
+    return groups.get(artifact_id, -artifact_id)
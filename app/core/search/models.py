@@ -1,5 +1,7 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Tuple
+
+FACET_NONE = "(none)" # Facet bucket (and filter value) for a missing ext, status, date or folder
 
 @dataclass
 class SearchEvidence:
@@ -11,4 +13,54 @@ class SearchEvidence:
     source_path: str
     snippet: str
     score: Optional[float] = None
-    search_mode: str = "unknown" # FTS or LIKE
+    search_mode: str = "unknown" # FTS, LIKE, SEMANTIC or HYBRID
+    signals: Dict[str, float] = field(default_factory=dict) # Per-signal scores (hybrid)
+    match_offsets: List[Tuple[int, int]] = field(default_factory=list) # (start, end) in artifact_text.text, top hits only
+
+@dataclass
+class SearchResult:
+    """
+    One page of evidence plus facet counts over the full match set.
+    facets: {"ext": {".pdf": 3}, "status": {...}, "year": {...}, "month": {...}, "folder": {...}}
+    """
+    items: List[SearchEvidence]
+    facets: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    total: int = 0
+
+@dataclass
+class Suggestion:
+    """
+    Type-ahead completion. text is the full query to run (earlier words kept).
+    """
+    text: str
+    kind: str # "term" or "filename"
+    doc_count: int = 0
+
+@dataclass
+class SavedQuery:
+    """
+    Standing query. new_hits = unseen matches recorded since the user last marked them seen.
+    """
+    id: int
+    name: str
+    query: str
+    filters: Dict[str, str] = field(default_factory=dict)
+    last_evaluated_generation: int = 0
+    last_evaluated_at: Optional[str] = None
+    new_hits: int = 0
+
+@dataclass
+class TextPreview:
+    """
+    Window of the stored text (artifact_text) around a match.
+    start/total_chars are character offsets; highlights are relative to text.
+    """
+    artifact_id: int
+    text: str
+    start: int
+    total_chars: int
+    highlights: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
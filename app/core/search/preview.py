@@ -0,0 +1,52 @@
+
+import html
+from typing import List, Optional, Tuple
+
+from .models import TextPreview
+
+PREVIEW_WINDOW = 3000 # Characters of stored text shown around a match
+PREVIEW_LEAD = 400 # Characters kept before the focused match
+BOUNDARY_SLACK = 120 # How far to look for a line/word break when trimming the window start
+
+
+def text_preview(repo, artifact_id: int, offsets: Optional[List[Tuple[int, int]]] = None, focus: int = 0,
+                 window: int = PREVIEW_WINDOW) -> Optional[TextPreview]:
+    """
+    Reads only the window of artifact_text around offsets[focus] (document head without offsets).
+    Returns None when the artifact has no stored text (not indexed yet).
+    """
+    offsets = offsets or []
+    anchor = offsets[min(max(focus, 0), len(offsets) - 1)][0] if offsets else 0
+    start = max(0, anchor - PREVIEW_LEAD)
+
+    text, total = repo.get_text_window(artifact_id, start, window)
+    if text is None:
+        return None
+
+    # 1. Start on a line (else word) boundary so the window doesn't open mid-word
+    if start > 0:
+        head = text[:min(BOUNDARY_SLACK, anchor - start)]
+        cut = head.rfind("\n") + 1 or head.rfind(" ") + 1
+        text, start = text[cut:], start + cut
+
+    # 2. Highlights relative to the window, clipped to it
+    end = start + len(text)
+    highlights = [(max(s, start) - start, min(e, end) - start) for s, e in offsets if e > start and s < end]
+    return TextPreview(artifact_id=artifact_id, text=text, start=start, total_chars=total, highlights=highlights)
+
+
+def highlight_html(text: str, highlights: List[Tuple[int, int]], tag: str = "mark") -> str:
+    """
+    HTML-escapes text and wraps each (start, end) span in <tag>. Overlapping spans are clipped, never nested.
+    """
+    parts = []
+    pos = 0
+    for s, e in sorted(highlights):
+        s = max(s, pos)
+        if e <= s:
+            continue
+        parts.append(html.escape(text[pos:s]))
+        parts.append(f"<{tag}>{html.escape(text[s:e])}</{tag}>")
+        pos = e
+    parts.append(html.escape(text[pos:]))
+    return "".join(parts)
@@ -0,0 +1,133 @@
+
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Query syntax accepted from users (compiled to an FTS5 MATCH expression):
+#   pump valve            both terms (implicit AND)
+#   "relief valve"        phrase
+#   pres*                 prefix
+#   filename:report       field filter (filename, path); also filename:"q3 report", path:(a OR b)
+#   a OR b, a AND b, a NOT b, ( ... )   operators must be uppercase
+#   NOT a b               b without a (a leading NOT excludes from the rest of the query)
+# Everything else is literal text: each term is emitted as a quoted FTS5 string,
+# so quotes, hyphens, colons etc. in user input can never produce a syntax error.
+
+FTS_FIELDS = ("filename", "path")
+OPERATORS = ("AND", "OR", "NOT")
+
+_TOKEN_RE = re.compile(r"""
+    (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<field>(?:filename|path)):(?=[^\s)])
+  | "(?P<phrase>[^"]*)(?:"|$)(?P<pstar>\*)?
+  | (?P<word>[^\s()"]+)
+""", re.VERBOSE | re.IGNORECASE)
+
+_WORD_CHAR_RE = re.compile(r"\w", re.UNICODE)
+
+
+def _tokenize(text: str) -> List[Tuple]:
+    tokens = []
+    for m in _TOKEN_RE.finditer(text):
+        if m.group("lparen"):
+            tokens.append(("(",))
+        elif m.group("rparen"):
+            tokens.append((")",))
+        elif m.group("field"):
+            tokens.append(("field", m.group("field").lower()))
+        elif m.group("phrase") is not None:
+            tokens.append(("term", m.group("phrase"), bool(m.group("pstar"))))
+        else:
+            word = m.group("word")
+            if word in OPERATORS:
+                tokens.append(("op", word))
+            else:
+                stripped = word.rstrip("*")
+                tokens.append(("term", stripped, stripped != word))
+    return tokens
+
+
+def _quote(term: str, prefix: bool) -> Optional[str]:
+    # Terms without word characters tokenize to nothing in FTS5; drop them
+    if not _WORD_CHAR_RE.search(term):
+        return None
+    quoted = '"' + term.replace('"', '""') + '"'
+    return f"{quoted} *" if prefix else quoted
+
+
+def _parse(tokens: List[Tuple], pos: int, depth: int) -> Tuple[str, int]:
+    """
+    Compiles tokens up to the matching ')' (or the end). Returns (expression, next position).
+    Dangling operators and unbalanced parentheses are dropped. FTS5's NOT is binary,
+    so leading negations move to the end: "NOT a b c" -> "(b AND c) NOT a". A group with
+    nothing but negations ("NOT a") compiles to nothing.
+    """
+    out = []
+    negated = []
+    pending_op = None
+    field = None
+    negate_next = False
+
+    while pos < len(tokens):
+        tok = tokens[pos]
+        pos += 1
+        kind = tok[0]
+
+        if kind == ")":
+            if depth > 0:
+                break
+            continue
+
+        if kind == "op":
+            if out:
+                pending_op = tok[1]
+            elif tok[1] == "NOT":
+                negate_next = True
+            continue
+
+        if kind == "field":
+            field = tok[1]
+            continue
+
+        if kind == "(":
+            inner, pos = _parse(tokens, pos, depth + 1)
+            operand = f"({inner})" if inner else None
+        else:
+            operand = _quote(tok[1], tok[2])
+
+        if operand and field:
+            operand = f"{field} : {operand}"
+        field = None
+
+        if operand is None:
+            continue
+        if negate_next:
+            negate_next = False
+            negated.append(operand)
+            continue
+
+        if out:
+            out.append(pending_op or "AND")
+        out.append(operand)
+        pending_op = None
+
+    expression = " ".join(out)
+    if out and negated:
+        # NOT binds tighter than AND/OR in FTS5: exclude from the whole group
+        if len(out) > 1:
+            expression = f"({expression})"
+        expression += "".join(f" NOT {operand}" for operand in negated)
+    return expression, pos
+
+
+@lru_cache(maxsize=1024)
+def compile_fts_query(text: str) -> Optional[str]:
+    """
+    Compiles user query text into a safe FTS5 MATCH expression.
+    Returns None when nothing searchable remains (e.g. only punctuation).
+    """
+    if not text or not text.strip():
+        return None
+    expression, _ = _parse(_tokenize(text), 0, 0)
+    return expression or None
@@ -1,42 +1,323 @@
-from typing import List
-from .models import SearchEvidence
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from .models import FACET_NONE, SearchEvidence, SearchResult, Suggestion
+from .minhash import collapse_key
 from app.core.artifacts_repo import ArtifactsRepo
 
+SEARCH_MODES = ("lexical", "semantic", "hybrid")
+RRF_K = 60 # Reciprocal rank fusion damping constant
+HYBRID_MIN_DEPTH = 50 # Candidates fetched per leg before fusion
+RESULT_CACHE_SIZE = 64
+MATCH_OFFSETS_TOP = 10 # Hits per page that get match offsets for highlighted previews
+
 class SearchService:
-    def __init__(self, artifacts_repo: ArtifactsRepo):
+    def __init__(self, artifacts_repo: ArtifactsRepo, parallel_hybrid: bool = True):
+        # parallel_hybrid=False runs both hybrid legs on the calling thread (and its connection),
+        # so callers that interrupt that connection (AsyncSearchService) can stop all of the work
         self.repo = artifacts_repo
+        self.parallel_hybrid = parallel_hybrid
+        self._vectors = None
+        self._suggestions = None
+        self._executor = None
+        self._result_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def close(self):
+        """
+        Stops the hybrid leg threads (if any were started). The repo is owned by the caller.
+        """
+        with self._cache_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _hybrid_executor(self) -> ThreadPoolExecutor:
+        # Created on first hybrid search; under the lock so concurrent callers share one pool
+        with self._cache_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-search")
+            return self._executor
+
+    @property
+    def vectors(self):
+        # Lazy: keeps numpy off the import path until semantic search is used
+        if self._vectors is None:
+            from .vector_index import VectorSearcher
+            self._vectors = VectorSearcher(self.repo)
+        return self._vectors
+
+    def suggest(self, text: str, limit: int = 10) -> List[Suggestion]:
+        """
+        Type-ahead completions for the last word of text (terms by document frequency, then filenames).
+        """
+        if self._suggestions is None:
+            from .suggest import SuggestionIndex
+            self._suggestions = SuggestionIndex(self.repo)
+        return self._suggestions.suggest(text, limit=limit)
 
-    def search(self, query: str, limit: int = 20) -> List[SearchEvidence]:
+    def search(self, query: str, limit: int = 20, offset: int = 0, mode: str = "lexical",
+               filters: Optional[Dict[str, Any]] = None, collapse: bool = False) -> List[SearchEvidence]:
         """
         Searches artifacts and returns structured evidence.
+        Two-phase: rank IDs from the index, then hydrate only the requested page.
+        mode: "lexical" (FTS or LIKE), "semantic" (vector cosine over chunks)
+              or "hybrid" (both legs in parallel, fused with reciprocal rank fusion).
+        filters (lexical only): ext, status, year, month ('YYYY-MM'), folder (path prefix).
+        collapse: keep only the best-ranked member of each near-duplicate group (MinHash/LSH).
         """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+
         if not query.strip():
             # P2: Validation in Service/UI. 
             # If repo doesn't handle empty query properly or we want to be strict:
             return []
-            
-        raw_results = self.repo.search_artifacts(query, limit=limit)
+
+        if mode == "semantic":
+            return self._semantic_search(query, limit, offset, collapse)
+        if mode == "hybrid":
+            return self._hybrid_search(query, limit, offset, collapse)
+
+        # Phase 1: ranked IDs + scores (index only)
+        ranked = self.repo.rank_artifact_ids(query, limit=limit, offset=offset, filters=filters, collapse=collapse)
+
+        # Phase 2: metadata + snippets for this page only
+        raw_results = self.repo.hydrate_artifacts(ranked, query)
         
         evidence_list = []
         for r in raw_results:
-            # Determine search mode from result if possible, or infer from repo state
-            # Repo implementation of search_artifacts needs to ideally return this info
-            # For now, we know if repo.fts_enabled is true, it used FTS.
-            # But specific query might fall back or be mixed? 
             # Repo logic is: if fts_enabled -> matches FTS. else -> matches LIKE.
-            # We can pass this info from repo or infer it.
-            # Let's infer for now based on repo state, as it's a global switch there.
-            mode = "FTS" if self.repo.fts_enabled else "LIKE"
+            # It's a global switch there, so infer mode from repo state.
+            lexical_mode = "FTS" if self.repo.fts_enabled else "LIKE"
             
             # Map valid fields
             ev = SearchEvidence(
                 artifact_id=r['id'],
                 artifact_type=r['ext'], # simple mapping for MVP
                 source_path=r['path'],
-                snippet=r.get('snippet', ''),
-                score=None, # FTS rank not always exposed as float yet, keeping None for MVP
-                search_mode=mode
+                snippet=r.get('snippet') or '',
+                score=r.get('score'), # -bm25 for FTS (higher is better), None for LIKE
+                search_mode=lexical_mode
             )
             evidence_list.append(ev)
-            
+
+        self._attach_match_offsets(evidence_list, query)
+        return evidence_list
+
+    def _attach_match_offsets(self, evidence_list: List[SearchEvidence], query: str):
+        """
+        Fills match_offsets for the top hits so previews can highlight from the stored text.
+        """
+        top = evidence_list[:MATCH_OFFSETS_TOP]
+        if not top:
+            return
+        offsets = self.repo.match_offsets([ev.artifact_id for ev in top], query)
+        for ev in top:
+            ev.match_offsets = offsets.get(ev.artifact_id, [])
+
+    def search_with_facets(self, query: str, limit: int = 20, offset: int = 0,
+                           filters: Optional[Dict[str, Any]] = None, root: Optional[str] = None,
+                           collapse: bool = False) -> SearchResult:
+        """
+        Lexical search page + facet counts (ext, status, year, month, top-level folder)
+        over the full match set. Facets come from one aggregated SQL pass.
+        Results are cached per (query, filters, page, collapse, index generation).
+        collapse applies to the page only; facet counts cover every match.
+        root: ingest dir; folder facets are its top-level subfolders (else parent dirs).
+        """
+        if not query.strip():
+            return SearchResult(items=[])
+
+        filters = {k: v for k, v in (filters or {}).items() if v}
+        key = (query, tuple(sorted(filters.items())), limit, offset, root, collapse, self.repo.get_generation())
+        with self._cache_lock:
+            if key in self._result_cache:
+                self._result_cache.move_to_end(key)
+                return self._result_cache[key]
+
+        sql_filters = self._root_folder_filter(filters, root)
+        items = self.search(query, limit=limit, offset=offset, filters=sql_filters, collapse=collapse)
+        facets = self._rollup_facets(self.repo.facet_counts(query, sql_filters), root)
+        result = SearchResult(items=items, facets=facets, total=sum(facets["ext"].values()))
+
+        with self._cache_lock:
+            self._result_cache[key] = result
+            while len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _root_folder_filter(filters: Dict[str, Any], root: Optional[str]) -> Dict[str, Any]:
+        # The root folder bucket counts only files directly in root (subfolders have their own
+        # buckets), so filtering on it must not take in the whole tree as a prefix would
+        if root and filters.get("folder") == root.rstrip("/\\") + os.sep:
+            filters = dict(filters)
+            filters["dir"] = filters.pop("folder")
+        return filters
+
+    @staticmethod
+    def _rollup_facets(rows, root: Optional[str]) -> Dict[str, Dict[str, int]]:
+        facets = {"ext": {}, "status": {}, "year": {}, "month": {}, "folder": {}}
+
+        def add(name, value, count):
+            if value is None or value == "":
+                value = FACET_NONE
+            facets[name][value] = facets[name].get(value, 0) + count
+
+        root_prefix = None
+        if root:
+            root_prefix = root.rstrip("/\\") + os.sep
+
+        for ext, status, month, directory, count in rows:
+            add("ext", ext, count)
+            add("status", status, count)
+            add("month", month, count)
+            add("year", month[:4] if month else None, count)
+
+            # Folder value is a path prefix usable as filters['folder']
+            folder = directory
+            if root_prefix and directory and directory.startswith(root_prefix):
+                rest = directory[len(root_prefix):]
+                top = rest.replace("\\", "/").split("/", 1)[0]
+                folder = root_prefix + top + os.sep if top else root_prefix
+            add("folder", folder, count)
+
+        # Most frequent first
+        return {name: dict(sorted(values.items(), key=lambda kv: (-kv[1], kv[0]))) for name, values in facets.items()}
+
+    def _collapse(self, items: List[tuple]) -> List[tuple]:
+        """
+        Keeps the first (best-ranked) item per near-duplicate group. items start with artifact_id.
+        """
+        groups = self.repo.get_dup_groups([item[0] for item in items])
+        seen, kept = set(), []
+        for item in items:
+            key = collapse_key(item[0], groups)
+            if key not in seen:
+                seen.add(key)
+                kept.append(item)
+        return kept
+
+    def _semantic_search(self, query: str, limit: int, offset: int, collapse: bool = False) -> List[SearchEvidence]:
+        if collapse:
+            # Over-fetch, then collapse; deepen until the page is full or the index runs out
+            wanted = offset + limit
+            depth = wanted * 4
+            while True:
+                ranked = self.vectors.search(query, limit=depth)
+                hits = self._collapse(ranked)
+                if len(hits) >= wanted or len(ranked) < depth:
+                    break
+                depth *= 2
+            hits = hits[offset:wanted]
+        else:
+            hits = self.vectors.search(query, limit=limit, offset=offset)
+        if not hits:
+            return []
+
+        # Snippet = best matching chunk, not the head of the document
+        chunks = self.repo.get_chunks([chunk_id for _, _, chunk_id in hits])
+        rows = self.repo.hydrate_artifacts([(aid, score) for aid, score, _ in hits])
+
+        best_chunk = {aid: chunk_id for aid, _, chunk_id in hits}
+        evidence_list = []
+        for r in rows:
+            chunk = chunks.get(best_chunk[r['id']])
+            snippet = chunk['content_text'][:400] if chunk else (r.get('snippet') or '')
+            evidence_list.append(SearchEvidence(
+                artifact_id=r['id'],
+                artifact_type=r['ext'],
+                source_path=r['path'],
+                snippet=snippet,
+                score=r.get('score'), # cosine similarity
+                search_mode="SEMANTIC"
+            ))
+        return evidence_list
+
+    def _hybrid_legs(self, query: str, depth: int):
+        if self.parallel_hybrid:
+            executor = self._hybrid_executor()
+            lexical_future = executor.submit(self.repo.rank_artifact_ids, query, depth)
+            vector_future = executor.submit(self.vectors.search, query, depth)
+            return lexical_future.result(), vector_future.result()
+        return self.repo.rank_artifact_ids(query, depth), self.vectors.search(query, depth)
+
+    def _fuse(self, lexical: List[tuple], vector: List[tuple]):
+        """
+        RRF over both rankings. Returns ([(artifact_id, score)] best first, signals, best_chunk).
+        """
+        lexical_key = "fts" if self.repo.fts_enabled else "like"
+        fused: Dict[int, float] = {}
+        signals: Dict[int, Dict[str, float]] = {}
+
+        for rank, (aid, score) in enumerate(lexical, start=1):
+            fused[aid] = fused.get(aid, 0.0) + 1.0 / (RRF_K + rank)
+            sig = signals.setdefault(aid, {})
+            sig[f"{lexical_key}_rank"] = rank
+            if score is not None:
+                sig[lexical_key] = score
+
+        best_chunk = {}
+        for rank, (aid, score, chunk_id) in enumerate(vector, start=1):
+            fused[aid] = fused.get(aid, 0.0) + 1.0 / (RRF_K + rank)
+            sig = signals.setdefault(aid, {})
+            sig["semantic_rank"] = rank
+            sig["semantic"] = score
+            best_chunk[aid] = chunk_id
+
+        # Deterministic: fused score desc, then artifact id
+        ordered = sorted(fused.items(), key=lambda kv: (-kv[1], kv[0]))
+        return ordered, signals, best_chunk
+
+    def _hybrid_search(self, query: str, limit: int, offset: int, collapse: bool = False) -> List[SearchEvidence]:
+        """
+        Runs the lexical and vector legs, then fuses the two rankings with RRF:
+        score = sum(1 / (RRF_K + rank)). With parallel_hybrid the legs run concurrently
+        (each on its own thread and SQLite connection), so latency is bounded by the slower
+        leg; otherwise they run one after the other on the calling thread.
+        """
+        depth = max(HYBRID_MIN_DEPTH, 2 * (offset + limit))
+        while True:
+            lexical, vector = self._hybrid_legs(query, depth)
+            ordered, signals, best_chunk = self._fuse(lexical, vector)
+            if collapse:
+                ordered = self._collapse(ordered)
+                # Near-duplicates can fill the whole fetch: deepen both legs until the page is full
+                if len(ordered) < offset + limit and (len(lexical) >= depth or len(vector) >= depth):
+                    depth *= 2
+                    continue
+            break
+
+        ordered = ordered[offset:offset + limit]
+        if not ordered:
+            return []
+
+        rows = self.repo.hydrate_artifacts(ordered, query if lexical else "")
+
+        # Vector-only hits get their best chunk as snippet instead of the document head
+        lexical_ids = {aid for aid, _ in lexical}
+        chunks = self.repo.get_chunks([best_chunk[r['id']] for r in rows if r['id'] not in lexical_ids and r['id'] in best_chunk])
+        by_chunk = {c['artifact_id']: c for c in chunks.values()}
+
+        evidence_list = []
+        for r in rows:
+            snippet = r.get('snippet') or ''
+            if r['id'] in by_chunk:
+                snippet = by_chunk[r['id']]['content_text'][:400]
+            sig = signals[r['id']]
+            sig["rrf"] = r['score']
+            evidence_list.append(SearchEvidence(
+                artifact_id=r['id'],
+                artifact_type=r['ext'],
+                source_path=r['path'],
+                snippet=snippet,
+                score=r['score'],
+                search_mode="HYBRID",
+                signals=sig
+            ))
+        if lexical:
+            self._attach_match_offsets(evidence_list, query)
         return evidence_list
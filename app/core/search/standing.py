@@ -0,0 +1,69 @@
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.search.models import SavedQuery
+from app.core.search.query import compile_fts_query
+
+logger = logging.getLogger(__name__)
+
+class StandingQueryService:
+    """
+    Saved queries evaluated incrementally (percolator style).
+    Each query remembers the index generation it was last matched at; evaluate() only
+    matches artifacts whose text was written after that (artifacts.index_generation),
+    so a run costs in proportion to what was indexed, not to the corpus size.
+    """
+
+    def __init__(self, repo: ArtifactsRepo):
+        self.repo = repo
+
+    def add(self, name: str, query: str, filters: Optional[Dict[str, Any]] = None) -> int:
+        if not query or not query.strip():
+            raise ValueError("Standing query must not be empty")
+        if self.repo.fts_enabled and compile_fts_query(query) is None:
+            raise ValueError(f"Query has no searchable terms: {query!r}")
+        filters = {k: v for k, v in (filters or {}).items() if v}
+        return self.repo.add_saved_query(name.strip() or query.strip(), query.strip(), filters)
+
+    def remove(self, query_id: int):
+        self.repo.delete_saved_query(query_id)
+
+    def list(self) -> List[SavedQuery]:
+        return [SavedQuery(
+            id=r['id'],
+            name=r['name'],
+            query=r['query'],
+            filters=r['filters'],
+            last_evaluated_generation=r['last_evaluated_generation'],
+            last_evaluated_at=r['last_evaluated_at'],
+            new_hits=r['new_hits'],
+        ) for r in self.repo.list_saved_queries()]
+
+    def evaluate(self) -> Dict[int, int]:
+        """
+        Matches every saved query against artifacts indexed since its last evaluation.
+        Returns {query_id: matches found in this run} for queries that had anything to evaluate.
+        """
+        generation = self.repo.get_generation()
+        found = {}
+        for q in self.list():
+            if q.last_evaluated_generation >= generation:
+                continue
+            try:
+                ids = self.repo.match_new_artifacts(q.query, q.filters, q.last_evaluated_generation, generation)
+                self.repo.record_saved_query_hits(q.id, ids, generation)
+                found[q.id] = len(ids)
+            except Exception as e:
+                # One broken query must not block the others
+                logger.error(f"Standing query {q.id} ({q.query!r}) failed: {e}")
+        if found:
+            logger.info(f"Standing queries evaluated at generation {generation}: {found}")
+        return found
+
+    def hits(self, query_id: int, unseen_only: bool = True, limit: int = 50) -> List[Dict[str, Any]]:
+        return self.repo.get_saved_query_hits(query_id, unseen_only=unseen_only, limit=limit)
+
+    def mark_seen(self, query_id: Optional[int] = None):
+        self.repo.mark_saved_query_hits_seen(query_id)
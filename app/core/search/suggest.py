@@ -0,0 +1,89 @@
+
+import bisect
+import heapq
+import logging
+import threading
+import time
+from typing import List
+
+from app.core.artifacts_repo import ArtifactsRepo
+from .models import Suggestion
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_MIN_REFRESH_SECONDS = 5.0 # Throttle reloads while an indexing run bumps the generation
+_PREFIX_END = "\U0010ffff"
+
+class SuggestionIndex:
+    """
+    In-memory sorted snapshots of the FTS5 vocabulary (term, doc frequency) and of filenames.
+    Prefix lookups are a bisect + top-N by document frequency, i.e. no SQL per keystroke.
+    The snapshot is reloaded when the index generation changes (at most every few seconds).
+    """
+
+    def __init__(self, repo: ArtifactsRepo, min_refresh_seconds: float = SUGGEST_MIN_REFRESH_SECONDS):
+        self.repo = repo
+        self.min_refresh_seconds = min_refresh_seconds
+        self._lock = threading.Lock()
+        self._generation = None
+        self._loaded_at = 0.0
+        self._terms: List[str] = []
+        self._term_docs: List[int] = []
+        self._filename_keys: List[str] = []
+        self._filenames: List[str] = []
+
+    def _refresh(self):
+        generation = self.repo.get_generation()
+        with self._lock:
+            if generation == self._generation:
+                return
+            if self._generation is not None and time.monotonic() - self._loaded_at < self.min_refresh_seconds:
+                return
+
+            terms, docs = [], []
+            if self.repo.fts_enabled:
+                for term, doc in self.repo.iter_vocabulary():
+                    terms.append(term)
+                    docs.append(doc)
+
+            names = sorted({name for name in self.repo.iter_filenames() if name}, key=str.lower)
+
+            self._terms, self._term_docs = terms, docs
+            self._filename_keys = [n.lower() for n in names]
+            self._filenames = names
+            self._generation = generation
+            self._loaded_at = time.monotonic()
+            logger.debug(f"Suggestion snapshot: {len(terms)} terms, {len(names)} filenames (generation={generation})")
+
+    def suggest(self, text: str, limit: int = 10) -> List[Suggestion]:
+        """
+        Completes the last word of text. Terms are ranked by document frequency,
+        followed by filenames starting with the same prefix.
+        """
+        if not text or text[-1].isspace():
+            return []
+
+        head, _, prefix = text.rpartition(" ")
+        head = f"{head} " if head else ""
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+
+        self._refresh()
+        terms, term_docs = self._terms, self._term_docs
+
+        lo = bisect.bisect_left(terms, prefix)
+        hi = bisect.bisect_left(terms, prefix + _PREFIX_END, lo)
+        best = heapq.nlargest(limit, range(lo, hi), key=lambda i: (term_docs[i], -i))
+        results = [
+            Suggestion(text=head + terms[i], kind="term", doc_count=term_docs[i])
+            for i in best if terms[i] != prefix
+        ]
+
+        keys = self._filename_keys
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + _PREFIX_END, lo)
+        for i in range(lo, min(hi, lo + limit)):
+            results.append(Suggestion(text=head + self._filenames[i], kind="filename", doc_count=1))
+
+        return results[:limit]
@@ -0,0 +1,130 @@
+
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.search.embeddings import HashingEmbedder, decode_vectors
+
+logger = logging.getLogger(__name__)
+
+class VectorSearcher:
+    """
+    Cosine top-k over chunks.embedding.
+    Uses the on-disk IVF index ('<db>.ivf', see ann_index) when present, probing `nprobe` lists.
+    Otherwise exact brute force over a decoded matrix cached in memory per index generation.
+    """
+
+    def __init__(self, repo: ArtifactsRepo, embedder: Optional[HashingEmbedder] = None, nprobe: Optional[int] = None):
+        self.repo = repo
+        self._embedder = embedder
+        self.nprobe = nprobe
+        self._ann = None
+        self._lock = threading.Lock()
+        self._generation = None
+        self._chunk_ids = None
+        self._artifact_ids = None
+        self._matrix = None
+
+    @property
+    def embedder(self) -> HashingEmbedder:
+        if self._embedder is None:
+            self._embedder = HashingEmbedder()
+        return self._embedder
+
+    def _ensure_loaded(self):
+        import numpy as np
+
+        generation = self.repo.get_generation()
+        with self._lock:
+            if self._matrix is not None and generation == self._generation:
+                return
+
+            chunk_ids, artifact_ids, blobs = [], [], []
+            expected = self.embedder.dim * 2 # float16
+            for chunk_id, artifact_id, blob in self.repo.iter_chunk_embeddings():
+                if len(blob) != expected:
+                    continue # Stale dimension, will be rewritten on next index
+                chunk_ids.append(chunk_id)
+                artifact_ids.append(artifact_id)
+                blobs.append(blob)
+
+            self._chunk_ids = np.asarray(chunk_ids, dtype=np.int64)
+            self._artifact_ids = np.asarray(artifact_ids, dtype=np.int64)
+            self._matrix = decode_vectors(blobs, self.embedder.dim)
+            self._generation = generation
+            logger.debug(f"Vector matrix loaded: {len(chunk_ids)} chunks (generation={generation})")
+
+    @property
+    def ann(self):
+        if self._ann is None:
+            from app.core.search.ann_index import IvfIndex, ann_index_path
+            self._ann = IvfIndex(ann_index_path(self.repo.db_path), self.embedder.dim)
+        return self._ann
+
+    def _ann_top_chunks(self, q, k: int):
+        import numpy as np
+        from app.core.search.ann_index import ANN_DEFAULT_NPROBE
+
+        # Over-fetch: some candidates may be stale (replaced on re-index)
+        fetch = k * 2
+        chunk_ids, artifact_ids, scores = self.ann.search(q, fetch, nprobe=self.nprobe or ANN_DEFAULT_NPROBE)
+        live = self.repo.live_chunk_ids(chunk_ids.tolist())
+        mask = np.isin(chunk_ids, np.fromiter(live, dtype=np.int64, count=len(live)))
+        # Exhausted only if the index itself ran out, not if stale ids were dropped
+        exhausted = len(chunk_ids) < fetch
+        return chunk_ids[mask][:k], artifact_ids[mask][:k], scores[mask][:k], exhausted
+
+    def _top_chunks(self, query: str, k: int):
+        """
+        top_chunks plus whether there are no more candidates beyond these (a larger k can't help).
+        """
+        import numpy as np
+
+        if self.ann.exists():
+            if k <= 0:
+                empty = np.zeros(0, dtype=np.int64)
+                return empty, empty, np.zeros(0, dtype=np.float32), True
+            return self._ann_top_chunks(self.embedder.embed_query(query), k)
+
+        self._ensure_loaded()
+        matrix, chunk_ids, artifact_ids = self._matrix, self._chunk_ids, self._artifact_ids
+        n = len(chunk_ids)
+        if n == 0 or k <= 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float32), True
+
+        q = self.embedder.embed_query(query)
+        scores = matrix @ q
+
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return chunk_ids[top], artifact_ids[top], scores[top], k == n
+
+    def top_chunks(self, query: str, k: int):
+        """
+        Returns (chunk_ids, artifact_ids, scores) for the k most similar chunks, best first.
+        """
+        return self._top_chunks(query, k)[:3]
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Tuple[int, float, int]]:
+        """
+        Ranks artifacts by their best-matching chunk.
+        Returns (artifact_id, score, chunk_id) for the requested page.
+        """
+        import numpy as np
+
+        wanted = offset + limit
+        k = wanted * 8
+        while True:
+            chunk_ids, artifact_ids, scores, exhausted = self._top_chunks(query, k)
+            # First occurrence of each artifact in score order = its best chunk
+            _, first = np.unique(artifact_ids, return_index=True)
+            first.sort()
+            if len(first) >= wanted or exhausted:
+                break
+            k *= 4
+
+        page = first[offset:wanted]
+        return [(int(artifact_ids[i]), float(scores[i]), int(chunk_ids[i])) for i in page]
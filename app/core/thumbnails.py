@@ -0,0 +1,88 @@
+
+import hashlib
+import logging
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTH = 480 # Pixels, longest side
+DEFAULT_CACHE_BYTES = 200 * 1024 * 1024
+RENDER_TIMEOUT = 30 # Seconds per page
+
+class ThumbnailCache:
+    """
+    PDF page thumbnails rendered lazily with pdftoppm (one page per call) and kept in a
+    size-bounded on-disk LRU: file mtime = last use, oldest files go first when over max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, pdftoppm: Optional[str], max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.pdftoppm = pdftoppm
+        self.max_bytes = max_bytes
+        self._evict_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return bool(self.pdftoppm)
+
+    def _key(self, pdf_path: str, page: int, width: int) -> str:
+        # Size/mtime in the key: a changed PDF never serves old pages
+        st = os.stat(pdf_path)
+        raw = f"{os.path.abspath(pdf_path)}|{st.st_size}|{st.st_mtime_ns}|{page}|{width}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, pdf_path: str, page: int, width: int = THUMBNAIL_WIDTH) -> Optional[str]:
+        """
+        Path of the PNG for page (1-based) of pdf_path, rendered on first request. None if unavailable.
+        """
+        if not self.available:
+            return None
+        try:
+            target = self.cache_dir / f"{self._key(pdf_path, page, width)}.png"
+            if target.exists():
+                os.utime(target, None) # Mark as recently used
+                return str(target)
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._render(pdf_path, page, width, target)
+            self._evict()
+            return str(target) if target.exists() else None
+        except Exception as e:
+            logger.warning(f"Thumbnail failed for {pdf_path} page {page}: {e}")
+            return None
+
+    def _render(self, pdf_path: str, page: int, width: int, target: Path):
+        # Render under a per-thread name, then rename: concurrent sessions never see partial files
+        prefix = target.with_name(f"{target.stem}.{threading.get_ident()}")
+        subprocess.run(
+            [self.pdftoppm, "-png", "-f", str(page), "-l", str(page), "-scale-to", str(width),
+             "-singlefile", pdf_path, str(prefix)],
+            check=True, capture_output=True, timeout=RENDER_TIMEOUT,
+        )
+        os.replace(f"{prefix}.png", target)
+
+    def _evict(self):
+        with self._evict_lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".png") and entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def size_bytes(self) -> int:
+        if not self.cache_dir.exists():
+            return 0
+        return sum(e.stat().st_size for e in os.scandir(self.cache_dir) if e.name.endswith(".png"))
@@ -49,6 +49,10 @@ def ensure_schema(conn: sqlite3.Connection):
     - artifacts: artifact_id PK, path UNIQUE, no legacy columns.
     - artifact_text: artifact_id PK.
     - index_runs: run_id PK.
+    - chunks: FK to artifacts(id).
+    - index_meta: key/value (index generation).
+    - saved_queries / saved_query_hits: standing queries and their matches.
+    - artifact_minhash / minhash_bands: near-duplicate signatures and LSH buckets.
     """
     logger.info("Ensuring Strict DB Schema (Epic 3.1 Compliance)...")
     
@@ -201,6 +205,9 @@ def ensure_schema(conn: sqlite3.Connection):
             logger.error(f"Strict Rebuild Failed: {e}")
             raise e
 
+    # Index generation at which the artifact's text was last written (standing queries)
+    _ensure_columns(conn, "artifacts", {"index_generation": "INTEGER"})
+
     # ---------------------------------------------------------
     # 2. ARTIFACT_TEXT ENFORCEMENT
     # ---------------------------------------------------------
@@ -313,18 +320,172 @@ def ensure_schema(conn: sqlite3.Connection):
     })
 
     # ---------------------------------------------------------
-    # 4. FTS & INDEXES
+    # 4. CHUNKS (FK must point at artifacts.id, 001 points at artifact_id)
+    # ---------------------------------------------------------
+    _ensure_chunks(conn)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS index_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+
+    # ---------------------------------------------------------
+    # 5. SAVED (STANDING) QUERIES
+    # ---------------------------------------------------------
+    conn.execute(_SAVED_QUERIES_DDL)
+    conn.execute(_SAVED_QUERY_HITS_DDL)
+
+    # Near-duplicate detection (MinHash signatures + LSH band buckets)
+    conn.execute(_ARTIFACT_MINHASH_DDL)
+    conn.execute(_MINHASH_BANDS_DDL)
+
+    # Sources inbox: filesystem snapshot of the ingest dir (status is derived by joining artifacts)
+    conn.execute(_WORKSPACE_FILES_DDL)
+    _ensure_columns(conn, "workspace_files", {"version": "INTEGER NOT NULL DEFAULT 0"})
+
+    # Per-page character spans of the stored text (PDFs), for page previews without re-parsing
+    conn.execute(_ARTIFACT_PAGES_DDL)
+
+    # ---------------------------------------------------------
+    # 6. FTS & INDEXES
     # ---------------------------------------------------------
     _ensure_indexes(conn)
     _ensure_fts(conn)
 
     logger.info("DB Strict Schema Verified.")
 
+_CHUNKS_DDL = """
+    CREATE TABLE IF NOT EXISTS chunks (
+        chunk_id INTEGER PRIMARY KEY,
+        artifact_id INTEGER NOT NULL,
+        chunk_type TEXT NOT NULL,
+        content_text TEXT NOT NULL,
+        page INTEGER,
+        bbox TEXT,
+        embedding BLOB,
+        tags TEXT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY(artifact_id) REFERENCES artifacts(id) ON DELETE CASCADE
+    )
+"""
+
+# last_evaluated_generation: index generation up to which the query has been matched.
+_SAVED_QUERIES_DDL = """
+    CREATE TABLE IF NOT EXISTS saved_queries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        query TEXT NOT NULL,
+        filters TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_evaluated_generation INTEGER NOT NULL DEFAULT 0,
+        last_evaluated_at TEXT
+    )
+"""
+
+_SAVED_QUERY_HITS_DDL = """
+    CREATE TABLE IF NOT EXISTS saved_query_hits (
+        query_id INTEGER NOT NULL,
+        artifact_id INTEGER NOT NULL,
+        generation INTEGER NOT NULL,
+        matched_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        seen INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (query_id, artifact_id),
+        FOREIGN KEY(query_id) REFERENCES saved_queries(id) ON DELETE CASCADE,
+        FOREIGN KEY(artifact_id) REFERENCES artifacts(id) ON DELETE CASCADE
+    )
+"""
+
+# dup_group: near-duplicate group id (independent of artifact ids; groups merge into the smallest id)
+_ARTIFACT_MINHASH_DDL = """
+    CREATE TABLE IF NOT EXISTS artifact_minhash (
+        artifact_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL,
+        dup_group INTEGER NOT NULL,
+        FOREIGN KEY(artifact_id) REFERENCES artifacts(id) ON DELETE CASCADE
+    )
+"""
+
+_MINHASH_BANDS_DDL = """
+    CREATE TABLE IF NOT EXISTS minhash_bands (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        artifact_id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, artifact_id)
+    ) WITHOUT ROWID
+"""
+
+# Synced per root on every workspace scan; artifacts holds what was indexed.
+# version: bumped whenever the file's size/mtime changes (per-path cache key)
+_WORKSPACE_FILES_DDL = """
+    CREATE TABLE IF NOT EXISTS workspace_files (
+        path TEXT PRIMARY KEY,
+        root TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        ext TEXT,
+        size_bytes INTEGER,
+        modified_at REAL,
+        scanned_at TEXT,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+# start_char/length index artifact_text.text; page is 1-based
+_ARTIFACT_PAGES_DDL = """
+    CREATE TABLE IF NOT EXISTS artifact_pages (
+        artifact_id INTEGER NOT NULL,
+        page INTEGER NOT NULL,
+        start_char INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        PRIMARY KEY (artifact_id, page),
+        FOREIGN KEY(artifact_id) REFERENCES artifacts(id) ON DELETE CASCADE
+    ) WITHOUT ROWID
+"""
+
+def _ensure_chunks(conn: sqlite3.Connection):
+    has_chunks = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chunks'").fetchone() is not None
+    if not has_chunks:
+        conn.execute(_CHUNKS_DDL)
+        return
+
+    fks = conn.execute("PRAGMA foreign_key_list(chunks)").fetchall()
+    if any(fk[2] == "artifacts" and fk[3] == "artifact_id" and fk[4] == "id" for fk in fks):
+        return
+
+    logger.warning("chunks has invalid FK or legacy schema. Triggering Rebuild.")
+    try:
+        conn.execute("ALTER TABLE chunks RENAME TO chunks_legacy")
+        conn.execute(_CHUNKS_DDL)
+
+        c_cols = {row[1] for row in conn.execute("PRAGMA table_info(chunks_legacy)")}
+        cols_to_copy = [c for c in ["chunk_id", "artifact_id", "chunk_type", "content_text", "page", "bbox", "embedding", "tags", "created_at"] if c in c_cols]
+        conn.execute(f"""
+            INSERT INTO chunks ({', '.join(cols_to_copy)})
+            SELECT {', '.join(cols_to_copy)}
+            FROM chunks_legacy
+            WHERE artifact_id IN (SELECT id FROM artifacts)
+        """)
+        conn.execute("DROP TABLE chunks_legacy")
+        logger.info("chunks Strict Rebuild Complete.")
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Failed to rebuild chunks: {e}")
+        raise e
+
 def _ensure_indexes(conn: sqlite3.Connection):
     try:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_ext ON artifacts(ext)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_status ON artifacts(ingest_status)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_modified_at ON artifacts(modified_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_artifact_id ON chunks(artifact_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_index_generation ON artifacts(index_generation)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_saved_query_hits_seen ON saved_query_hits(seen, query_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_artifact_minhash_group ON artifact_minhash(dup_group)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_minhash_bands_artifact ON minhash_bands(artifact_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_workspace_files_name ON workspace_files(root, filename COLLATE NOCASE)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_workspace_files_ext ON workspace_files(root, ext, filename COLLATE NOCASE)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_workspace_files_modified ON workspace_files(root, modified_at)")
     except Exception as e:
         logger.warning(f"Failed to create indexes: {e}")
 
@@ -342,20 +503,49 @@ def _ensure_columns(conn: sqlite3.Connection, table: str, required_columns: dict
             except Exception as e:
                 logger.error(f"Failed to add column {table}.{col_name}: {e}")
 
+# rowid == ref_id == artifacts.id. ref_id is kept for readability but not tokenized.
+# prefix='2 3' adds prefix indexes for 2/3-char prefix queries (type-ahead, 'term*').
+FTS_DDL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5(
+        filename, 
+        path, 
+        text, 
+        ref_id UNINDEXED,
+        prefix='2 3'
+    );
+"""
+
+# Per-term document frequencies across all columns (suggestions)
+FTS_VOCAB_DDL = "CREATE VIRTUAL TABLE IF NOT EXISTS artifact_fts_vocab USING fts5vocab(artifact_fts, 'row')"
+
+def ensure_fts(conn: sqlite3.Connection):
+    """
+    Creates artifact_fts (+ vocab) or rebuilds a legacy layout. Raises if FTS5 is unavailable.
+    """
+    # Check if table exists
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='artifact_fts'").fetchone()
+    if not row:
+        conn.execute(FTS_DDL.format(name="artifact_fts"))
+    elif "prefix" not in row[0].lower():
+        # Pre-prefix layout: rebuild with rowid = ref_id (latest row per artifact wins)
+        logger.warning("artifact_fts has legacy layout (no prefix index). Rebuilding.")
+        conn.execute("DROP TABLE IF EXISTS artifact_fts_vocab")
+        conn.execute("DROP TABLE IF EXISTS artifact_fts_rebuild")
+        conn.execute(FTS_DDL.format(name="artifact_fts_rebuild"))
+        conn.execute("""
+            INSERT INTO artifact_fts_rebuild (rowid, filename, path, text, ref_id)
+            SELECT ref_id, filename, path, text, ref_id FROM artifact_fts
+            WHERE rowid IN (SELECT MAX(rowid) FROM artifact_fts WHERE ref_id IS NOT NULL GROUP BY ref_id)
+        """)
+        conn.execute("DROP TABLE artifact_fts")
+        conn.execute("ALTER TABLE artifact_fts_rebuild RENAME TO artifact_fts")
+        logger.info("artifact_fts Rebuild Complete.")
+
+    conn.execute(FTS_VOCAB_DDL)
+
 def _ensure_fts(conn: sqlite3.Connection):
     try:
-        # Check if table exists
-        row = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='artifact_fts'").fetchone()
-        if not row:
-
-             conn.execute("""
-                CREATE VIRTUAL TABLE IF NOT EXISTS artifact_fts USING fts5(
-                    filename, 
-                    path, 
-                    text, 
-                    ref_id
-                );
-            """)
+        ensure_fts(conn)
     except Exception as e:
         logger.warning(f"FTS5 init failed: {e}")
 
@@ -20,3 +20,33 @@ class PreviewResult:
     content: Optional[Union[str, bytes]] = None
     type: str = "text" # "text", "image", "pdf_placeholder", "error"
     error_message: Optional[str] = None
+
+@dataclass
+class TextWindow:
+    """
+    A slice of a text file: [start_offset, end_offset) in bytes, starting at 0-based start_line.
+    """
+    path: str
+    text: str
+    start_line: int
+    line_count: int
+    total_lines: int
+    start_offset: int
+    end_offset: int
+    size: int
+    truncated: bool = False # Cut at the byte cap (e.g. one huge line)
+
+    @property
+    def end_line(self) -> int:
+        return self.start_line + self.line_count
+
+@dataclass
+class PdfPageView:
+    """
+    One page of an indexed PDF: stored text plus an optional rendered thumbnail (PNG path).
+    """
+    artifact_id: int
+    page: int
+    page_count: int
+    text: Optional[str] = None
+    thumbnail: Optional[str] = None
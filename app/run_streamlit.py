@@ -4,9 +4,25 @@ import streamlit as st
 # Ensure app root is in path if run directly - MUST BE BEFORE LOCAL IMPORTS
 
 
+import importlib
+
 from app.ui.state import init_app_state
 from app.ui.components import navigation
-from app.ui.pages import home, sources, search, ignorance_map, open_loops
+
+# Display name -> module under app.ui.pages. Pages are imported when first shown,
+# so a cold start only pays for the page being rendered.
+PAGES = {
+    "Home": "home",
+    "Sources": "sources",
+    "Search": "search",
+    "Ignorance Map": "ignorance_map",
+    "Open Loops": "open_loops",
+}
+
+def _lazy_page(module_name: str):
+    def render(app_state):
+        importlib.import_module(f"app.ui.pages.{module_name}").render(app_state)
+    return render
 
 def main():
     st.set_page_config(
@@ -20,13 +36,7 @@ def main():
     app_state = init_app_state()
 
     # Define Navigation Map
-    page_map = {
-        "Home": home.render,
-        "Sources": sources.render,
-        "Search": search.render,
-        "Ignorance Map": ignorance_map.render,
-        "Open Loops": open_loops.render,
-    }
+    page_map = {name: _lazy_page(module) for name, module in PAGES.items()}
 
     # Render Navigation (Sidebar + Page routing)
     navigation.render_sidebar(app_state, page_map)
@@ -0,0 +1,31 @@
+
+import os
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+from app.models.artifacts import PdfPageView
+
+# Page-level PDF previews served from the index: page text is a substring of artifact_text
+# (spans in artifact_pages), so opening any page of a large PDF never re-parses the file.
+
+def page_of_offset(spans: List[Tuple[int, int, int]], offset: int) -> int:
+    """
+    1-based page containing character offset, given (page, start_char, length) spans.
+    """
+    if not spans:
+        return 1
+    starts = [start for _, start, _ in spans]
+    return spans[max(bisect_right(starts, offset) - 1, 0)][0]
+
+def page_view(repo, artifact_id: int, path: str, page: int, thumbnails=None) -> Optional[PdfPageView]:
+    """
+    Text of page (clamped to the document) and, with a ThumbnailCache, its rendered image.
+    None if no pages are stored (not indexed, or not a text PDF).
+    """
+    count = repo.count_pages(artifact_id)
+    if not count:
+        return None
+    page = max(1, min(int(page), count))
+    thumbnail = thumbnails.get(path, page) if thumbnails is not None and os.path.exists(path) else None
+    return PdfPageView(artifact_id=artifact_id, page=page, page_count=count,
+                       text=repo.get_page_text(artifact_id, page), thumbnail=thumbnail)
@@ -1,12 +1,14 @@
 
 import os
-import hashlib
 from pathlib import Path
 from typing import List, Optional
-from app.models.artifacts import Artifact, ArtifactDetails, PreviewResult
+from app.models.artifacts import Artifact, ArtifactDetails, PreviewResult, TextWindow
+from app.core.hashing_service import hash_file
+from app.services import text_windows
 
 # Constants
 PREVIEW_TEXT_LIMIT = 5000  # Characters
+PREVIEW_WINDOW_LINES = 200 # Lines per page of the paged (range-read) preview
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".bmp"}
 TEXT_EXTENSIONS = {".txt", ".md", ".json", ".log", ".yaml", ".yml", ".py", ".csv"}
 PDF_EXTENSIONS = {".pdf"}
@@ -62,12 +64,8 @@ def get_artifact_details(path: str, compute_hash: bool = False) -> ArtifactDetai
         
         file_hash = None
         if compute_hash:
-            # Lazy hash calculation
-            sha256_hash = hashlib.sha256()
-            with open(path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            file_hash = sha256_hash.hexdigest()
+            # Lazy hash calculation (streamed in 1 MiB blocks)
+            file_hash = hash_file(path)
         
         return ArtifactDetails(
             name=path_obj.name,
@@ -117,3 +115,15 @@ def preview_artifact(path: str) -> PreviewResult:
 
     except Exception as e:
         return PreviewResult(type="error", error_message=str(e))
+
+def preview_lines(path: str, start_line: int = 0, count: int = PREVIEW_WINDOW_LINES) -> TextWindow:
+    """
+    Paged text preview: lines [start_line, start_line + count) read through mmap, at any depth of the file.
+    """
+    return text_windows.read_lines(path, start_line, count)
+
+def line_count(path: str) -> int:
+    """
+    Number of lines in path (from the cached line index; built on first call).
+    """
+    return text_windows.line_index(path).total_lines
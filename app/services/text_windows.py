@@ -0,0 +1,121 @@
+
+import mmap
+import os
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Tuple
+
+from app.models.artifacts import TextWindow
+
+# Paged reads of large text files (multi-GB logs/JSON) through mmap: only the requested
+# window is touched. Line windows use a sparse line-offset index (newline count at every
+# INDEX_BLOCK boundary), built on first access and cached per (path, size, mtime).
+
+INDEX_BLOCK = 64 * 1024 # One checkpoint per 64 KiB: ~1.3 MB of index for a 10 GB file
+MAX_WINDOW_BYTES = 1024 * 1024 # Cap per window, so one huge line can't be read in full
+LINE_INDEX_CACHE = 16
+
+@dataclass
+class LineIndex:
+    size: int
+    total_lines: int
+    checkpoints: List[int] # checkpoints[i] = newlines in bytes [0, i * INDEX_BLOCK)
+
+@lru_cache(maxsize=LINE_INDEX_CACHE)
+def _build_line_index(path: str, size: int, mtime_ns: int) -> LineIndex:
+    # size/mtime_ns are part of the cache key: a changed file builds a new index
+    checkpoints = [0]
+    newlines = 0
+    last = b"\n"
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start in range(0, size, INDEX_BLOCK):
+                newlines += mm[start:start + INDEX_BLOCK].count(b"\n")
+                checkpoints.append(newlines)
+            last = mm[size - 1:size]
+    # A final line without a trailing newline still counts
+    total = newlines + (0 if last == b"\n" else 1)
+    return LineIndex(size=size, total_lines=total, checkpoints=checkpoints)
+
+def line_index(path: str) -> LineIndex:
+    """
+    Sparse line-offset index of path (cached; rebuilt when the file changes).
+    """
+    st = os.stat(path)
+    return _build_line_index(os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+def _line_offset(mm, index: LineIndex, line: int) -> int:
+    # Byte offset where 0-based line starts: after the line-th newline
+    if line <= 0:
+        return 0
+    if line >= index.total_lines:
+        return index.size
+    # 1. Last block that starts before that newline
+    block = bisect_left(index.checkpoints, line) - 1
+    pos = block * INDEX_BLOCK
+    # 2. Walk the remaining newlines inside that block only
+    for _ in range(line - index.checkpoints[block]):
+        pos = mm.find(b"\n", pos) + 1
+    return pos
+
+def _line_at(mm, index: LineIndex, offset: int) -> int:
+    # 0-based line containing byte offset
+    block = min(offset // INDEX_BLOCK, len(index.checkpoints) - 1)
+    start = block * INDEX_BLOCK
+    return index.checkpoints[block] + mm[start:offset].count(b"\n")
+
+def _char_start(mm, offset: int, size: int) -> int:
+    # Skip UTF-8 continuation bytes so a window never starts mid-character
+    while offset < size and mm[offset] & 0xC0 == 0x80:
+        offset += 1
+    return offset
+
+def _decode(mm, start: int, end: int) -> Tuple[str, int]:
+    end = _char_start(mm, end, len(mm))
+    return mm[start:end].decode("utf-8", errors="replace"), end
+
+def _empty(path: str, index: LineIndex) -> TextWindow:
+    return TextWindow(path=path, text="", start_line=0, line_count=0, total_lines=index.total_lines,
+                      start_offset=0, end_offset=0, size=index.size)
+
+def read_lines(path: str, start_line: int, count: int, max_bytes: int = MAX_WINDOW_BYTES) -> TextWindow:
+    """
+    Lines [start_line, start_line + count) of path (0-based), capped at max_bytes.
+    """
+    index = line_index(path)
+    start_line = max(0, min(start_line, index.total_lines - 1))
+    if not index.size:
+        return _empty(path, index)
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = _line_offset(mm, index, start_line)
+        end = _line_offset(mm, index, start_line + max(count, 1))
+        truncated = end - start > max_bytes
+        if truncated:
+            end = start + max_bytes
+        text, end = _decode(mm, start, end)
+
+    line_count = text.count("\n") + (0 if text.endswith("\n") else 1) # Last line may be partial
+    return TextWindow(path=path, text=text, start_line=start_line, line_count=line_count,
+                      total_lines=index.total_lines, start_offset=start, end_offset=end,
+                      size=index.size, truncated=truncated)
+
+def read_bytes(path: str, offset: int, length: int) -> TextWindow:
+    """
+    Bytes [offset, offset + length) of path, moved forward to whole UTF-8 characters.
+    """
+    index = line_index(path)
+    if not index.size:
+        return _empty(path, index)
+
+    truncated = length > MAX_WINDOW_BYTES
+    length = min(max(length, 0), MAX_WINDOW_BYTES)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = _char_start(mm, max(0, min(offset, index.size)), index.size)
+        text, end = _decode(mm, start, min(start + length, index.size))
+        start_line = _line_at(mm, index, start)
+
+    return TextWindow(path=path, text=text, start_line=start_line, line_count=text.count("\n"),
+                      total_lines=index.total_lines, start_offset=start, end_offset=end,
+                      size=index.size, truncated=truncated)
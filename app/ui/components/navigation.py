@@ -21,6 +21,9 @@ def render_sidebar(app_state: AppState, page_map: Dict[str, Callable[[AppState],
     selection = st.sidebar.radio("Navigation", list(page_map.keys()))
     
     st.sidebar.divider()
+    if st.sidebar.button("Reload configuration", help="Re-read config files and rebuild shared services"):
+        app_state.reload_config()
+        st.rerun()
     st.sidebar.info("v0.1.0 - Epic 1 shell")
     
     # Execute the selected page
@@ -0,0 +1,19 @@
+
+import streamlit as st
+from app.models.artifacts import PdfPageView
+
+def render(view: PdfPageView, show_text: bool = True):
+    """
+    Renders one PDF page: thumbnail (if rendered) next to its extracted text.
+    Pure render component, no DB access.
+    """
+    st.caption(f"Page {view.page} of {view.page_count}")
+    if view.thumbnail and show_text:
+        col_img, col_text = st.columns([2, 3])
+        col_img.image(view.thumbnail)
+        with col_text:
+            st.code(view.text or "(no text on this page)", language=None)
+    elif view.thumbnail:
+        st.image(view.thumbnail)
+    elif show_text:
+        st.code(view.text or "(no text on this page)", language=None)
@@ -1,7 +1,78 @@
 
+import datetime
 import streamlit as st
 from app.ui.state import AppState
 
 def render(app_state: AppState):
     st.title("Open Loops")
-    st.write("Tracking of unsolved questions and follow-ups coming in EPIC 6.")
+
+    db_path = app_state.config.get("db_path")
+    if "db_init_error" in app_state.config:
+        st.error(f"Database Error: {app_state.config['db_init_error']}")
+        return
+    if not db_path:
+        st.warning("Database not configured.")
+        return
+
+    try:
+        service = app_state.services.standing
+        # Incremental: only artifacts indexed since the last evaluation are matched
+        service.evaluate()
+        queries = service.list()
+    except Exception as e:
+        st.error(f"Failed to load standing queries: {e}")
+        return
+
+    # --- Add Standing Query ---
+    with st.expander("➕ New standing query", expanded=not queries):
+        with st.form("add_standing_query", clear_on_submit=True):
+            c_name, c_query, c_ext = st.columns([2, 3, 1])
+            name = c_name.text_input("Name", placeholder="Pump incidents")
+            query = c_query.text_input("Query", placeholder='pump "relief valve" NOT draft')
+            ext = c_ext.text_input("Extension", placeholder=".pdf")
+            if st.form_submit_button("Save"):
+                try:
+                    service.add(name, query, {"ext": ext.strip().lower()} if ext.strip() else None)
+                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
+
+    if not queries:
+        st.info("No standing queries yet. New documents matching a saved query show up here after indexing.")
+        return
+
+    # --- New Hits Since Last Visit ---
+    total_new = sum(q.new_hits for q in queries)
+    c_sum, c_btn = st.columns([4, 1])
+    c_sum.subheader(f"New hits since last visit: {total_new}")
+    if total_new and c_btn.button("Mark all seen"):
+        service.mark_seen()
+        st.rerun()
+
+    for q in queries:
+        label = f"{q.name} — {q.new_hits} new" if q.new_hits else q.name
+        with st.expander(label, expanded=q.new_hits > 0):
+            filters = ", ".join(f"{k}={v}" for k, v in q.filters.items())
+            st.caption(f"`{q.query}`" + (f" · {filters}" if filters else "") +
+                       f" · evaluated at generation {q.last_evaluated_generation}")
+
+            hits = service.hits(q.id) if q.new_hits else []
+            for hit in hits:
+                mtime = hit.get('modified_at')
+                date_str = ""
+                if mtime:
+                    try:
+                        date_str = datetime.datetime.fromtimestamp(float(mtime)).strftime('%Y-%m-%d %H:%M')
+                    except (TypeError, ValueError):
+                        date_str = str(mtime)
+                st.markdown(f"- **{hit['filename']}** `{hit['path']}` {date_str}")
+            if q.new_hits > len(hits):
+                st.caption(f"... and {q.new_hits - len(hits)} more")
+
+            c1, c2 = st.columns(2)
+            if q.new_hits and c1.button("Mark seen", key=f"seen_{q.id}"):
+                service.mark_seen(q.id)
+                st.rerun()
+            if c2.button("Delete", key=f"del_{q.id}"):
+                service.remove(q.id)
+                st.rerun()
@@ -4,9 +4,14 @@ import os
 import datetime
 import hashlib
 from app.ui.state import AppState
-from app.services import sources_service
-from app.core.artifacts_repo import ArtifactsRepo
-from app.core.indexing_service import IndexingService
+from app.services import pdf_preview, sources_service
+from app.ui.components import pdf_page
+from app.ui.services import refresh_workspace_snapshot, cached_workspace_counts, cached_preview, get_thumbnail_cache
+
+PAGE_SIZE = 50
+SORT_LABELS = {"name": "Name", "modified": "Last modified", "size": "Size", "status": "Status"}
+INBOX_FRAGMENT = "sources_inbox"
+DETAIL_FRAGMENT = "sources_detail"
 
 def render(app_state: AppState):
     st.title("Sources")
@@ -35,224 +40,298 @@ def render(app_state: AppState):
         st.error(f"Ingestion directory not found: `{ingest_dir}`")
         return
 
-    # --- Initialize Services ---
+    # --- Shared Services (built once per process) ---
     repo = None
     indexer = None
-    db_status_map = {}
     
     if db_path:
         try:
-            repo = ArtifactsRepo(db_path)
-            # Pass full config or just features? Registry expects dict. 
-            # We already have `config` dict (from app_state.config.get("data")).
-            # features is inside it. 
-            # Let's pass `features` section specifically or full config?
-            # Registry uses it for flags. Better pass `features`.
-            features = config.get("features", {})
-            indexer = IndexingService(repo, features)
-            
-            # Fetch all statuses for mapping
-            # Using empty query to get all
-            all_db_artifacts = repo.search_artifacts("") 
-            for row in all_db_artifacts:
-                db_status_map[row['path']] = row['ingest_status']
-                
+            services = app_state.services
+            repo = services.repo
+            indexer = services.indexer
         except Exception as e:
             st.error(f"Failed to initialize repository: {e}")
     else:
         st.warning("Database path not configured. Indexing disabled.")
 
+    if not indexer:
+        return
+
     # --- Sidebar Filters ---
     with st.sidebar:
         st.subheader("Inbox Filters")
         search_term = st.text_input("Search files", placeholder="filename...")
-        ext_options = ["all", ".pdf", ".txt", ".md", ".json", ".png", ".jpg"]
-        filter_ext = st.selectbox("Extension", ext_options)
+        force_rescan = st.button("Rescan folder", help="Re-read the ingest folder now")
 
-    # --- Wrapper for caching ---
-    @st.cache_data(ttl=5)
-    def cached_scan(dir_path):
-        if indexer:
-            return indexer.scan_workspace(dir_path)
-        return []
+    # 1. Filesystem snapshot (stat only), shared by sessions and refreshed when stale
+    refresh_workspace_snapshot(services, ingest_dir, force=force_rescan)
+    counts = cached_workspace_counts(services, ingest_dir)
 
-    # 1. Fetch File List & Status
-    all_files = cached_scan(ingest_dir)
-    
-    # Filter
-    artifacts = []
-    for f in all_files:
-        # Ext filter
-        if filter_ext != "all" and f["ext"] != filter_ext:
-            continue
-        # Search filter
-        if search_term and search_term.lower() not in f["filename"].lower():
-            continue
-        artifacts.append(f)
+    with st.sidebar:
+        ext_options = ["all"] + sorted(e for e in counts["ext"] if e)
+        filter_ext = st.selectbox("Extension", ext_options)
+        status_options = ["all"] + sorted(counts["status"])
+        filter_status = st.selectbox("Status", status_options)
+        sort = st.selectbox("Sort by", list(SORT_LABELS), format_func=SORT_LABELS.get)
+
+        # Background SHA-256 for indexed files that have none (or changed since)
+        backfill = services.hasher.backfill_status()
+        if backfill.running:
+            st.caption(f"Hashing files: {backfill.hashed + backfill.failed} of {backfill.queued} queued")
+        elif st.button("Hash missing files", help="Compute SHA-256 digests in the background"):
+            services.hasher.start_backfill()
 
     # Action Counters
-    needed_count = len([f for f in all_files if f["status"] in ("NEW", "DIRTY")])
+    needed_count = counts["status"].get("NEW", 0) + counts["status"].get("DIRTY", 0)
 
     # --- ACTIONS ---
-    if indexer:
-        c_top1, c_top2, c_top3 = st.columns([3, 1, 1])
-        with c_top2:
-            if needed_count > 0:
-                if st.button(f"Index Needed ({needed_count})", type="primary", help="Process NEW and DIRTY files"):
-                    with st.spinner("Indexing updates..."):
-                        updates = indexer.index_needed(ingest_dir)
-                        count = 0
-                        progress_bar = st.progress(0)
-                        for i, item in enumerate(updates):
-                            indexer.index_file(item["path"])
-                            count += 1
-                            if updates:
-                                progress_bar.progress((i + 1) / len(updates))
-                        progress_bar.empty()
-                        
-                    st.success(f"Indexed {count} files.")
-                    st.cache_data.clear()
-                    st.rerun()
-            else:
-                st.button("Index Needed (0)", disabled=True)
-                
-        with c_top3:
-             if st.button("Index All"):
-                with st.spinner("Indexing all files..."):
-                    stats = indexer.index_all(ingest_dir)
-                st.success(f"Indexed: {stats.get('indexed', 0)}, Failed: {stats.get('failed', 0)}")
-                st.cache_data.clear()
+    c_top1, c_top2, c_top3 = st.columns([3, 1, 1])
+    with c_top2:
+        if needed_count > 0:
+            if st.button(f"Index Needed ({needed_count})", type="primary", help="Process NEW and DIRTY files"):
+                with st.spinner("Indexing updates..."):
+                    updates = repo.workspace_paths(ingest_dir, ["NEW", "DIRTY"])
+                    count = 0
+                    progress_bar = st.progress(0)
+                    for i, path in enumerate(updates):
+                        indexer.index_file(path)
+                        count += 1
+                        progress_bar.progress((i + 1) / len(updates))
+                    progress_bar.empty()
+                    indexer.evaluate_standing_queries()
+                    
+                st.success(f"Indexed {count} files.")
                 st.rerun()
+        else:
+            st.button("Index Needed (0)", disabled=True)
+            
+    with c_top3:
+         if st.button("Index All"):
+            with st.spinner("Indexing all files..."):
+                stats = indexer.index_all(ingest_dir)
+            st.success(f"Indexed: {stats.get('indexed', 0)}, Failed: {stats.get('failed', 0)}")
+            st.rerun()
 
     # --- Main Area ---
     st.subheader("Ingestion Inbox")
+
+    # 2. Filters/sort changes go back to the first page
+    filter_key = (search_term, filter_ext, filter_status, sort)
+    if st.session_state.get("sources_filter_key") != filter_key:
+        st.session_state["sources_filter_key"] = filter_key
+        st.session_state["sources_page"] = 0
+
+    # 3. List (left) | Detail/Preview (right) as sibling fragments: paging reruns only the list,
+    # selection only the detail panel, and neither reruns the snapshot/counts above
+    col_list, col_detail = st.columns([2, 3])
+    with col_list:
+        _inbox_panel(
+            services,
+            ingest_dir,
+            search_term or None,
+            None if filter_ext == "all" else filter_ext,
+            None if filter_status == "all" else filter_status,
+            sort,
+        )
+    with col_detail:
+        _detail_panel(services.repo, get_thumbnail_cache(app_state.config), services.hasher)
+
+
+@st.fragment(key=INBOX_FRAGMENT)
+def _inbox_panel(services, ingest_dir, search, ext, status, sort):
+    repo = services.repo
+    indexer = services.indexer
+    page = st.session_state.get("sources_page", 0)
+
+    artifacts, total = repo.workspace_page(
+        ingest_dir,
+        search=search,
+        ext=ext,
+        status=status,
+        sort=sort,
+        limit=PAGE_SIZE,
+        offset=page * PAGE_SIZE,
+    )
     
-    if not artifacts:
+    if not total:
         st.info("No artifacts found matching criteria.")
         return
 
-    # 2. Layout: List (Left) | Detail/Preview (Right)
-    col_list, col_detail = st.columns([2, 3])
-    
-    selected_artifact = None
+    # --- List ---
+    page_count = (total + PAGE_SIZE - 1) // PAGE_SIZE
+    st.caption(f"Found {total} items · page {page + 1} of {page_count}")
     
-    # --- Left: List ---
-    with col_list:
-        st.caption(f"Found {len(artifacts)} items")
-        
-        with st.container():
-            for i, art in enumerate(artifacts):
-                safe_key = hashlib.md5(art["path"].encode('utf-8')).hexdigest()
-                
-                # Determine status
-                status = art["status"]
-                status_color = {
-                    "NEW": "blue",
-                    "DIRTY": "orange",
-                    "INDEXED": "green",
-                    "FAILED": "red",
-                    "NOT_EXTRACTABLE": "grey"
-                }.get(status, "grey")
-                
-                # Card Row
-                c1, c2, c3 = st.columns([3, 1, 1])
-                
-                # Name & Badge
-                c1.markdown(f"**{art['filename']}**  \n<span style='color:{status_color}; font-size:0.8em'>● {status}</span> <span style='color:grey; font-size:0.8em'>| {art['ext']}</span>", unsafe_allow_html=True)
-                
-                # View Button
-                if c2.button("View", key=f"view_{safe_key}"):
-                    st.session_state["selected_artifact_path"] = art["path"]
-                
-                # Index Button (only if indexer available)
-                if indexer:
-                    btn_label = "Update" if status in ("DIRTY", "INDEXED") else "Index"
-                    if c3.button(btn_label, key=f"idx_{safe_key}"):
-                        with st.spinner(f"Indexing {art['filename']}..."):
-                            res = indexer.index_file(art["path"])
-                        if res == "indexed":
-                            st.toast(f"Indexed {art['filename']}", icon="✅")
-                        elif res == "not_extractable":
-                            st.toast(f"Not extractable", icon="⚠️")
-                        else:
-                            st.toast(f"Failed", icon="❌")
-                        st.cache_data.clear()
-                        st.rerun()
-                
-                st.divider()
-
-        # Check selection
-        selected_path = st.session_state.get("selected_artifact_path")
-        if selected_path:
-            selected_artifact = next((a for a in artifacts if a["path"] == selected_path), None)
-
-    # --- Right: Detail & Preview ---
-    with col_detail:
-        if selected_artifact:
-            st.markdown(f"### {selected_artifact['filename']}")
+    with st.container():
+        for i, art in enumerate(artifacts):
+            safe_key = hashlib.md5(art["path"].encode('utf-8')).hexdigest()
+            
+            # Determine status
+            status = art["status"]
+            status_color = {
+                "NEW": "blue",
+                "DIRTY": "orange",
+                "INDEXED": "green",
+                "FAILED": "red",
+                "NOT_EXTRACTABLE": "grey"
+            }.get(status, "grey")
+            
+            # Card Row
+            c1, c2, c3 = st.columns([3, 1, 1])
+            
+            # Name & Badge
+            c1.markdown(f"**{art['filename']}**  \n<span style='color:{status_color}; font-size:0.8em'>● {status}</span> <span style='color:grey; font-size:0.8em'>| {art['ext']}</span>", unsafe_allow_html=True)
             
-            tab_preview, tab_meta = st.tabs(["Preview", "Metadata"])
+            # View Button
+            c2.button("View", key=f"view_{safe_key}", on_click=_select_artifact, args=(art["path"],))
             
-            with tab_meta:
-                 # Helper to manage hash state
-                 hash_key = f"hash_{selected_artifact['path']}"
-                 current_hash = st.session_state.get(hash_key)
-                 
-                 status = selected_artifact.get("status", "UNKNOWN")
-                 
-                 meta_dict = {
-                     "Path": selected_artifact["path"],
-                     "Size": f"{selected_artifact['size_bytes']} bytes",
-                     "Modified": datetime.datetime.fromtimestamp(selected_artifact['modified_at']).isoformat(),
-                     "Type": selected_artifact["ext"],
-                     "Status": status
-                 }
-                 
-                 if current_hash:
-                     meta_dict["SHA256"] = current_hash
-                     # Save to DB if calculated
-                     if repo:
-                         try:
-                            repo_meta = selected_artifact.copy()
-                            repo_meta["sha256"] = current_hash
-                            repo.upsert_artifact(repo_meta)
-                         except Exception as e:
-                             pass 
-                 else:
-                     meta_dict["SHA256"] = "Not calculated"
-                     
-                 st.json(meta_dict)
-                 
-                 if not current_hash:
-                     if st.button("Compute Hash"):
-                         try:
-                             with open(selected_artifact["path"], "rb") as f:
-                                 digest = hashlib.sha256(f.read()).hexdigest()
-                             st.session_state[hash_key] = digest
-                             st.rerun()
-                         except Exception as e:
-                             st.error(f"Error computing hash: {e}")
-
-                 if os.name == 'nt':
-                     if st.button("Open Folder"):
-                         try:
-                             st.info("Opening Explorer (check taskbar)...")
-                             os.startfile(os.path.dirname(selected_artifact["path"]))
-                         except Exception as e:
-                             st.error(f"Cannot open folder: {e}")
-
-            with tab_preview:
-                preview = sources_service.preview_artifact(selected_artifact["path"])
-                
-                if preview.type == "text":
-                    st.code(preview.content, language=None)
-                elif preview.type == "image":
-                    st.image(preview.content)
-                elif preview.type == "pdf_placeholder":
-                    st.info("PDF preview not available in Sources (View in Search for indexed content).")
-                elif preview.type == "error":
-                    st.error(preview.error_message)
+            btn_label = "Update" if status in ("DIRTY", "INDEXED") else "Index"
+            if c3.button(btn_label, key=f"idx_{safe_key}"):
+                with st.spinner(f"Indexing {art['filename']}..."):
+                    res = indexer.index_file(art["path"])
+                if res == "indexed":
+                    st.toast(f"Indexed {art['filename']}", icon="✅")
+                elif res == "not_extractable":
+                    st.toast(f"Not extractable", icon="⚠️")
                 else:
-                    st.warning("No preview available")
+                    st.toast(f"Failed", icon="❌")
+                # Full rerun: counters and the "Index Needed" action change too
+                st.rerun()
+            
+            st.divider()
+
+    # Pager
+    if page_count > 1:
+        p1, p2 = st.columns(2)
+        p1.button("◀ Previous", disabled=page == 0, on_click=_set_page, args=(page - 1,))
+        p2.button("Next ▶", disabled=page >= page_count - 1, on_click=_set_page, args=(page + 1,))
+
+
+@st.fragment(key=DETAIL_FRAGMENT)
+def _detail_panel(repo, thumbnails=None, hasher=None):
+    """
+    Metadata and preview of the selected file; selecting a file and the panel's own buttons
+    rerun only this panel. The selection may be on another inbox page.
+    """
+    path = st.session_state.get("selected_artifact_path")
+    selected_artifact = repo.get_workspace_file(path) if path else None
+    if not selected_artifact:
+        st.info("Select an artifact to view details.")
+        return
+
+    st.markdown(f"### {selected_artifact['filename']}")
+    
+    tab_preview, tab_meta = st.tabs(["Preview", "Metadata"])
+    
+    with tab_meta:
+         # Digest computed in the background (HashingService), valid for the current size/mtime only
+         path = selected_artifact["path"]
+         current_hash = hasher.current_digest(path) if hasher else None
+         
+         status = selected_artifact.get("status", "UNKNOWN")
+         
+         meta_dict = {
+             "Path": path,
+             "Size": f"{selected_artifact['size_bytes']} bytes",
+             "Modified": datetime.datetime.fromtimestamp(selected_artifact['modified_at']).isoformat(),
+             "Type": selected_artifact["ext"],
+             "Status": status,
+             "SHA256": current_hash or "Not calculated"
+         }
+             
+         st.json(meta_dict)
+         
+         if not current_hash and hasher:
+             job = hasher.job(path)
+             if job is None or job.finished:
+                 if job and job.error:
+                     st.warning(f"Hashing failed: {job.error}")
+                 st.button("Compute Hash", on_click=_start_hash, args=(hasher, path))
+             else:
+                 _hash_progress(hasher, path)
+
+         if os.name == 'nt':
+             if st.button("Open Folder"):
+                 try:
+                     st.info("Opening Explorer (check taskbar)...")
+                     os.startfile(os.path.dirname(selected_artifact["path"]))
+                 except Exception as e:
+                     st.error(f"Cannot open folder: {e}")
+
+    with tab_preview:
+        if selected_artifact["ext"] in sources_service.TEXT_EXTENSIONS and selected_artifact["size_bytes"] > sources_service.PREVIEW_TEXT_LIMIT:
+            _render_text_pages(selected_artifact)
+            return
+        if selected_artifact["ext"] in sources_service.PDF_EXTENSIONS and selected_artifact["id"]:
+            if _render_pdf_pages(repo, selected_artifact, thumbnails):
+                return
+
+        # Re-read only when the file changed (snapshot version bump)
+        preview = cached_preview(selected_artifact["path"], selected_artifact["version"])
+        
+        if preview.type == "text":
+            st.code(preview.content, language=None)
+        elif preview.type == "image":
+            st.image(preview.content)
+        elif preview.type == "pdf_placeholder":
+            st.info("Page preview appears once the PDF is (re-)indexed.")
+        elif preview.type == "error":
+            st.error(preview.error_message)
         else:
-            st.info("Select an artifact to view details.")
+            st.warning("No preview available")
+
+
+@st.fragment(run_every=1)
+def _hash_progress(hasher, path):
+    job = hasher.job(path)
+    if job is None or job.finished:
+        st.rerun() # Show the digest (or the error) in the detail panel
+    st.progress(job.fraction, text=f"Hashing… {job.done_bytes / 1e6:,.1f} / {job.size / 1e6:,.1f} MB")
+
+
+def _start_hash(hasher, path: str):
+    # Callback: the job exists before the panel reruns, so it opens on the progress bar
+    try:
+        hasher.submit(path)
+    except OSError as e:
+        st.toast(f"Error computing hash: {e}", icon="❌")
+
+
+def _render_text_pages(artifact):
+    """
+    Paged view of a large text file: only the shown lines are read (mmap + cached line index).
+    """
+    path = artifact["path"]
+    try:
+        total_lines = sources_service.line_count(path)
+        line = st.number_input("Go to line", min_value=1, max_value=max(total_lines, 1),
+                               step=sources_service.PREVIEW_WINDOW_LINES, key=f"line_{path}")
+        window = sources_service.preview_lines(path, int(line) - 1)
+    except (OSError, ValueError) as e:
+        st.error(f"Cannot read file: {e}")
+        return
+
+    st.caption(f"Lines {window.start_line + 1:,}–{window.end_line:,} of {window.total_lines:,}"
+               + (" (cut at the window size limit)" if window.truncated else ""))
+    st.code(window.text, language=None)
+
+def _render_pdf_pages(repo, artifact, thumbnails) -> bool:
+    """
+    Page viewer for an indexed PDF, served from the stored per-page text. False if no pages are stored.
+    """
+    count = repo.count_pages(artifact["id"])
+    if not count:
+        return False
+    page = st.number_input("Page", min_value=1, max_value=count, key=f"pdf_page_{artifact['path']}")
+    view = pdf_preview.page_view(repo, artifact["id"], artifact["path"], page, thumbnails)
+    pdf_page.render(view)
+    return True
+
+
+def _select_artifact(path: str):
+    # Callback: only the detail panel reads the selection, so rerun just that fragment
+    st.session_state["selected_artifact_path"] = path
+    st.rerun(scope=DETAIL_FRAGMENT)
+
+
+def _set_page(page: int):
+    st.session_state["sources_page"] = max(page, 0)
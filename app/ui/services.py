@@ -0,0 +1,136 @@
+
+import datetime
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+import streamlit as st
+
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.external_tools import ExternalTools
+from app.core.hashing_service import HashingService
+from app.core.extractors.registry import ExtractorRegistry
+from app.core.indexing_service import IndexingService
+from app.core.profiling import INDEXING_HOT_PATHS, SEARCH_HOT_PATHS, Profiler, ProfilingSettings, settings_from_config
+from app.core.search.service import SearchService
+from app.core.search.standing import StandingQueryService
+from app.core.thumbnails import DEFAULT_CACHE_BYTES, ThumbnailCache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TTL_SECONDS = 10 # Ingest folder re-read interval; statuses are always live (derived in SQL)
+
+@dataclass
+class Services:
+    """
+    Process-wide service container shared by every session and rerun.
+    """
+    repo: ArtifactsRepo
+    indexer: IndexingService
+    search: SearchService
+    standing: StandingQueryService
+    hasher: HashingService
+
+    @property
+    def registry(self) -> ExtractorRegistry:
+        return self.indexer.registry
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_services(db_path: str, features_key: str, profiling_key: str = "") -> Services:
+    # features_key: canonical JSON of the features section, so a config change builds a new container
+    # profiling_key: JSON of the ProfilingSettings, "" when profiling is off (nothing is wrapped)
+    logger.info(f"Building services for {db_path}")
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo, json.loads(features_key))
+    search = SearchService(repo)
+    if profiling_key:
+        profiler = Profiler(ProfilingSettings(**json.loads(profiling_key)))
+        logger.info(f"Profiling indexing/search hot paths into {profiler.settings.output_dir}")
+        profiler.instrument(indexer, INDEXING_HOT_PATHS)
+        profiler.instrument(search, SEARCH_HOT_PATHS)
+    return Services(repo=repo, indexer=indexer, search=search, standing=StandingQueryService(repo),
+                    hasher=_build_hasher(repo, db_path))
+
+@st.cache_resource(show_spinner=False)
+def _build_hasher(_repo: ArtifactsRepo, db_path: str) -> HashingService:
+    # Keyed on the DB only and kept across invalidate_services(): a config reload or feature
+    # change must not leak a worker pool or start a second backfill writing to the same DB
+    logger.info(f"Starting hashing service for {db_path}")
+    return HashingService(_repo)
+
+def get_services(config: Dict[str, Any]) -> Optional[Services]:
+    """
+    Container for the loaded app config (load_config() result); None without a usable DB.
+    """
+    db_path = config.get("db_path")
+    if not db_path or "db_init_error" in config:
+        return None
+    data = config.get("data") or {}
+    profiling = settings_from_config(data)
+    return _build_services(str(db_path), json.dumps(data.get("features", {}), sort_keys=True, default=str),
+                           json.dumps(asdict(profiling), sort_keys=True) if profiling else "")
+
+def invalidate_services():
+    """
+    Drops every cached container (e.g. after the config files changed).
+    The per-DB HashingService is kept: its jobs and backfill don't depend on the config.
+    """
+    _build_services.clear()
+    _build_thumbnail_cache.clear()
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build_thumbnail_cache(cache_dir: str, max_bytes: int, features_key: str) -> ThumbnailCache:
+    pdftoppm = ExternalTools.pdftoppm_path({"features": json.loads(features_key)})
+    logger.info(f"PDF thumbnails: {'pdftoppm ' + pdftoppm if pdftoppm else 'disabled (pdftoppm not found)'}")
+    return ThumbnailCache(cache_dir, pdftoppm, max_bytes)
+
+def get_thumbnail_cache(config: Dict[str, Any]) -> Optional[ThumbnailCache]:
+    """
+    Shared PDF thumbnail cache under paths.processed_dir/thumbnails (size: features.thumbnail_cache_mb).
+    None without a processed_dir.
+    """
+    data = config.get("data") or {}
+    processed_dir = (data.get("paths") or {}).get("processed_dir")
+    if not processed_dir:
+        return None
+    features = data.get("features", {})
+    max_mb = features.get("thumbnail_cache_mb")
+    max_bytes = int(max_mb * 1024 * 1024) if max_mb else DEFAULT_CACHE_BYTES
+    return _build_thumbnail_cache(os.path.join(str(processed_dir), "thumbnails"), max_bytes,
+                                  json.dumps(features, sort_keys=True, default=str))
+
+def refresh_workspace_snapshot(services: Services, ingest_dir: str, force: bool = False) -> bool:
+    """
+    Re-stats the ingest folder into the shared snapshot when it is older than SNAPSHOT_TTL_SECONDS.
+    Indexing a file updates its own row, so this only catches changes made outside the app.
+    """
+    scanned_at = services.repo.workspace_scanned_at(ingest_dir)
+    stale = scanned_at is None or (
+        datetime.datetime.now() - datetime.datetime.fromisoformat(scanned_at)
+    ).total_seconds() > SNAPSHOT_TTL_SECONDS
+    if force or stale:
+        services.indexer.snapshot_workspace(ingest_dir)
+    return force or stale
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _workspace_counts(_services: Services, db_path: str, ingest_dir: str, generation: int,
+                      scanned_at: Optional[str]) -> Dict[str, Dict[str, int]]:
+    return _services.repo.workspace_counts(ingest_dir)
+
+def cached_workspace_counts(services: Services, ingest_dir: str) -> Dict[str, Dict[str, int]]:
+    """
+    Snapshot status/ext counts, cached per (index generation, folder scan): indexing or a
+    rescan produces a new key, so nothing has to be cleared.
+    """
+    repo = services.repo
+    return _workspace_counts(services, str(repo.db_path), ingest_dir, repo.get_generation(), repo.workspace_scanned_at(ingest_dir))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_preview(path: str, version: int):
+    """
+    File preview keyed by the snapshot version of path (bumped when the file changes).
+    """
+    from app.services import sources_service
+    return sources_service.preview_artifact(path)
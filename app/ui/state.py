@@ -1,18 +1,10 @@
 
 import streamlit as st
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.ui.config_loader import load_config
-from app.db.database import init_or_upgrade_db
+from app.db.migrator import init_or_upgrade_db
 from pathlib import Path
 
-class AppState:
-    def __init__(self):
-        # Load config only once if possible, or reload on refresh
-        if "app_config" not in st.session_state:
-            st.session_state.app_config = load_config()
-        
-        self.config = st.session_state.app_config
-        
 @st.cache_resource
 def ensure_db_initialized(db_path_str: str):
     """
@@ -32,9 +24,9 @@ class AppState:
         # Load config only once if possible, or reload on refresh
         if "app_config" not in st.session_state:
             st.session_state.app_config = load_config()
-        
+
         self.config = st.session_state.app_config
-        
+
         # Initialize DB (Singleton)
         if self.config.get("db_path"):
              db_init_res = ensure_db_initialized(self.config["db_path"])
@@ -54,5 +46,23 @@ class AppState:
         # In a real app, we might check connection here or cache the result
         return "OK" # Placeholder, actual check done in Home page logic or here
 
+    @property
+    def services(self):
+        """
+        Shared repo/indexer/search services (built once per process). None without a DB.
+        """
+        from app.ui.services import get_services
+        return get_services(self.config)
+
+    def reload_config(self):
+        """
+        Re-reads the config files and drops cached services and migrations.
+        """
+        from app.ui.services import invalidate_services
+        st.session_state.app_config = load_config()
+        self.config = st.session_state.app_config
+        invalidate_services()
+        ensure_db_initialized.clear()
+
 def init_app_state() -> AppState:
     return AppState()
@@ -0,0 +1,90 @@
+
+import json
+import math
+import platform
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Benchmark results are plain JSON:
+#   {"meta": {...}, "results": {<group>: {<scenario>: {<metric>: value}}}}
+# Baselines use the same shape and are compared metric by metric.
+
+DEFAULT_TOLERANCE = 0.25 # Flag a regression when a metric is >25% worse than baseline
+
+
+def percentiles(samples: List[float], points=(50, 90, 95, 99)) -> Dict[str, float]:
+    """
+    Nearest-rank percentiles of samples (seconds), reported in milliseconds.
+    """
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    out = {}
+    for p in points:
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        out[f"p{p}_ms"] = round(ordered[rank - 1] * 1000, 3)
+    out["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 3)
+    out["n"] = len(ordered)
+    return out
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def fresh_db(db_path: Path) -> str:
+    """
+    Creates an empty DB through the same migration path as the app (removing any previous run).
+    """
+    from app.db import migrator
+
+    for suffix in ("", "-wal", "-shm", ".ivf", ".ivf.delta"):
+        p = Path(f"{db_path}{suffix}")
+        if p.exists():
+            p.unlink()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    migrator.init_or_upgrade_db(db_path, Path(__file__).resolve().parents[1] / "db" / "migrations")
+    return str(db_path)
+
+
+def load_json(path: Path) -> Optional[Dict[str, Any]]:
+    if not path or not Path(path).exists():
+        return None
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def write_json(path: Path, data: Dict[str, Any]):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], metrics: Dict[str, str],
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compares results["results"] against baseline["results"].
+    metrics maps metric name -> "lower" or "higher" (which direction is better).
+    Returns human-readable regression lines; groups/scenarios missing from the baseline are skipped.
+    """
+    regressions = []
+    base_results = (baseline or {}).get("results", {})
+    for group, scenarios in results.get("results", {}).items():
+        for scenario, values in scenarios.items():
+            base = base_results.get(group, {}).get(scenario)
+            if not base:
+                continue
+            for metric, better in metrics.items():
+                new, old = values.get(metric), base.get(metric)
+                if new is None or not old:
+                    continue
+                if better == "lower" and new > old * (1 + tolerance):
+                    regressions.append(f"{group}/{scenario} {metric}: {new} vs baseline {old} (+{(new / old - 1) * 100:.0f}%)")
+                elif better == "higher" and new < old * (1 - tolerance):
+                    regressions.append(f"{group}/{scenario} {metric}: {new} vs baseline {old} ({(new / old - 1) * 100:.0f}%)")
+    return regressions
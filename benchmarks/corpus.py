@@ -0,0 +1,170 @@
+
+import json
+import os
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Deterministic synthetic corpus: same (n_docs, seed, mix) -> byte-identical files and mtimes.
+# Vocabulary = a fixed domain word list (frequent) + generated pseudo-words drawn with a
+# Zipf-like distribution, so the index sees realistic common/rare term statistics.
+
+DEFAULT_MIX = {".txt": 0.45, ".md": 0.2, ".json": 0.15, ".pdf": 0.1, ".docx": 0.1}
+BASE_TIME = 1_735_689_600 # 2025-01-01 UTC; mtimes spread over 24 months for date facets/filters
+
+DOMAIN_WORDS = """
+pump valve pressure sensor motor relief flow rate temperature controller inspection maintenance
+report manual procedure safety warning operator batch line station conveyor hydraulic pneumatic
+calibration tolerance drawing revision assembly bearing seal gasket flange torque voltage current
+alarm shutdown startup cycle throughput quality defect audit supplier order invoice schedule
+""".split()
+
+_SYLLABLES = ["ka", "ro", "mi", "ten", "sa", "vo", "lin", "dra", "pe", "qu", "zor", "fi", "nal", "bo", "tri", "shu"]
+
+
+def _pseudo_words(rng: random.Random, count: int) -> List[str]:
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class CorpusGenerator:
+    """
+    Generates documents into a flat directory (IndexingService scans non-recursively).
+    Every document carries a unique code 'DOC<id>' so exact lookups can be benchmarked.
+    """
+
+    def __init__(self, seed: int = 0, mix: Optional[Dict[str, float]] = None, vocab_size: int = 20_000):
+        self.seed = seed
+        self.mix = mix or DEFAULT_MIX
+        rng = random.Random(seed)
+        self.vocabulary = DOMAIN_WORDS + _pseudo_words(rng, vocab_size)
+        # Zipf-like weights: rank r -> 1/r
+        self._weights = [1.0 / (rank + 1) for rank in range(len(self.vocabulary))]
+        self._cum_weights = []
+        total = 0.0
+        for w in self._weights:
+            total += w
+            self._cum_weights.append(total)
+
+    def words(self, rng: random.Random, count: int) -> List[str]:
+        return rng.choices(self.vocabulary, cum_weights=self._cum_weights, k=count)
+
+    def _ext_for(self, rng: random.Random) -> str:
+        exts = list(self.mix)
+        return rng.choices(exts, weights=[self.mix[e] for e in exts], k=1)[0]
+
+    def document(self, doc_id: int):
+        """
+        Returns (filename, ext, paragraphs, mtime) for doc_id.
+        """
+        rng = random.Random(f"{self.seed}:{doc_id}")
+        ext = self._ext_for(rng)
+        paragraphs = []
+        for _ in range(rng.randint(1, 6)):
+            paragraphs.append(" ".join(self.words(rng, rng.randint(20, 120))))
+        paragraphs[0] = f"DOC{doc_id:06d} {paragraphs[0]}"
+        title = "_".join(self.words(rng, 2))
+        mtime = BASE_TIME + rng.randint(0, 730) * 86_400
+        return f"{doc_id:06d}_{title}{ext}", ext, paragraphs, mtime
+
+    def generate(self, out_dir: Path, n_docs: int) -> List[Path]:
+        """
+        Writes n_docs files to out_dir. Existing complete corpora are reused
+        (marker '<out_dir>.json' next to the directory, so it is not indexed).
+        """
+        out_dir = Path(out_dir)
+        marker = out_dir.with_name(out_dir.name + ".json")
+        spec = {"n_docs": n_docs, "seed": self.seed, "mix": self.mix}
+        if marker.exists() and json.loads(marker.read_text(encoding="utf-8")) == spec:
+            return sorted(out_dir.iterdir())
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for doc_id in range(n_docs):
+            filename, ext, paragraphs, mtime = self.document(doc_id)
+            path = out_dir / filename
+            write_document(path, ext, paragraphs)
+            os.utime(path, (mtime, mtime))
+            paths.append(path)
+
+        marker.write_text(json.dumps(spec), encoding="utf-8")
+        return paths
+
+
+def write_document(path: Path, ext: str, paragraphs: List[str]):
+    if ext == ".pdf":
+        path.write_bytes(minimal_pdf(paragraphs))
+    elif ext == ".docx":
+        from docx import Document
+        doc = Document()
+        for para in paragraphs:
+            doc.add_paragraph(para)
+        doc.save(str(path))
+    elif ext == ".json":
+        payload = {"title": paragraphs[0][:40], "sections": [{"id": i, "body": p} for i, p in enumerate(paragraphs)]}
+        path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    elif ext == ".md":
+        body = "\n\n".join(f"## Section {i + 1}\n\n{p}" for i, p in enumerate(paragraphs))
+        path.write_text(f"# {paragraphs[0][:40]}\n\n{body}\n", encoding="utf-8")
+    else:
+        path.write_text("\n\n".join(paragraphs) + "\n", encoding="utf-8")
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int = 90) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def minimal_pdf(paragraphs: List[str], lines_per_page: int = 50) -> bytes:
+    """
+    Writes a small valid PDF (Helvetica text, one content stream per page) without extra dependencies.
+    Text is extractable by pypdf.
+    """
+    lines = []
+    for para in paragraphs:
+        lines.extend(_wrap(para))
+        lines.append("")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object numbers: 1 catalog, 2 pages, 3 font, then (page, content) pairs
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for i, page_lines in enumerate(pages):
+        page_obj, content_obj = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_obj} 0 R")
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 800 Td"]
+        ops += [f"({_pdf_escape(line)}) '" for line in page_lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", errors="replace")
+        objects[page_obj] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                             f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_obj} 0 R >>").encode()
+        objects[content_obj] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += b"%d 0 obj\n" % num + objects[num] + b"\nendobj\n"
+
+    xref_at = len(out)
+    count = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % count
+    for num in range(1, count):
+        out += b"%010d 00000 n \n" % offsets[num]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, xref_at)
+    return bytes(out)
@@ -0,0 +1,189 @@
+
+import argparse
+import logging
+import sqlite3
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import (DEFAULT_TOLERANCE, compare_to_baseline, environment, fresh_db,
+                               load_json, write_json)
+from benchmarks.corpus import DEFAULT_MIX, CorpusGenerator
+from benchmarks.search_bench import DEFAULT_WORKDIR
+
+# Indexing throughput / memory benchmark:
+#
+#   python -m benchmarks.indexing_bench --sizes 1000 5000 --mixes default text office
+#   python -m benchmarks.indexing_bench --tracemalloc      # Python heap peak (slows indexing ~2x)
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "indexing.json"
+COMPARED_METRICS = {"files_per_s": "higher", "mb_per_s": "higher", "db_bytes_per_1k_docs": "lower"}
+SAMPLE_EVERY = 1000 # DB size sample interval (documents)
+
+MIXES = {
+    "default": DEFAULT_MIX,
+    "text": {".txt": 0.6, ".md": 0.2, ".json": 0.2},
+    "office": {".pdf": 0.5, ".docx": 0.5},
+}
+
+logger = logging.getLogger(__name__)
+
+try:
+    import resource # POSIX only
+except ImportError:
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Process high-water RSS (never decreases within a process). None where unavailable (Windows).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def db_size_bytes(db_path: Path) -> int:
+    return sum(Path(f"{db_path}{s}").stat().st_size for s in ("", "-wal") if Path(f"{db_path}{s}").exists())
+
+
+def _instrument(extractor, totals: Dict[str, Dict[str, float]]):
+    """
+    Wraps extractor.extract on the instance (class name, which is stored in the DB, is unchanged)
+    and accumulates files/seconds/bytes per extractor class.
+    """
+    entry = totals.setdefault(extractor.__class__.__name__, {"files": 0, "seconds": 0.0, "bytes": 0})
+    extract = extractor.extract
+
+    def timed_extract(path: str):
+        start = time.perf_counter()
+        try:
+            return extract(path)
+        finally:
+            entry["seconds"] += time.perf_counter() - start
+            entry["files"] += 1
+            entry["bytes"] += Path(path).stat().st_size
+
+    extractor.extract = timed_extract
+
+
+def bench_corpus(paths: List[Path], db_path: Path, semantic: bool = True, trace_memory: bool = False) -> Dict[str, Any]:
+    """
+    Indexes paths into a fresh DB with IndexingService.index_file (the same per-file path
+    index_all takes), sampling DB size every SAMPLE_EVERY documents, then builds the ANN index if due.
+    """
+    from app.core.artifacts_repo import ArtifactsRepo
+    from app.core.indexing_service import IndexingService
+
+    repo = ArtifactsRepo(fresh_db(db_path))
+    service = IndexingService(repo, {"semantic_enabled": semantic})
+
+    extractor_totals: Dict[str, Dict[str, float]] = {}
+    instrumented = set()
+    for ext in {p.suffix.lower() for p in paths}:
+        extractor = service.registry.get(ext)
+        if extractor and id(extractor) not in instrumented: # One instance may serve several extensions
+            _instrument(extractor, extractor_totals)
+            instrumented.add(id(extractor))
+
+    input_bytes = sum(p.stat().st_size for p in paths)
+    growth = []
+    statuses: Dict[str, int] = {}
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for i, path in enumerate(paths, start=1):
+        status = service.index_file(str(path))
+        statuses[status] = statuses.get(status, 0) + 1
+        if i % SAMPLE_EVERY == 0:
+            growth.append({"docs": i, "db_bytes": db_size_bytes(db_path), "seconds": round(time.perf_counter() - start, 3)})
+    service.maybe_rebuild_ann_index()
+    seconds = time.perf_counter() - start
+
+    heap_peak = None
+    if trace_memory:
+        heap_peak = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    final_size = db_size_bytes(db_path)
+    n = len(paths)
+
+    return {
+        "docs": n,
+        "seconds": round(seconds, 3),
+        "files_per_s": round(n / seconds, 1) if seconds else None,
+        "mb_per_s": round(input_bytes / (1024 * 1024) / seconds, 3) if seconds else None,
+        "input_mb": round(input_bytes / (1024 * 1024), 2),
+        "db_bytes": final_size,
+        "db_bytes_per_1k_docs": round(final_size / n * 1000) if n else None,
+        "db_growth": growth,
+        "peak_rss_mb": peak_rss_mb(),
+        "tracemalloc_peak_mb": heap_peak,
+        "statuses": statuses,
+        "extractors": {
+            name: {"files": t["files"], "seconds": round(t["seconds"], 3),
+                   "ms_per_file": round(t["seconds"] / t["files"] * 1000, 3) if t["files"] else None,
+                   "mb_per_s": round(t["bytes"] / (1024 * 1024) / t["seconds"], 3) if t["seconds"] else None}
+            for name, t in sorted(extractor_totals.items())
+        },
+    }
+
+
+def run(sizes: List[int], mixes: List[str], workdir: Path = DEFAULT_WORKDIR, seed: int = 0,
+        semantic: bool = True, trace_memory: bool = False) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for mix in mixes:
+        for n in sizes:
+            corpus_dir = Path(workdir) / f"corpus_{mix}_{n}_{seed}"
+            paths = CorpusGenerator(seed=seed, mix=MIXES[mix]).generate(corpus_dir, n)
+            stats = bench_corpus(paths, Path(workdir) / f"indexing_{mix}_{n}_{seed}.db", semantic, trace_memory)
+            results.setdefault(mix, {})[str(n)] = stats
+            logger.info(f"{mix}/{n}: {stats['files_per_s']} files/s, {stats['mb_per_s']} MB/s, "
+                        f"{stats['db_bytes_per_1k_docs']} DB bytes/1k docs, peak RSS {stats['peak_rss_mb']} MB")
+
+    return {
+        "meta": {**environment(), "benchmark": "indexing", "seed": seed, "semantic": semantic, "tracemalloc": trace_memory},
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Indexing throughput and memory benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000], help="Corpus sizes (documents).")
+    parser.add_argument("--mixes", nargs="+", choices=sorted(MIXES), default=["default", "text", "office"])
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR, help="Corpus/DB cache directory.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-semantic", action="store_true", help="Skip chunk embeddings.")
+    parser.add_argument("--tracemalloc", action="store_true", help="Record the Python heap peak (slower).")
+    parser.add_argument("--output", type=Path, help="Write results JSON here.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = run(args.sizes, args.mixes, args.workdir, args.seed, not args.no_semantic, args.tracemalloc)
+
+    if args.output:
+        write_json(args.output, results)
+    if args.update_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(results, load_json(args.baseline), COMPARED_METRICS, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    print(f"{len(regressions)} regression(s) vs {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
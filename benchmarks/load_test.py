@@ -0,0 +1,172 @@
+
+import argparse
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import environment, fresh_db, percentiles, write_json
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.search_bench import DEFAULT_WORKDIR, build_scenarios
+
+# Mixed read/write load test: N search clients hammer SearchService while a writer
+# indexes the second half of a corpus through IndexingService.
+#
+#   python -m benchmarks.load_test --docs 4000 --readers 8
+#   python -m benchmarks.load_test --readers 16 --mode hybrid --output load.json
+
+logger = logging.getLogger(__name__)
+
+
+def _is_lock_error(e: Exception) -> bool:
+    msg = str(e).lower()
+    return "locked" in msg or "busy" in msg
+
+
+class _LockLogCounter(logging.Handler):
+    """
+    IndexingService logs and swallows per-file errors; count the lock-related ones.
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        if "locked" in record.getMessage().lower():
+            with self._lock:
+                self.count += 1
+
+
+class Reader(threading.Thread):
+    def __init__(self, service, calls: List[Dict[str, Any]], stop: threading.Event, mode: str, max_retries: int, seed: int):
+        super().__init__(daemon=True)
+        self.service = service
+        self.calls = calls
+        self.stop = stop
+        self.mode = mode
+        self.max_retries = max_retries
+        self.rng = random.Random(seed)
+        self.latencies: List[float] = []
+        self.lock_errors = 0
+        self.retries = 0
+        self.failed = 0
+        self.other_errors = 0
+
+    def run(self):
+        while not self.stop.is_set():
+            call = self.rng.choice(self.calls)
+            start = time.perf_counter()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.service.search(mode=self.mode, **call)
+                    # Latency includes retries: that is what the user waits for
+                    self.latencies.append(time.perf_counter() - start)
+                    break
+                except sqlite3.OperationalError as e:
+                    if not _is_lock_error(e):
+                        self.other_errors += 1
+                        break
+                    self.lock_errors += 1
+                    if attempt == self.max_retries:
+                        self.failed += 1
+                    else:
+                        self.retries += 1
+                        time.sleep(0.01 * 2 ** attempt)
+                except Exception:
+                    self.other_errors += 1
+                    break
+
+
+def run(docs: int = 2000, readers: int = 4, workdir: Path = DEFAULT_WORKDIR, seed: int = 0, mode: str = "lexical",
+        preindex: float = 0.5, max_retries: int = 3, semantic: bool = False) -> Dict[str, Any]:
+    """
+    Indexes the first `preindex` share of the corpus, then runs readers against it while one
+    writer indexes the rest. Readers stop when the writer is done.
+    """
+    from app.core.artifacts_repo import ArtifactsRepo
+    from app.core.indexing_service import IndexingService
+    from app.core.search.service import SearchService
+
+    paths = CorpusGenerator(seed=seed).generate(Path(workdir) / f"corpus_{docs}_{seed}", docs)
+    db_path = fresh_db(Path(workdir) / f"load_{docs}_{seed}.db")
+    split = int(len(paths) * preindex)
+
+    writer_service = IndexingService(ArtifactsRepo(db_path), {"semantic_enabled": semantic})
+    for path in paths[:split]:
+        writer_service.index_file(str(path))
+
+    calls = [call for scenario in build_scenarios(docs, seed).values() for call in scenario]
+    stop = threading.Event()
+    pool = [Reader(SearchService(ArtifactsRepo(db_path)), calls, stop, mode, max_retries, seed + i) for i in range(readers)]
+
+    lock_logs = _LockLogCounter()
+    logging.getLogger("app").addHandler(lock_logs)
+    statuses: Dict[str, int] = {}
+    try:
+        for reader in pool:
+            reader.start()
+        start = time.perf_counter()
+        for path in paths[split:]:
+            status = writer_service.index_file(str(path))
+            statuses[status] = statuses.get(status, 0) + 1
+        writer_seconds = time.perf_counter() - start
+    finally:
+        stop.set()
+        for reader in pool:
+            reader.join()
+        logging.getLogger("app").removeHandler(lock_logs)
+
+    latencies = [s for r in pool for s in r.latencies]
+    written = len(paths) - split
+    return {
+        "meta": {**environment(), "benchmark": "load", "docs": docs, "readers": readers, "mode": mode,
+                 "preindexed": split, "max_retries": max_retries, "semantic": semantic},
+        "readers": {
+            **percentiles(latencies),
+            "ops_per_s": round(len(latencies) / writer_seconds, 1) if writer_seconds else None,
+            "lock_errors": sum(r.lock_errors for r in pool),
+            "retries": sum(r.retries for r in pool),
+            "failed_after_retries": sum(r.failed for r in pool),
+            "other_errors": sum(r.other_errors for r in pool),
+        },
+        "writer": {
+            "files": written,
+            "seconds": round(writer_seconds, 3),
+            "files_per_s": round(written / writer_seconds, 1) if writer_seconds else None,
+            "statuses": statuses,
+            "lock_errors_logged": lock_logs.count,
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent search + indexing load test (WAL contention).")
+    parser.add_argument("--docs", type=int, default=2000, help="Corpus size (documents).")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent search clients.")
+    parser.add_argument("--mode", choices=["lexical", "semantic", "hybrid"], default="lexical")
+    parser.add_argument("--preindex", type=float, default=0.5, help="Share of the corpus indexed before the load starts.")
+    parser.add_argument("--max-retries", type=int, default=3, help="Reader retries on 'database is locked'.")
+    parser.add_argument("--semantic", action="store_true", help="Writer also computes embeddings (implied by --mode semantic/hybrid).")
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR, help="Corpus/DB cache directory.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write results JSON here.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    semantic = args.semantic or args.mode != "lexical"
+    results = run(args.docs, args.readers, args.workdir, args.seed, args.mode, args.preindex, args.max_retries, semantic)
+
+    if args.output:
+        write_json(args.output, results)
+    print(json.dumps({k: results[k] for k in ("readers", "writer")}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
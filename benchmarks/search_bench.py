@@ -0,0 +1,141 @@
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.common import (DEFAULT_TOLERANCE, compare_to_baseline, environment, fresh_db,
+                               load_json, percentiles, write_json)
+from benchmarks.corpus import DOMAIN_WORDS, CorpusGenerator
+
+# Query latency benchmark: generate a corpus, index it through IndexingService,
+# then time SearchService.search for each scenario.
+#
+#   python -m benchmarks.search_bench --sizes 1000 10000
+#   python -m benchmarks.search_bench --sizes 1000 --update-baseline
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "search.json"
+COMPARED_METRICS = {"p50_ms": "lower", "p95_ms": "lower"}
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "project_copilot_bench"
+
+logger = logging.getLogger(__name__)
+
+
+def build_index(corpus_dir: Path, db_path: Path, semantic: bool = False) -> Dict[str, Any]:
+    """
+    Indexes corpus_dir into a fresh DB through IndexingService.index_all.
+    """
+    from app.core.artifacts_repo import ArtifactsRepo
+    from app.core.indexing_service import IndexingService
+
+    repo = ArtifactsRepo(fresh_db(db_path))
+    service = IndexingService(repo, {"semantic_enabled": semantic})
+    start = time.perf_counter()
+    counts = service.index_all(str(corpus_dir))
+    return {"seconds": round(time.perf_counter() - start, 3), "counts": counts}
+
+
+def build_scenarios(n_docs: int, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Query calls per scenario, as SearchService.search kwargs. Deterministic for (n_docs, seed).
+    """
+    rng = random.Random(seed)
+    common = DOMAIN_WORDS[:8]
+    codes = [f"DOC{rng.randrange(n_docs):06d}" for _ in range(8)]
+    months = [f"{y}-{m:02d}" for y in (2025, 2026) for m in (1, 4, 7, 10)]
+    deep_offsets = [o for o in (0, 100, 1000, 5000) if o < n_docs]
+
+    return {
+        "fts_term": [{"query": w} for w in common],
+        "fts_two_terms": [{"query": f"{a} {b}"} for a, b in zip(common, reversed(common))],
+        "fts_rare": [{"query": c} for c in codes],
+        "fts_phrase": [{"query": f'"{a} {b}"'} for a, b in zip(common[::2], common[1::2])],
+        "fts_prefix": [{"query": f"{w[:3]}*"} for w in common],
+        "like": [{"query": w} for w in common[:4]] + [{"query": c} for c in codes[:4]],
+        "filtered": [{"query": w, "filters": {"ext": ext}} for w, ext in zip(common, [".pdf", ".md", ".txt", ".docx"] * 2)]
+                    + [{"query": w, "filters": {"month": m}} for w, m in zip(common, months)],
+        "paginated": [{"query": w, "offset": o} for w in common[:4] for o in deep_offsets],
+    }
+
+
+def time_calls(fn: Callable[..., Any], calls: List[Dict[str, Any]], repeat: int) -> List[float]:
+    for call in calls: # Warm up page cache and statement cache
+        fn(**call)
+    samples = []
+    for _ in range(repeat):
+        for call in calls:
+            start = time.perf_counter()
+            fn(**call)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_size(n_docs: int, workdir: Path, seed: int = 0, repeat: int = 5, semantic: bool = False) -> Dict[str, Any]:
+    from app.core.artifacts_repo import ArtifactsRepo
+    from app.core.search.service import SearchService
+
+    corpus_dir = workdir / f"corpus_{n_docs}_{seed}"
+    db_path = workdir / f"search_{n_docs}_{seed}.db"
+
+    CorpusGenerator(seed=seed).generate(corpus_dir, n_docs)
+    index_stats = build_index(corpus_dir, db_path, semantic=semantic)
+    logger.info(f"Indexed {n_docs} docs in {index_stats['seconds']}s: {index_stats['counts']}")
+
+    fts_service = SearchService(ArtifactsRepo(str(db_path)))
+    like_repo = ArtifactsRepo(str(db_path))
+    like_repo._fts_enabled = False # Force the LIKE fallback
+    like_service = SearchService(like_repo)
+
+    results = {}
+    for name, calls in build_scenarios(n_docs, seed).items():
+        service = like_service if name == "like" else fts_service
+        # LIKE scans every text blob: keep its sample count bounded on big corpora
+        reps = max(1, repeat // 4) if name == "like" else repeat
+        results[name] = percentiles(time_calls(service.search, calls, reps))
+        logger.info(f"{n_docs} docs / {name}: {results[name]}")
+    return results
+
+
+def run(sizes: List[int], workdir: Path = DEFAULT_WORKDIR, seed: int = 0, repeat: int = 5, semantic: bool = False) -> Dict[str, Any]:
+    return {
+        "meta": {**environment(), "benchmark": "search", "seed": seed, "repeat": repeat, "semantic": semantic},
+        "results": {str(n): bench_size(n, Path(workdir), seed, repeat, semantic) for n in sizes},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Search latency benchmark over a synthetic corpus.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="Corpus sizes (documents).")
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR, help="Corpus/DB cache directory.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--semantic", action="store_true", help="Also compute embeddings while indexing.")
+    parser.add_argument("--output", type=Path, help="Write results JSON here.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = run(args.sizes, args.workdir, args.seed, args.repeat, args.semantic)
+
+    if args.output:
+        write_json(args.output, results)
+    if args.update_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(results, load_json(args.baseline), COMPARED_METRICS, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    print(f"{len(regressions)} regression(s) vs {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+
+import argparse
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import environment, write_json
+
+# Cold-start benchmark: import cost of the app entry point (python -X importtime) and
+# time-to-first-render of the Home page, each in a fresh interpreter.
+#
+#   python -m benchmarks.startup_bench
+#   python -m benchmarks.startup_bench --repeat 5 --output startup.json
+#
+# Exit code 1 when a budget is exceeded or a deferred module is imported at startup.
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENTRY_MODULE = "app.run_streamlit"
+
+# Generous on purpose: catches regressions such as an eager pypdf import (~200 ms), not jitter
+BUDGETS_MS = {
+    "app_import_ms": 200, # Entry point import minus the streamlit package itself
+    "first_render_ms": 6000, # Fresh process: AppTest + config + DB init + Home page
+}
+
+# Must not be imported before they are used (lazy pages, extractor backends)
+DEFERRED_MODULES = ("pypdf", "docx", "app.ui.pages.sources", "app.ui.pages.search", "app.core.extractors.pdf")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+FIRST_RENDER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({script!r}, default_timeout=60).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "first_render_ms": round(elapsed * 1000, 1),
+    "exception": [str(e.value) for e in at.exception],
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """
+    {module: {"self_us", "cumulative_us", "depth"}} from python -X importtime output.
+    """
+    out = {}
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if m:
+            out[m.group(4)] = {"self_us": int(m.group(1)), "cumulative_us": int(m.group(2)),
+                               "depth": len(m.group(3)) // 2}
+    return out
+
+
+def import_profile(module: str = ENTRY_MODULE) -> Dict[str, Dict[str, int]]:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=REPO_ROOT, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def app_import_ms(profile: Dict[str, Dict[str, int]], module: str = ENTRY_MODULE) -> float:
+    """
+    Cumulative import time of module, excluding the streamlit package (a fixed cost we don't control).
+    """
+    total = profile[module]["cumulative_us"] - profile.get("streamlit", {}).get("cumulative_us", 0)
+    return round(total / 1000, 1)
+
+
+def first_render(workdir: Path) -> Dict[str, Any]:
+    """
+    Runs the app's first script run (Home page) in a fresh interpreter against a throwaway config.
+    """
+    workdir.mkdir(parents=True, exist_ok=True)
+    config = workdir / "startup.yaml"
+    paths = {name: str(workdir / name) for name in ("ingest", "processed", "logs")}
+    for p in paths.values():
+        os.makedirs(p, exist_ok=True)
+    config.write_text(
+        "env: bench\n"
+        "paths:\n"
+        f"  db_path: {json.dumps(str(workdir / 'startup.db'))}\n"
+        f"  data_dir: {json.dumps(str(workdir))}\n"
+        f"  ingest_dir: {json.dumps(paths['ingest'])}\n"
+        f"  processed_dir: {json.dumps(paths['processed'])}\n"
+        f"  logs_dir: {json.dumps(paths['logs'])}\n"
+        "features:\n"
+        "  search_enabled: true\n",
+        encoding="utf-8",
+    )
+    script = FIRST_RENDER_SCRIPT.format(script=str(REPO_ROOT / "app" / "run_streamlit.py"))
+    env = {**os.environ, "PROJECT_COPILOT_CONFIG_FILE": str(config), "PYTHONPATH": str(REPO_ROOT)}
+    proc = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, env=env,
+                          capture_output=True, text=True, timeout=300)
+    if proc.returncode != 0:
+        raise RuntimeError(f"First render failed: {proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(workdir: Optional[Path] = None, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Best of repeat runs for each metric (cold start noise is one-sided), plus budget violations.
+    """
+    workdir = Path(workdir or Path(tempfile.mkdtemp(prefix="startup_bench_")))
+    profiles = [import_profile() for _ in range(repeat)]
+    renders = [first_render(workdir / f"run_{i}") for i in range(repeat)]
+
+    results = {
+        "app_import_ms": min(app_import_ms(p) for p in profiles),
+        "streamlit_import_ms": min(round(p.get("streamlit", {}).get("cumulative_us", 0) / 1000, 1) for p in profiles),
+        "first_render_ms": min(r["first_render_ms"] for r in renders),
+        "top_app_imports": sorted(
+            ((name, round(v["cumulative_us"] / 1000, 1)) for name, v in profiles[0].items() if name.startswith("app.")),
+            key=lambda item: -item[1],
+        )[:10],
+    }
+
+    violations = [f"{metric}: {results[metric]} ms > budget {budget} ms"
+                  for metric, budget in BUDGETS_MS.items() if results[metric] > budget]
+    for name in DEFERRED_MODULES:
+        if name in profiles[0]:
+            violations.append(f"{name} imported by {ENTRY_MODULE}")
+        if any(name in r["modules"] for r in renders):
+            violations.append(f"{name} imported before the first render")
+    violations += [f"First render raised: {e}" for r in renders for e in r["exception"]]
+
+    return {"meta": {**environment(), "benchmark": "startup", "repeat": repeat, "budgets_ms": BUDGETS_MS},
+            "results": results, "violations": violations}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start import cost and time-to-first-render.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", type=Path, help="Scratch directory for the throwaway config/DB.")
+    parser.add_argument("--output", type=Path, help="Write results JSON here.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = run(args.workdir, args.repeat)
+
+    if args.output:
+        write_json(args.output, results)
+    print(json.dumps(results["results"], indent=2))
+    for line in results["violations"]:
+        print(f"BUDGET {line}", file=sys.stderr)
+    return 1 if results["violations"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
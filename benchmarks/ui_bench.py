@@ -0,0 +1,150 @@
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import environment, percentiles, write_json
+from benchmarks.corpus import DOMAIN_WORDS, CorpusGenerator
+from benchmarks.search_bench import DEFAULT_WORKDIR, build_index
+
+# UI render benchmark: full page reruns vs the fragment reruns that selection,
+# paging and preview interactions now trigger (Sources and Search pages).
+#
+#   python -m benchmarks.ui_bench --docs 1000
+#   python -m benchmarks.ui_bench --docs 5000 --repeat 20 --output ui.json
+#
+# AppTest always reruns the whole script, even for a click inside a fragment, so each
+# fragment is timed on its own in a script that calls just that fragment function
+# (with the arguments Streamlit would reuse on a fragment rerun).
+
+logger = logging.getLogger(__name__)
+
+SCRIPT = """
+import streamlit as st
+from app.ui.pages import search, sources
+
+class _State:
+    config = {config!r}
+
+    @property
+    def services(self):
+        from app.ui.services import get_services
+        return get_services(self.config)
+
+state = _State()
+
+@st.cache_resource
+def _results(query):
+    # Fragment arguments are reused on fragment reruns: the search itself is not repeated
+    return state.services.search.search(query, limit=50)
+
+{body}
+"""
+
+SCENARIOS = {
+    "sources_full": "sources.render(state)",
+    "sources_inbox": "sources._inbox_panel(state.services, {ingest!r}, None, None, None, 'name')",
+    "sources_detail": "sources._detail_panel(state.services.repo)", # Reads selected_artifact_path
+    "search_full": "search.render(state)",
+    "search_results": "search._results_panel(state.services, {query!r}, 'lexical', _results({query!r}), {{}})",
+    "search_preview": "search._preview_panel(state.services.repo, _results({query!r})[0])",
+}
+
+# Fragment scenario -> the full-page scenario it replaces
+FRAGMENT_OF = {
+    "sources_inbox": "sources_full",
+    "sources_detail": "sources_full",
+    "search_results": "search_full",
+    "search_preview": "search_full",
+}
+
+
+def time_script(script: Path, session: Dict[str, Any], repeat: int) -> List[float]:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(script), default_timeout=60)
+    for key, value in session.items():
+        at.session_state[key] = value
+    at.run() # Warm up services, caches and imports
+    if at.exception:
+        raise RuntimeError(f"{script.name} failed: {at.exception[0].value}")
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench(n_docs: int, workdir: Path, seed: int = 0, repeat: int = 10) -> Dict[str, Any]:
+    from app.core.artifacts_repo import ArtifactsRepo
+    from app.core.search.service import SearchService
+
+    corpus_dir = workdir / f"corpus_{n_docs}_{seed}"
+    db_path = workdir / f"ui_{n_docs}_{seed}.db"
+
+    paths = CorpusGenerator(seed=seed).generate(corpus_dir, n_docs)
+    index_stats = build_index(corpus_dir, db_path)
+    logger.info(f"Indexed {n_docs} docs in {index_stats['seconds']}s: {index_stats['counts']}")
+
+    query = DOMAIN_WORDS[0]
+    hits = SearchService(ArtifactsRepo(str(db_path))).search(query, limit=50)
+    if not hits:
+        raise RuntimeError(f"No results for {query!r}; corpus too small")
+    selected_path = str(sorted(paths)[0])
+
+    config = {
+        "db_path": str(db_path),
+        "data": {"paths": {"ingest_dir": str(corpus_dir)},
+                 "features": {"search_enabled": True, "semantic_enabled": False}},
+    }
+    session = {
+        "selected_artifact_path": selected_path,
+        "search_query": query,
+        "search_selected_id": hits[0].artifact_id,
+    }
+    fields = {"ingest": str(corpus_dir), "selected_path": selected_path, "query": query}
+
+    results = {}
+    for name, body in SCENARIOS.items():
+        script = workdir / f"ui_{name}.py"
+        script.write_text(SCRIPT.format(config=config, body=body.format(**fields)), encoding="utf-8")
+        results[name] = percentiles(time_script(script, session, repeat))
+        logger.info(f"{n_docs} docs / {name}: {results[name]}")
+
+    for name, full in FRAGMENT_OF.items():
+        if results[name].get("p50_ms"):
+            results[name]["speedup_p50"] = round(results[full]["p50_ms"] / results[name]["p50_ms"], 2)
+    return results
+
+
+def run(docs: int = 1000, workdir: Path = DEFAULT_WORKDIR, seed: int = 0, repeat: int = 10) -> Dict[str, Any]:
+    return {
+        "meta": {**environment(), "benchmark": "ui", "seed": seed, "repeat": repeat},
+        "results": {str(docs): bench(docs, Path(workdir), seed, repeat)},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Full-page vs fragment rerun times for the Sources and Search pages.")
+    parser.add_argument("--docs", type=int, default=1000, help="Corpus size (documents).")
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR, help="Corpus/DB cache directory.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", type=Path, help="Write results JSON here.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = run(args.docs, args.workdir, args.seed, args.repeat)
+
+    if args.output:
+        write_json(args.output, results)
+    print(json.dumps(results["results"], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
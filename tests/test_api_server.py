@@ -0,0 +1,114 @@
+
+import pytest
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.api_server import create_server
+from app.core.api_client import ApiClient, ApiClientError
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "api.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def ingest(tmp_path):
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    (ingest / "valves.txt").write_text("The relief valve was replaced after the pressure test.", encoding="utf-8")
+    (ingest / "pumps.md").write_text("Pump curves and relief settings for the booster pump.", encoding="utf-8")
+    return ingest
+
+@pytest.fixture
+def client(db_path, ingest):
+    config = {"features": {"semantic_enabled": False}, "paths": {"ingest_dir": str(ingest)}}
+    server = create_server(db_path, config, port=0, workers=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield ApiClient(server.url)
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def test_index_then_search(client, ingest):
+    job = client.enqueue_index()
+    assert job["status"] == "queued"
+    done = client.wait_for_job(job["id"], timeout=30)
+    assert done["status"] == "done"
+    assert done["result"]["indexed"] == 2
+
+    result = client.search("relief")
+    assert result.total == 2
+    assert {ev.source_path.split("/")[-1] for ev in result.items} == {"valves.txt", "pumps.md"}
+    assert result.facets["ext"] == {".md": 1, ".txt": 1}
+    assert all(ev.match_offsets for ev in result.items)
+
+    filtered = client.search("relief", filters={"ext": ".md"})
+    assert [ev.artifact_type for ev in filtered.items] == [".md"]
+
+    assert client.suggest("valv")[0].text == "valve"
+
+    status = client.status()
+    assert status["artifacts"] == {"indexed": 2}
+    assert status["index_jobs"] == {"done": 1}
+    assert status["generation"] > 0
+
+def test_single_file_job_and_errors(client, ingest):
+    new = ingest / "notes.txt"
+    new.write_text("Torque wrench calibration notes.", encoding="utf-8")
+    job = client.wait_for_job(client.enqueue_index(str(new))["id"], timeout=30)
+    assert job["result"] == {"indexed": 1}
+    assert client.search("torque").total == 1
+
+    with pytest.raises(ApiClientError) as e:
+        client.enqueue_index(str(ingest / "missing.txt"))
+    assert e.value.status == 400
+    with pytest.raises(ApiClientError) as e:
+        client.search("torque", mode="fuzzy")
+    assert e.value.status == 400
+    with pytest.raises(ApiClientError) as e:
+        client.job(999)
+    assert e.value.status == 404
+
+def test_concurrent_requests(client):
+    client.wait_for_job(client.enqueue_index()["id"], timeout=30)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        totals = list(pool.map(lambda q: ApiClient(client.base_url).search(q).total, ["relief", "pump", "valve"] * 10))
+    assert totals == [2, 1, 1] * 10
+
+def test_pooled_repo_reuses_thread_connection(db_path):
+    repo = ArtifactsRepo(db_path, pooled=True)
+    assert repo._get_conn() is repo._get_conn()
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(repo._get_conn()))
+    t.start()
+    t.join()
+    assert other[0] is not repo._get_conn()
+
+    repo.close()
+    assert repo._pool == {}
+
+def test_index_rejects_paths_outside_ingest_dir(client, ingest, tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("private key material", encoding="utf-8")
+    (ingest / "link.txt").symlink_to(secret)
+
+    for path in (secret, ingest / ".." / "secret.txt", ingest / "link.txt", tmp_path):
+        with pytest.raises(ApiClientError) as e:
+            client.enqueue_index(str(path))
+        assert e.value.status == 403
+    assert client.status()["index_jobs"] == {}
+
+def test_post_requires_json_content_type(client, ingest):
+    import requests
+
+    # A cross-origin "simple request" from a web page: text/plain, no preflight
+    resp = requests.post(f"{client.base_url}/index", data='{"path": "%s"}' % ingest,
+                         headers={"Content-Type": "text/plain"}, timeout=10)
+    assert resp.status_code == 415
+    assert client.status()["index_jobs"] == {}
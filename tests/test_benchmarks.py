@@ -0,0 +1,80 @@
+
+import pytest
+from benchmarks.common import compare_to_baseline, percentiles
+from benchmarks.corpus import CorpusGenerator
+from benchmarks import search_bench
+
+pytestmark = pytest.mark.benchmark
+
+def test_corpus_is_deterministic(tmp_path):
+    a = CorpusGenerator(seed=3).generate(tmp_path / "a", 12)
+    b = CorpusGenerator(seed=3).generate(tmp_path / "b", 12)
+    assert [p.name for p in a] == [p.name for p in b]
+    assert [p.read_bytes() for p in a if p.suffix != ".docx"] == [p.read_bytes() for p in b if p.suffix != ".docx"]
+    assert [p.stat().st_mtime for p in a] == [p.stat().st_mtime for p in b]
+
+def test_generated_pdf_and_docx_are_extractable(tmp_path):
+    from app.core.extractors.registry import ExtractorRegistry
+
+    gen = CorpusGenerator(mix={".pdf": 0.5, ".docx": 0.5})
+    registry = ExtractorRegistry({})
+    for path in gen.generate(tmp_path / "c", 4):
+        result = registry.get(path.suffix).extract(str(path))
+        assert result.content and result.content.lstrip().startswith("DOC")
+
+def test_search_bench_smoke(tmp_path):
+    results = search_bench.run([30], workdir=tmp_path, repeat=1)
+    scenarios = results["results"]["30"]
+    assert set(scenarios) == set(search_bench.build_scenarios(30))
+    assert all(s["n"] > 0 and s["p50_ms"] <= s["p99_ms"] for s in scenarios.values())
+
+def test_percentiles_and_baseline_compare():
+    stats = percentiles([0.001 * i for i in range(1, 101)])
+    assert stats["p50_ms"] == 50.0 and stats["p99_ms"] == 99.0 and stats["n"] == 100
+
+    baseline = {"results": {"1000": {"fts_term": {"p50_ms": 10.0, "p95_ms": 20.0}}}}
+    current = {"results": {"1000": {"fts_term": {"p50_ms": 14.0, "p95_ms": 21.0}, "new_scenario": {"p50_ms": 1.0}}}}
+    regressions = compare_to_baseline(current, baseline, search_bench.COMPARED_METRICS, tolerance=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("1000/fts_term p50_ms")
+
+def test_indexing_bench_smoke(tmp_path, monkeypatch):
+    import sqlite3
+    from benchmarks import indexing_bench
+
+    monkeypatch.setattr(indexing_bench, "SAMPLE_EVERY", 5)
+    paths = CorpusGenerator(mix=indexing_bench.MIXES["default"]).generate(tmp_path / "corpus", 12)
+    db = tmp_path / "ix.db"
+    stats = indexing_bench.bench_corpus(paths, db, semantic=False, trace_memory=True)
+
+    assert stats["statuses"] == {"indexed": 12}
+    assert [g["docs"] for g in stats["db_growth"]] == [5, 10]
+    assert stats["files_per_s"] > 0 and stats["tracemalloc_peak_mb"] > 0
+    assert sum(e["files"] for e in stats["extractors"].values()) == 12
+
+    # Instrumentation must not change what gets recorded
+    with sqlite3.connect(db) as conn:
+        names = {r[0] for r in conn.execute("SELECT DISTINCT extractor FROM artifact_text")}
+    assert names <= {"PlainTextExtractor", "PdfExtractor", "DocxExtractor"}
+
+def test_load_test_smoke(tmp_path):
+    from benchmarks import load_test
+
+    results = load_test.run(docs=20, readers=2, workdir=tmp_path)
+    assert results["writer"]["statuses"] == {"indexed": 10}
+    assert results["readers"]["other_errors"] == 0
+    assert results["readers"]["n"] > 0
+
+def test_ui_bench_smoke(tmp_path):
+    from benchmarks import ui_bench
+
+    results = ui_bench.run(docs=12, workdir=tmp_path, repeat=1)["results"]["12"]
+    assert set(results) == set(ui_bench.SCENARIOS)
+    assert all(r["n"] == 1 for r in results.values())
+    assert all("speedup_p50" in results[name] for name in ui_bench.FRAGMENT_OF)
+
+def test_startup_within_budget(tmp_path):
+    from benchmarks import startup_bench
+
+    results = startup_bench.run(workdir=tmp_path, repeat=1)
+    assert results["violations"] == []
+    assert results["results"]["app_import_ms"] <= startup_bench.BUDGETS_MS["app_import_ms"]
@@ -0,0 +1,69 @@
+
+import csv
+import io
+import json
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core import export
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "export.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def repo(db_path):
+    repo = ArtifactsRepo(db_path)
+    for i in range(25):
+        name = f"doc{i:02d}.txt"
+        text = f"pump manual {i}" + (" pump" * i)
+        aid = repo.upsert_artifact({"path": f"/data/{name}", "filename": name, "ext": ".txt"})
+        repo.save_extracted_text(aid, text, "Plain", len(text), name, f"/data/{name}")
+        repo.save_chunks(aid, [{"content_text": f"part a {i}"}, {"content_text": f"part b {i}"}])
+    return repo
+
+def test_iter_export_streams_in_rank_order(repo):
+    streamed = list(repo.iter_export("pump", batch_size=4))
+    page = repo.search_artifacts("pump", limit=100)
+
+    assert [r["id"] for r in streamed] == [r["id"] for r in page]
+    assert "text" not in streamed[0]
+    assert streamed[0]["score"] == page[0]["score"]
+
+def test_whole_index_with_text(repo):
+    rows = list(repo.iter_export("", include_text=True, batch_size=7))
+    assert len(rows) == 25
+    assert all(r["text"].startswith("pump manual") for r in rows)
+
+def test_chunk_rows(repo):
+    rows = list(repo.iter_export_chunks("doc03", batch_size=2))
+    assert [r["content_text"] for r in rows] == ["part a 3", "part b 3"]
+    assert rows[0]["filename"] == "doc03.txt"
+
+def test_jsonl_and_csv_writers(repo):
+    out = io.StringIO()
+    assert export.export(repo, out, "jsonl", query="manual", filters={"ext": ".txt"}) == 25
+    first = json.loads(out.getvalue().splitlines()[0])
+    assert set(first) == set(export.ARTIFACT_FIELDS)
+
+    out = io.StringIO()
+    assert export.export(repo, out, "csv", include_text=True) == 25
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert len(rows) == 25
+    assert list(rows[0]) == export.ARTIFACT_FIELDS + ["text"]
+
+    with pytest.raises(ValueError):
+        export.export(repo, io.StringIO(), "xml")
+
+def test_cli(repo, db_path, tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(f"paths:\n  db_path: {db_path}\n", encoding="utf-8")
+    out = tmp_path / "chunks.csv"
+
+    assert export.main(["--config", str(config), "--format", "csv", "--chunks", "--output", str(out)]) == 0
+    rows = list(csv.DictReader(out.open(encoding="utf-8", newline="")))
+    assert len(rows) == 50
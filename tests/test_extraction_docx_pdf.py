@@ -38,6 +38,22 @@ def test_registry_defaults():
     assert reg.get(".pdf")
     assert reg.get(".png")
 
+def test_registry_backends_load_on_first_use():
+    import subprocess, sys
+    # Fresh interpreter: this module already imported the backends
+    code = (
+        "import sys\n"
+        "from app.core.extractors.registry import ExtractorRegistry\n"
+        "reg = ExtractorRegistry({})\n"
+        "assert 'pypdf' not in sys.modules and 'docx' not in sys.modules\n"
+        "assert type(reg.get('.pdf')).__name__ == 'PdfExtractor' and 'pypdf' in sys.modules\n"
+        "assert reg.get('.png') is reg.get('.jpg')\n"
+        "assert 'docx' not in sys.modules\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          cwd=str(Path(__file__).resolve().parents[1]))
+    assert proc.returncode == 0, proc.stderr
+
 @pytest.mark.extraction
 def test_docx_extractor(tmp_path, mock_docx):
     # Verify Docx Logic
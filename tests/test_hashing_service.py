@@ -0,0 +1,76 @@
+
+import hashlib
+import os
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.hashing_service import HashingService, hash_file
+from app.core.indexing_service import IndexingService
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "hash.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def corpus(db_path, tmp_path):
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    for i in range(12):
+        (ingest / f"note_{i}.txt").write_text(f"valve report {i}\n" * (i + 1), encoding="utf-8")
+    repo = ArtifactsRepo(db_path)
+    IndexingService(repo, {"semantic_enabled": False}).index_all(str(ingest))
+    hasher = HashingService(repo, workers=2)
+    yield repo, hasher, ingest
+    hasher.close()
+
+def test_hash_file_streams_blocks(tmp_path):
+    path = tmp_path / "blob.bin"
+    data = os.urandom(300_000)
+    path.write_bytes(data)
+    seen = []
+    assert hash_file(str(path), seen.append, block=64 * 1024) == hashlib.sha256(data).hexdigest()
+    assert seen[-1] == len(data) and len(seen) == 5
+
+def test_digest_persisted_for_size_and_mtime(corpus):
+    repo, hasher, ingest = corpus
+    path = str(ingest / "note_3.txt")
+    job = hasher.submit(path)
+    digest = job.future.result(timeout=10)
+
+    assert digest == hashlib.sha256(open(path, "rb").read()).hexdigest()
+    assert job.finished and job.fraction == 1.0
+    st = os.stat(path)
+    assert repo.get_sha256(path, st.st_size, st.st_mtime) == digest
+    assert hasher.current_digest(path) == digest
+
+    # Edited and re-indexed: the old digest no longer applies
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("appended\n")
+    IndexingService(repo, {"semantic_enabled": False}).index_file(path)
+    st = os.stat(path)
+    assert repo.get_sha256(path, st.st_size, st.st_mtime) is None
+    assert hasher.current_digest(path) is None
+
+def test_digest_for_other_version_is_not_stored(corpus):
+    repo, _, ingest = corpus
+    path = str(ingest / "note_1.txt")
+    st = os.stat(path)
+    meta = {"path": path, "filename": "note_1.txt", "ext": ".txt", "size_bytes": st.st_size + 1, "modified_at": st.st_mtime}
+    assert not repo.save_sha256(meta, "0" * 64)
+    assert repo.get_sha256(path, st.st_size, st.st_mtime) is None
+
+def test_backfill_hashes_whole_corpus(corpus):
+    repo, hasher, _ = corpus
+    assert repo.count_missing_sha256() == 12
+    assert hasher.start_backfill()
+    hasher.wait_backfill(timeout=30)
+
+    status = hasher.backfill_status()
+    assert not status.running
+    assert (status.queued, status.hashed, status.failed) == (12, 12, 0)
+    assert repo.count_missing_sha256() == 0
+    assert hasher._jobs == {} # Finished backfill jobs are not kept in memory
@@ -5,6 +5,8 @@ import sqlite3
 from pathlib import Path
 from app.core.artifacts_repo import ArtifactsRepo
 from app.core.indexing_service import IndexingService
+from app.core.extractors.models import ExtractResult
+from app.core.search.service import SearchService
 
 @pytest.fixture
 def db_path(tmp_path):
@@ -53,3 +55,27 @@ def test_index_all_counts(indexer, tmp_path):
     stats = indexer.index_all(str(tmp_path))
     assert stats['indexed'] == 2
 
+
+@pytest.mark.parametrize("outcome, status", [
+    (ExtractResult(error="corrupt file"), "failed"),
+    (ExtractResult(), "not_extractable"),
+])
+def test_failed_reindex_drops_previous_extraction(repo, db_path, tmp_path, monkeypatch, outcome, status):
+    indexer = IndexingService(repo, {"ann_min_vectors": 1})
+    f = tmp_path / "pump.txt"
+    f.write_text("pump seal inspection procedure for the night shift " * 20, encoding="utf-8")
+    assert indexer.index_file(str(f)) == "indexed"
+    assert indexer.maybe_rebuild_ann_index() # Its chunks are now in the ANN index too
+    artifact_id = repo.search_artifacts("pump")[0]['id']
+    repo.save_pages(artifact_id, [(0, 100), (100, 200)])
+    assert SearchService(repo).search("pump seal", mode="semantic")
+
+    extractor = indexer.registry.get(".txt")
+    monkeypatch.setattr(type(extractor), "extract", lambda self, path: outcome)
+    assert indexer.index_file(str(f)) == status
+
+    with sqlite3.connect(db_path) as conn:
+        for table in ("artifact_text", "chunks", "artifact_pages", "artifact_minhash", "minhash_bands"):
+            assert conn.execute(f"SELECT COUNT(*) FROM {table} WHERE artifact_id = ?", (artifact_id,)).fetchone()[0] == 0, table
+    assert repo.search_artifacts("seal") == []
+    assert SearchService(repo).search("pump seal", mode="semantic") == []
@@ -0,0 +1,102 @@
+
+import os
+import pytest
+import sqlite3
+from unittest.mock import patch
+from benchmarks.corpus import minimal_pdf
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.core.external_tools import ExternalTools
+from app.core.thumbnails import ThumbnailCache
+from app.services import pdf_preview
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "pdf.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def indexed_pdf(db_path, tmp_path):
+    # One paragraph per page: "alpha ..." on page 1, "bravo ..." on page 2, "charlie ..." on page 3
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(minimal_pdf([f"{word} section text" for word in ("alpha", "bravo", "charlie")], lines_per_page=2))
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo, {"semantic_enabled": True})
+    assert indexer.index_file(str(path)) == "indexed"
+    with sqlite3.connect(db_path) as conn:
+        artifact_id = conn.execute("SELECT id FROM artifacts WHERE path = ?", (str(path),)).fetchone()[0]
+    return repo, artifact_id, str(path)
+
+def test_pages_served_from_index(indexed_pdf):
+    repo, artifact_id, path = indexed_pdf
+    assert repo.count_pages(artifact_id) == 3
+
+    # Opening a page must not touch the PDF parser
+    with patch("app.core.extractors.pdf.PdfReader", side_effect=AssertionError("re-parsed")):
+        view = pdf_preview.page_view(repo, artifact_id, path, 2)
+    assert view.page == 2 and view.page_count == 3
+    assert "bravo" in view.text and "alpha" not in view.text and "charlie" not in view.text
+    assert view.thumbnail is None
+
+    # Out-of-range pages are clamped
+    assert pdf_preview.page_view(repo, artifact_id, path, 99).page == 3
+
+def test_match_offsets_map_to_pages(indexed_pdf):
+    repo, artifact_id, _ = indexed_pdf
+    spans = repo.get_page_spans(artifact_id)
+    text, _ = repo.get_text_window(artifact_id, 0, 10_000)
+    assert pdf_preview.page_of_offset(spans, text.index("alpha")) == 1
+    assert pdf_preview.page_of_offset(spans, text.index("charlie")) == 3
+
+def test_chunks_record_their_page(indexed_pdf, db_path):
+    _, artifact_id, _ = indexed_pdf
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT page, content_text FROM chunks WHERE artifact_id = ? ORDER BY page", (artifact_id,)).fetchall()
+    assert [page for page, _ in rows] == [1, 2, 3]
+    assert "bravo" in rows[1][1]
+
+def test_reindex_without_pages_clears_spans(indexed_pdf):
+    repo, artifact_id, _ = indexed_pdf
+    repo.save_pages(artifact_id, [])
+    assert pdf_preview.page_view(repo, artifact_id, "missing.pdf", 1) is None
+
+def test_thumbnail_cache_is_lazy_and_bounded(tmp_path):
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(minimal_pdf(["one", "two", "three", "four"], lines_per_page=2))
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), pdftoppm="pdftoppm", max_bytes=2500)
+    rendered = []
+
+    def fake_render(pdf_path, page, width, target):
+        rendered.append(page)
+        target.write_bytes(b"\x89PNG" + b"0" * 996) # 1000 bytes per page
+
+    cache._render = fake_render
+    first = cache.get(str(pdf), 1)
+    assert cache.get(str(pdf), 1) == first and rendered == [1] # Second call is a cache hit
+
+    cache.get(str(pdf), 2)
+    os.utime(first, (1, 1)) # Page 1 becomes the least recently used
+    cache.get(str(pdf), 3)
+    assert not os.path.exists(first)
+    assert cache.size_bytes() <= 2500 and rendered == [1, 2, 3]
+
+    # A changed PDF gets new thumbnails
+    pdf.write_bytes(minimal_pdf(["changed"], lines_per_page=2))
+    cache.get(str(pdf), 2)
+    assert rendered == [1, 2, 3, 2]
+
+def test_thumbnails_disabled_without_pdftoppm(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), pdftoppm=None)
+    assert cache.get(str(tmp_path / "doc.pdf"), 1) is None
+    assert not (tmp_path / "thumbs").exists()
+
+@pytest.mark.skipif(not ExternalTools.pdftoppm_path(), reason="pdftoppm not installed")
+def test_pdftoppm_renders_one_page(tmp_path):
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(minimal_pdf(["one", "two", "three"], lines_per_page=2))
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), ExternalTools.pdftoppm_path())
+    png = cache.get(str(pdf), 2, width=120)
+    assert png and open(png, "rb").read(4) == b"\x89PNG"
@@ -0,0 +1,107 @@
+
+import pstats
+import random
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.config_validator import ConfigValidator
+from app.core.indexing_service import IndexingService
+from app.core.search.service import SearchService
+from app.core import profiling
+from app.core.profiling import INDEXING_HOT_PATHS, SEARCH_HOT_PATHS, Profiler, ProfilingSettings, settings_from_config
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "profile.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    monkeypatch.delenv(profiling.PROFILE_MEMORY_ENV, raising=False)
+
+@pytest.fixture
+def services(db_path, tmp_path):
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    for i in range(5):
+        (ingest / f"pump_{i}.txt").write_text(f"pump seal inspection {i}\n" * 20, encoding="utf-8")
+    repo = ArtifactsRepo(db_path)
+    return IndexingService(repo, {"semantic_enabled": False}), SearchService(repo), str(ingest)
+
+def test_disabled_by_default(tmp_path, monkeypatch):
+    config = {"paths": {"logs_dir": str(tmp_path / "logs")}}
+    assert settings_from_config(config) is None
+    assert Profiler.from_config(config) is None
+
+    # Env switches it on (with a sample rate) or forces it off over the config
+    monkeypatch.setenv(profiling.PROFILE_ENV, "0.25")
+    settings = settings_from_config(config)
+    assert settings.sample_rate == 0.25 and settings.output_dir == str(tmp_path / "logs" / "profiles")
+    monkeypatch.setenv(profiling.PROFILE_ENV, "0")
+    assert settings_from_config({**config, "profiling": {"enabled": True}}) is None
+
+    # Nowhere to write reports
+    monkeypatch.setenv(profiling.PROFILE_ENV, "1")
+    assert settings_from_config({"paths": {}}) is None
+
+def test_profiled_runs_write_reports(services, tmp_path):
+    indexer, search, ingest = services
+    out = tmp_path / "logs" / "profiles"
+    profiler = Profiler(ProfilingSettings(output_dir=str(out), tracemalloc=True, top_n=5))
+    profiler.instrument(indexer, INDEXING_HOT_PATHS)
+    profiler.instrument(search, SEARCH_HOT_PATHS)
+
+    assert indexer.index_all(ingest)["indexed"] == 5
+    assert search.search("pump")
+
+    # index_file calls nested in the index_all run are part of its profile, not separate runs
+    reports = sorted(p.name for p in out.glob("*.pstats"))
+    assert len(reports) == 2 and profiler.reports == 2
+    assert any("IndexingService.index_all" in name for name in reports)
+    assert any("SearchService.search" in name for name in reports)
+
+    index_all = next(out.glob("*IndexingService.index_all.pstats"))
+    functions = {func[2] for func in pstats.Stats(str(index_all)).stats}
+    assert "index_file" in functions
+    alloc = next(out.glob("*IndexingService.index_all.alloc.txt")).read_text(encoding="utf-8")
+    assert "peak traced memory" in alloc and "Top 5 allocation sites" in alloc
+
+def test_sampling_profiles_a_fraction_of_calls(services, tmp_path):
+    indexer, search, ingest = services
+    indexer.index_all(ingest)
+    profiler = Profiler(ProfilingSettings(output_dir=str(tmp_path / "profiles"), sample_rate=0.3), rng=random.Random(7))
+    profiler.instrument(search, SEARCH_HOT_PATHS)
+    for _ in range(20):
+        search.search("seal")
+    assert 0 < profiler.reports < 20
+
+def test_services_wrapped_only_when_enabled(db_path, tmp_path, monkeypatch):
+    from app.ui.services import get_services, invalidate_services
+
+    config = {"db_path": db_path, "data": {"paths": {"logs_dir": str(tmp_path / "logs")},
+                                           "features": {"semantic_enabled": False}}}
+    invalidate_services()
+    try:
+        # Disabled: the hot paths are the plain methods, no wrapper in between
+        services = get_services(config)
+        assert "index_file" not in vars(services.indexer) and "search" not in vars(services.search)
+
+        monkeypatch.setenv(profiling.PROFILE_ENV, "1")
+        services = get_services(config)
+        assert all(name in vars(services.indexer) for name in INDEXING_HOT_PATHS)
+        assert "search" in vars(services.search)
+    finally:
+        invalidate_services()
+
+def test_profiling_section_validated(tmp_path):
+    config = {
+        "features": {"search_enabled": True},
+        "paths": {name: str(tmp_path / name) for name in ("db_path", "ingest_dir", "processed_dir", "logs_dir")},
+    }
+    assert not ConfigValidator.validate({**config, "profiling": {"enabled": True, "sample_rate": 0.1, "top_n": 10}})
+    errors = ConfigValidator.validate({**config, "profiling": {"enabled": "yes", "sample_rate": 2, "top_n": 0}})
+    assert len(errors) == 3
@@ -0,0 +1,154 @@
+
+import os
+import pytest
+import sqlite3
+import numpy as np
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.core.search.ann_index import IvfIndex, ann_index_path, build_ivf_index
+from app.core.search.embeddings import EMBEDDING_DIM, encode_vectors
+from app.core.search.vector_index import VectorSearcher
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "ann.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+def _clustered_vectors(n, clusters=20, seed=1):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, EMBEDDING_DIM))
+    vecs = centers[rng.integers(0, clusters, n)] + 0.3 * rng.standard_normal((n, EMBEDDING_DIM))
+    return (vecs / np.linalg.norm(vecs, axis=1, keepdims=True)).astype(np.float32)
+
+@pytest.fixture
+def seeded_repo(db_path):
+    repo = ArtifactsRepo(db_path)
+    vectors = _clustered_vectors(2000)
+    blobs = encode_vectors(vectors)
+    for doc in range(200):
+        aid = repo.upsert_artifact({"path": f"/tmp/{doc}.txt", "filename": f"{doc}.txt", "ext": ".txt"})
+        repo.save_chunks(aid, [
+            {"content_text": f"chunk {doc}-{i}", "embedding": blobs[doc * 10 + i]}
+            for i in range(10)
+        ])
+    # Exact baseline on what is actually stored (float16)
+    return repo, vectors.astype(np.float16).astype(np.float32)
+
+def _recall(exact_ids, approx_ids):
+    return len(set(exact_ids) & set(approx_ids)) / len(exact_ids)
+
+def test_build_is_memory_mapped_and_exact_at_full_probe(seeded_repo):
+    repo, vectors = seeded_repo
+    path = ann_index_path(repo.db_path)
+    assert build_ivf_index(repo, path, nlist=16) == 2000
+
+    index = IvfIndex(path)
+    assert index.size == 2000
+    assert isinstance(index._vectors, np.memmap)
+
+    q = vectors[7]
+    exact_ids = np.argsort(-(vectors @ q))[:10] + 1 # chunk_id = row + 1
+
+    full_ids, _, _ = index.search(q, 10, nprobe=16)
+    assert _recall(exact_ids, full_ids) == 1.0
+
+    low_ids, _, _ = index.search(q, 10, nprobe=1)
+    assert len(low_ids) == 10
+
+def test_nprobe_tunes_recall(seeded_repo):
+    repo, vectors = seeded_repo
+    path = ann_index_path(repo.db_path)
+    build_ivf_index(repo, path, nlist=32)
+    index = IvfIndex(path)
+
+    recalls = {}
+    for nprobe in (1, 32):
+        total = 0.0
+        for qi in range(0, 2000, 200):
+            q = vectors[qi]
+            exact_ids = np.argsort(-(vectors @ q))[:10] + 1
+            ids, _, _ = index.search(q, 10, nprobe=nprobe)
+            total += _recall(exact_ids, ids)
+        recalls[nprobe] = total / 10
+    assert recalls[32] == 1.0
+    assert recalls[1] <= recalls[32]
+
+def test_incremental_updates_and_stale_filtering(db_path, tmp_path):
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo, {"ann_min_vectors": 1})
+
+    f = tmp_path / "pump.txt"
+    f.write_text("centrifugal pump cavitation noise", encoding="utf-8")
+    indexer.index_file(str(f))
+    assert indexer.maybe_rebuild_ann_index()
+
+    index = IvfIndex(ann_index_path(db_path))
+    assert index.size == 1 and index.delta_count == 0
+
+    # New file after build -> appended to delta, searchable without rebuild
+    g = tmp_path / "invoice.txt"
+    g.write_text("supplier invoice overdue payment", encoding="utf-8")
+    indexer.index_file(str(g))
+    assert index.delta_count == 1
+
+    searcher = VectorSearcher(repo)
+    hits = searcher.search("overdue invoice", limit=1)
+    assert hits[0][0] == repo.search_artifacts("invoice")[0]["id"]
+
+    # Re-index replaces the chunk: only live, de-duplicated chunk ids come back
+    g.write_text("supplier invoice overdue payment reminder sent", encoding="utf-8")
+    indexer.index_file(str(g))
+    assert index.delta_count == 2
+    chunk_ids, _, _ = searcher.top_chunks("overdue invoice", 5)
+    assert len(chunk_ids) == 2
+    assert set(chunk_ids.tolist()) == repo.live_chunk_ids(chunk_ids.tolist())
+
+    # Delta now large relative to base -> rebuild folds it in
+    assert index.needs_rebuild()
+    assert indexer.maybe_rebuild_ann_index()
+    assert index.delta_count == 0
+    assert index.size == 2
+
+def test_small_corpus_stays_brute_force(db_path, tmp_path):
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo)
+    (tmp_path / "a.txt").write_text("tiny corpus", encoding="utf-8")
+    indexer.index_all(str(tmp_path))
+    assert not IvfIndex(ann_index_path(db_path)).exists()
+
+def test_stale_candidates_do_not_cut_pages_short(db_path, monkeypatch):
+    repo = ArtifactsRepo(db_path)
+    searcher = VectorSearcher(repo)
+    ids = np.arange(1, 1001, dtype=np.int64) # One chunk per artifact, in score order
+
+    class HeavilyReindexedAnn:
+        def exists(self):
+            return True
+
+        def search(self, q, k, nprobe):
+            n = min(k, len(ids))
+            return ids[:n], ids[:n], np.linspace(1, 0, len(ids), dtype=np.float32)[:n]
+
+    searcher._ann = HeavilyReindexedAnn()
+    # Only every 50th candidate is still live: the first fetches come back mostly stale
+    monkeypatch.setattr(repo, "live_chunk_ids", lambda chunk_ids: {c for c in chunk_ids if c % 50 == 0})
+    hits = searcher.search("anything", limit=20)
+    assert [aid for aid, _, _ in hits] == list(range(50, 1001, 50))
+
+def test_recreated_delta_of_same_size_is_remapped(tmp_path):
+    index = IvfIndex(str(tmp_path / "vectors.ivf"))
+    vectors = _clustered_vectors(2)
+    index.append([1, 2], [10, 20], vectors)
+    assert index.delta_count == 2 and index._delta["chunk_id"].tolist() == [1, 2]
+
+    # Rewritten (e.g. after a rebuild and new appends) to exactly the same size
+    stat = os.stat(index.delta_path)
+    os.remove(index.delta_path)
+    index.append([3, 4], [30, 40], vectors)
+    os.utime(index.delta_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert os.path.getsize(index.delta_path) == stat.st_size
+    assert index._delta is not None and index.delta_count == 2
+    assert index._delta["chunk_id"].tolist() == [3, 4]
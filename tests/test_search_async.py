@@ -0,0 +1,126 @@
+
+import asyncio
+import pytest
+import sqlite3
+import time
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.core.search.async_service import AsyncSearchService, SearchCancelled, SearchTimeout
+
+ENDLESS = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "async.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def service(db_path, tmp_path):
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    (ingest / "valves.txt").write_text("The relief valve was replaced.", encoding="utf-8")
+    (ingest / "pumps.txt").write_text("Pump curves for the booster pump.", encoding="utf-8")
+    IndexingService(ArtifactsRepo(db_path), {"semantic_enabled": False}).index_all(str(ingest))
+
+    repo = ArtifactsRepo(db_path, pooled=True)
+    rank = repo.rank_artifact_ids
+
+    def rank_or_hang(query, *args, **kwargs):
+        # "hang" stands in for a pathological query: runs until interrupted
+        if query == "hang":
+            repo._get_conn().execute(ENDLESS).fetchall()
+        return rank(query, *args, **kwargs)
+
+    repo.rank_artifact_ids = rank_or_hang
+    svc = AsyncSearchService(repo, readers=1, timeout=None)
+    yield svc
+    svc.close()
+    repo.close()
+
+def test_requires_pooled_repo(db_path):
+    with pytest.raises(ValueError):
+        AsyncSearchService(ArtifactsRepo(db_path))
+
+def test_search_and_suggest(service):
+    async def run():
+        results = await service.search("relief")
+        suggestions = await service.suggest("pum")
+        return results, suggestions
+
+    results, suggestions = asyncio.run(run())
+    assert [r.source_path.endswith("valves.txt") for r in results] == [True]
+    assert suggestions[0].text == "pump"
+
+def test_timeout_interrupts_reader(service):
+    async def run():
+        start = time.perf_counter()
+        with pytest.raises(SearchTimeout):
+            await service.search("hang", timeout=0.2)
+        # The single reader is free again: the endless query was interrupted
+        results = await service.search("pump", timeout=5)
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    assert len(results) == 1
+    assert elapsed < 5
+
+def test_newer_query_supersedes_older(service):
+    async def run():
+        stale = asyncio.create_task(service.search("hang", session="user-1"))
+        await asyncio.sleep(0.1) # Let it reach the reader
+        latest = await service.search("relief", session="user-1", timeout=5)
+        with pytest.raises(SearchCancelled):
+            await stale
+        return latest
+
+    assert len(asyncio.run(run())) == 1
+
+def test_queued_query_is_dropped(service):
+    async def run():
+        blocker = asyncio.create_task(service.search("hang", session="a"))
+        await asyncio.sleep(0.1)
+        queued = asyncio.create_task(service.search("relief", session="b"))
+        await asyncio.sleep(0.05)
+        assert service.cancel("b")
+        service.cancel("a")
+        for task in (blocker, queued):
+            with pytest.raises(SearchCancelled):
+                await task
+
+    asyncio.run(run())
+
+def test_cancel_between_statements_drops_result(service):
+    repo = service.repo
+    hydrate = repo.hydrate_artifacts
+
+    def slow_hydrate(*args, **kwargs):
+        time.sleep(0.3) # Python work between the rank and hydrate queries: nothing to interrupt
+        return hydrate(*args, **kwargs)
+
+    repo.hydrate_artifacts = slow_hydrate
+
+    async def run():
+        stale = asyncio.create_task(service.search("relief", session="user-1"))
+        await asyncio.sleep(0.1)
+        latest = await service.search("pump", session="user-1", timeout=5)
+        with pytest.raises(SearchCancelled):
+            await stale
+        return latest
+
+    latest = asyncio.run(run())
+    assert [r.source_path.endswith("pumps.txt") for r in latest] == [True]
+
+def test_cancel_stops_hybrid_search(service):
+    async def run():
+        hybrid = asyncio.create_task(service.search("hang", session="user-1", mode="hybrid"))
+        await asyncio.sleep(0.1)
+        assert service.cancel("user-1")
+        with pytest.raises(SearchCancelled):
+            await asyncio.wait_for(hybrid, 5)
+        # The reader is free again: the lexical leg's SQL ran on the interrupted connection
+        return await service.search("pump", timeout=5)
+
+    assert len(asyncio.run(run())) == 1
@@ -0,0 +1,106 @@
+
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.core.search.service import SearchService
+from app.core.search.minhash import MinHasher, similarity, band_keys, shingle_hashes
+
+BASE = " ".join(f"clause{i} the pump shall be inspected every {i} hours by the operator" for i in range(40))
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "dedup.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def indexed(db_path, tmp_path):
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    (ingest / "spec_v1.txt").write_text(BASE, encoding="utf-8")
+    (ingest / "spec_v2_final.txt").write_text(BASE + " revision two adds torque values", encoding="utf-8")
+    (ingest / "spec_v2_final_final.txt").write_text(BASE.replace("clause3 ", "clause3 amended ") + " revision two", encoding="utf-8")
+    (ingest / "pump_manual.txt").write_text("the pump manual describes startup and shutdown of the pump", encoding="utf-8")
+
+    repo = ArtifactsRepo(db_path)
+    IndexingService(repo, {"semantic_enabled": True}).index_all(str(ingest))
+    return repo
+
+def test_signature_estimates_jaccard():
+    hasher = MinHasher()
+    a = hasher.signature(BASE)
+    b = hasher.signature(BASE + " one extra sentence at the end")
+    c = hasher.signature("completely different text about motors and voltage ratings")
+
+    assert similarity(a, a) == 1.0
+    assert similarity(a, b) > 0.8
+    assert similarity(a, c) < 0.2
+    assert hasher.signature("") is None
+    assert len(band_keys(a)) == 16
+    assert len(shingle_hashes("one two")) == 1
+
+def test_revisions_share_a_group(indexed):
+    with sqlite3.connect(indexed.db_path) as conn:
+        rows = dict(conn.execute("""
+            SELECT a.filename, m.dup_group FROM artifact_minhash m JOIN artifacts a ON a.id = m.artifact_id
+        """).fetchall())
+    assert rows["spec_v1.txt"] == rows["spec_v2_final.txt"] == rows["spec_v2_final_final.txt"]
+    assert rows["pump_manual.txt"] != rows["spec_v1.txt"]
+
+@pytest.mark.parametrize("mode", ["lexical", "semantic", "hybrid"])
+def test_collapse_keeps_best_ranked_member(indexed, mode):
+    service = SearchService(indexed)
+    full = service.search("pump", limit=10, mode=mode)
+    collapsed = service.search("pump", limit=10, mode=mode, collapse=True)
+
+    names = [ev.source_path.rsplit("/", 1)[-1] for ev in collapsed]
+    assert len(full) == 4
+    assert len(collapsed) == 2
+    assert "pump_manual.txt" in names
+    # The surviving spec is the best-ranked one of the group
+    first_spec = next(ev for ev in full if "spec_" in ev.source_path)
+    assert first_spec.artifact_id in [ev.artifact_id for ev in collapsed]
+
+def test_collapse_pagination(indexed):
+    service = SearchService(indexed)
+    page1 = service.search("pump", limit=1, collapse=True)
+    page2 = service.search("pump", limit=1, offset=1, collapse=True)
+    assert len(page1) == len(page2) == 1
+    assert page1[0].artifact_id != page2[0].artifact_id
+
+def test_reindexed_member_leaves_group(indexed, tmp_path):
+    repo = indexed
+    path = tmp_path / "ingest" / "spec_v1.txt"
+    path.write_text("now an unrelated memo about the canteen menu", encoding="utf-8")
+    IndexingService(repo, {"semantic_enabled": False}).index_file(str(path))
+
+    with sqlite3.connect(repo.db_path) as conn:
+        rows = dict(conn.execute("""
+            SELECT a.filename, m.dup_group FROM artifact_minhash m JOIN artifacts a ON a.id = m.artifact_id
+        """).fetchall())
+    assert rows["spec_v2_final.txt"] == rows["spec_v2_final_final.txt"]
+    assert rows["spec_v1.txt"] not in (rows["spec_v2_final.txt"], rows["pump_manual.txt"])
+
+@pytest.mark.parametrize("mode", ["semantic", "hybrid"])
+def test_collapse_fetches_past_large_groups(db_path, tmp_path, mode):
+    # 60 revisions of one spec outrank the only other match: more than any fixed over-fetch
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    for i in range(60):
+        (ingest / f"spec_rev{i}.txt").write_text(f"{BASE} revision {i}", encoding="utf-8")
+    (ingest / "pump_manual.txt").write_text("the pump manual describes startup and shutdown of the pump", encoding="utf-8")
+    repo = ArtifactsRepo(db_path)
+    IndexingService(repo, {"semantic_enabled": True}).index_all(str(ingest))
+
+    service = SearchService(repo)
+    query = "pump inspected every hours by the operator"
+    full = service.search(query, limit=100, mode=mode)
+    assert full[-1].source_path.endswith("pump_manual.txt")
+
+    collapsed = service.search(query, limit=2, mode=mode, collapse=True)
+    names = [ev.source_path.rsplit("/", 1)[-1] for ev in collapsed]
+    assert len(names) == 2 and names[1] == "pump_manual.txt"
+    assert service.search(query, limit=1, offset=1, mode=mode, collapse=True)[0].source_path.endswith("pump_manual.txt")
@@ -0,0 +1,99 @@
+
+import os
+import pytest
+import sqlite3
+import datetime
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.search.models import FACET_NONE
+from app.core.search.service import SearchService
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "facets.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+def _ts(year, month):
+    return datetime.datetime(year, month, 15, tzinfo=datetime.timezone.utc).timestamp()
+
+@pytest.fixture
+def service(db_path):
+    repo = ArtifactsRepo(db_path)
+    root = os.path.join(os.sep, "ingest")
+    docs = [
+        (os.path.join(root, "specs", "a.pdf"), ".pdf", _ts(2025, 11)),
+        (os.path.join(root, "specs", "deep", "b.pdf"), ".pdf", _ts(2026, 1)),
+        (os.path.join(root, "notes", "c.txt"), ".txt", _ts(2026, 1)),
+        (os.path.join(root, "d.md"), ".md", _ts(2026, 2)),
+    ]
+    for path, ext, mtime in docs:
+        name = os.path.basename(path)
+        aid = repo.upsert_artifact({"path": path, "filename": name, "ext": ext, "modified_at": mtime})
+        repo.save_extracted_text(aid, "valve torque specification", "Plain", 26, name, path)
+    # Not matching the query
+    aid = repo.upsert_artifact({"path": os.path.join(root, "x.txt"), "filename": "x.txt", "ext": ".txt", "modified_at": _ts(2026, 2)})
+    repo.save_extracted_text(aid, "unrelated", "Plain", 9, "x.txt", os.path.join(root, "x.txt"))
+    return SearchService(repo), root
+
+def test_facets_over_full_match_set(service):
+    svc, root = service
+    result = svc.search_with_facets("valve", limit=1, root=root)
+
+    assert len(result.items) == 1 # Page
+    assert result.total == 4      # Full match set
+    assert result.facets["ext"] == {".pdf": 2, ".md": 1, ".txt": 1}
+    assert result.facets["status"] == {"indexed": 4}
+    assert result.facets["year"] == {"2026": 3, "2025": 1}
+    assert result.facets["month"]["2026-01"] == 2
+    assert result.facets["folder"] == {
+        os.path.join(root, "specs") + os.sep: 2,
+        os.path.join(root, "notes") + os.sep: 1,
+        root + os.sep: 1,
+    }
+
+def test_facet_values_work_as_filters(service):
+    svc, root = service
+    folder = os.path.join(root, "specs") + os.sep
+
+    result = svc.search_with_facets("valve", filters={"folder": folder}, root=root)
+    assert result.total == 2
+    assert {os.path.basename(ev.source_path) for ev in result.items} == {"a.pdf", "b.pdf"}
+
+    result = svc.search_with_facets("valve", filters={"month": "2026-01", "ext": ".pdf"}, root=root)
+    assert [os.path.basename(ev.source_path) for ev in result.items] == ["b.pdf"]
+
+    result = svc.search_with_facets("valve", filters={"year": "2025"}, root=root)
+    assert result.total == 1
+
+def test_every_facet_value_filters_to_its_count(service):
+    svc, root = service
+    # Extensionless, undated and outside any folder: lands in the "(none)" buckets
+    aid = svc.repo.upsert_artifact({"path": "README", "filename": "README", "ext": ""})
+    svc.repo.save_extracted_text(aid, "valve overview", "Plain", 14, "README", "README")
+
+    result = svc.search_with_facets("valve", root=root)
+    assert result.facets["ext"][FACET_NONE] == 1 and result.facets["folder"][FACET_NONE] == 1
+    for name, values in result.facets.items():
+        for value, count in values.items():
+            filtered = svc.search_with_facets("valve", limit=50, filters={name: value}, root=root)
+            assert (name, value, filtered.total, len(filtered.items)) == (name, value, count, count)
+
+def test_facets_single_aggregate_query_and_cache(service, monkeypatch):
+    svc, root = service
+    calls = []
+    original = svc.repo.facet_counts
+    monkeypatch.setattr(svc.repo, "facet_counts", lambda *a, **kw: calls.append(a) or original(*a, **kw))
+
+    first = svc.search_with_facets("valve", root=root)
+    second = svc.search_with_facets("valve", root=root)
+    assert first is second
+    assert len(calls) == 1
+
+    # New index write -> new generation -> recomputed
+    aid = svc.repo.upsert_artifact({"path": "/ingest/new.txt", "filename": "new.txt", "ext": ".txt"})
+    svc.repo.save_extracted_text(aid, "valve", "Plain", 5, "new.txt", "/ingest/new.txt")
+    third = svc.search_with_facets("valve", root=root)
+    assert len(calls) == 2
+    assert third.total == 5
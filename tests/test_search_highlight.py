@@ -0,0 +1,71 @@
+
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo, _highlight_offsets, HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE
+from app.core.indexing_service import IndexingService
+from app.core.search.service import SearchService
+from app.core.search.preview import text_preview, highlight_html
+
+FILLER = "Routine maintenance notes for the plant.\n" * 200
+VALVE_TEXT = "Header line\nThe relief valve was replaced.\n" + FILLER + "Second relief valve check <ok> & done.\n"
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "highlight.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def indexed(db_path, tmp_path):
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    (ingest / "valves.txt").write_text(VALVE_TEXT, encoding="utf-8")
+    (ingest / "pumps.txt").write_text("Pump curves and pump relief settings.", encoding="utf-8")
+
+    repo = ArtifactsRepo(db_path)
+    IndexingService(repo, {"semantic_enabled": False}).index_all(str(ingest))
+    return repo
+
+def test_highlight_offsets_parse():
+    marked = f"a {HIGHLIGHT_OPEN}bc{HIGHLIGHT_CLOSE} d {HIGHLIGHT_OPEN}e{HIGHLIGHT_CLOSE}"
+    assert _highlight_offsets(marked) == [(2, 4), (7, 8)]
+    assert _highlight_offsets("no markers") == []
+
+def test_offsets_point_into_stored_text(indexed):
+    results = SearchService(indexed).search('"relief valve"')
+    assert len(results) == 1
+    offsets = results[0].match_offsets
+    assert len(offsets) == 2
+    for s, e in offsets:
+        assert VALVE_TEXT[s:e].lower() == "relief valve"
+
+def test_like_fallback_offsets(indexed):
+    indexed._fts_enabled = False
+    results = SearchService(indexed).search("Curves")
+    assert len(results) == 1
+    s, e = results[0].match_offsets[0]
+    assert "Pump curves and pump relief settings."[s:e] == "curves"
+
+def test_preview_window_reads_around_match(indexed):
+    ev = SearchService(indexed).search('"relief valve"')[0]
+
+    second = text_preview(indexed, ev.artifact_id, ev.match_offsets, focus=1)
+    assert second.start > 0
+    assert second.total_chars == len(VALVE_TEXT)
+    assert VALVE_TEXT[second.start - 1] == "\n" # Window snapped to a line start
+    assert len(second.highlights) == 1
+    s, e = second.highlights[0]
+    assert second.text[s:e] == "relief valve"
+    assert VALVE_TEXT[second.start:second.end] == second.text
+
+    html = highlight_html(second.text, second.highlights)
+    assert "<mark>relief valve</mark>" in html
+    assert "&lt;ok&gt; &amp; done" in html
+
+def test_preview_without_stored_text(indexed):
+    assert text_preview(indexed, 999999, []) is None
+
+def test_highlight_html_clips_overlaps():
+    assert highlight_html("abcdef", [(3, 5), (1, 4)]) == "a<mark>bcd</mark><mark>e</mark>f"
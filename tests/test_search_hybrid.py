@@ -0,0 +1,115 @@
+
+import pytest
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.core.search.service import SearchService, RRF_K
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "hybrid.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def service(db_path, tmp_path):
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo)
+    docs = {
+        "ticket.txt": "Error code XJ-4411 reported on line 3 during startup.",
+        "manual.txt": "Conveyor belts need lubrication; lubricate the conveyor bearings monthly.",
+        "memo.txt": "Cafeteria menu for next week.",
+    }
+    for name, text in docs.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+        indexer.index_file(str(tmp_path / name))
+    return SearchService(repo)
+
+def _names(results):
+    return [Path(r.source_path).name for r in results]
+
+def test_hybrid_fuses_both_legs(service):
+    # Paraphrase: no exact token match, vector leg carries it
+    assert service.search("lubricating conveyors", mode="lexical") == []
+    results = service.search("lubricating conveyors", limit=5, mode="hybrid")
+    assert _names(results)[0] == "manual.txt"
+    assert "fts_rank" not in results[0].signals
+
+    # Exact identifier: lexical leg carries it
+    results = service.search("4411", limit=5, mode="hybrid")
+    assert _names(results)[0] == "ticket.txt"
+    assert results[0].signals["fts_rank"] == 1
+    assert all(r.search_mode == "HYBRID" for r in results)
+
+    scores = [r.score for r in results]
+    assert scores == sorted(scores, reverse=True)
+    for r in results:
+        assert r.signals["rrf"] == r.score
+        assert r.score <= 2.0 / (RRF_K + 1)
+
+def test_hybrid_signals_per_leg(service):
+    results = service.search("conveyor", limit=5, mode="hybrid")
+    top = results[0]
+    assert _names(results)[0] == "manual.txt"
+    # Matched by both legs
+    assert top.signals["fts_rank"] == 1
+    assert "fts" in top.signals
+    assert "semantic" in top.signals and "semantic_rank" in top.signals
+
+def test_hybrid_legs_run_concurrently(service, monkeypatch):
+    real_rank = service.repo.rank_artifact_ids
+    real_vector = service.vectors.search
+
+    def slow_rank(*args, **kwargs):
+        time.sleep(0.3)
+        return real_rank(*args, **kwargs)
+
+    def slow_vector(*args, **kwargs):
+        time.sleep(0.3)
+        return real_vector(*args, **kwargs)
+
+    monkeypatch.setattr(service.repo, "rank_artifact_ids", slow_rank)
+    monkeypatch.setattr(service.vectors, "search", slow_vector)
+
+    started = time.perf_counter()
+    service.search("conveyor", limit=5, mode="hybrid")
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.55 # Bounded by the slower leg, not the sum (0.6s)
+
+def test_hybrid_executor_shared_and_closed(service, monkeypatch):
+    from app.core.search import service as service_module
+    created = []
+
+    class CountingExecutor(service_module.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.05) # Widen the window for a second thread to race past the None check
+            created.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(service_module, "ThreadPoolExecutor", CountingExecutor)
+    barrier = threading.Barrier(6)
+    def first_search():
+        barrier.wait()
+        service.search("conveyor", limit=5, mode="hybrid")
+
+    threads = [threading.Thread(target=first_search) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1
+
+    service.close()
+    assert created[0]._shutdown and service._executor is None
+    service.close() # Idempotent
+
+    # Still usable: the next hybrid search starts a fresh pool
+    assert _names(service.search("conveyor", limit=5, mode="hybrid"))[0] == "manual.txt"
+    assert len(created) == 2
+    service.close()
@@ -0,0 +1,75 @@
+
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.search.query import compile_fts_query
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "query.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def repo(db_path):
+    repo = ArtifactsRepo(db_path)
+    docs = [
+        ("/data/specs/pump-2024 (final).txt", "relief valve pressure rating"),
+        ("/data/notes/valve.txt", "valve relief procedure"),
+        ("/data/specs/motor.txt", "motor pressure sensor c++ driver"),
+    ]
+    for path, text in docs:
+        name = path.rsplit("/", 1)[-1]
+        aid = repo.upsert_artifact({"path": path, "filename": name, "ext": ".txt"})
+        repo.save_extracted_text(aid, text, "Plain", len(text), name, path)
+    return repo
+
+def _names(results):
+    return sorted(r["filename"] for r in results)
+
+@pytest.mark.parametrize("text, expected", [
+    ("pump valve", '"pump" AND "valve"'),
+    ('"relief valve"', '"relief valve"'),
+    ("pres*", '"pres" *'),
+    ("filename:report-2024", 'filename : "report-2024"'),
+    ("path:(a OR b) NOT c", 'path : ("a" OR "b") NOT "c"'),
+    ('say "hi', '"say" AND "hi"'),
+    ("a AND OR b", '"a" OR "b"'),
+    ("NOT x y", '"y" NOT "x"'),
+    ("NOT x y z", '("y" AND "z") NOT "x"'),
+    ("NOT x NOT y z", '"z" NOT "x" NOT "y"'),
+    ("NOT x", None),
+    ("foo:bar", '"foo:bar"'),
+    ("---", None),
+    ("(((", None),
+    ("   ", None),
+])
+def test_compile(text, expected):
+    assert compile_fts_query(text) == expected
+
+def test_hostile_input_never_raises(repo):
+    for text in ['"', "pump-2024 (final)", "c++", "a:b:c", "NOT", "OR OR", "(x", "x)", "*", "'; DROP TABLE artifacts; --"]:
+        repo.search_artifacts(text) # fts5 syntax errors would raise OperationalError
+
+def test_punctuated_filename_matches(repo):
+    assert _names(repo.search_artifacts("pump-2024 (final)")) == ["pump-2024 (final).txt"]
+    assert _names(repo.search_artifacts("c++")) == ["motor.txt"]
+
+def test_phrase_prefix_and_operators(repo):
+    assert _names(repo.search_artifacts('"relief valve"')) == ["pump-2024 (final).txt"]
+    assert _names(repo.search_artifacts("relief valve")) == ["pump-2024 (final).txt", "valve.txt"]
+    assert _names(repo.search_artifacts("pres*")) == ["motor.txt", "pump-2024 (final).txt"]
+    assert _names(repo.search_artifacts("pressure NOT motor")) == ["pump-2024 (final).txt"]
+    assert _names(repo.search_artifacts("NOT motor pressure")) == ["pump-2024 (final).txt"]
+    assert _names(repo.search_artifacts("sensor OR procedure")) == ["motor.txt", "valve.txt"]
+
+def test_field_filters(repo):
+    assert _names(repo.search_artifacts("filename:valve")) == ["valve.txt"]
+    assert _names(repo.search_artifacts("path:specs")) == ["motor.txt", "pump-2024 (final).txt"]
+    assert _names(repo.search_artifacts("path:specs valve")) == ["pump-2024 (final).txt"]
+
+def test_snippet_uses_compiled_query(repo):
+    results = repo.search_artifacts('"relief valve"')
+    assert "**relief valve**" in results[0]["snippet"]
@@ -0,0 +1,97 @@
+
+import pytest
+import sqlite3
+import numpy as np
+from pathlib import Path
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.core.search.service import SearchService
+from app.core.search.embeddings import HashingEmbedder, chunk_text, EMBEDDING_DIM
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "semantic.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+def test_chunk_text_partitions_exactly():
+    text = ("Paragraph one is here.\n\n" + "word " * 400 + "\n" + "tail") * 3
+    chunks = chunk_text(text, max_chars=300)
+    assert "".join(chunks) == text
+    assert all(0 < len(c) <= 300 for c in chunks)
+    assert chunk_text("") == []
+
+def test_embedder_is_deterministic_and_normalized():
+    a = HashingEmbedder().embed(["pump pressure alarm", "invoice payment terms"])
+    b = HashingEmbedder().embed(["pump pressure alarm", "invoice payment terms"])
+    assert a.shape == (2, EMBEDDING_DIM)
+    assert np.allclose(a, b)
+    assert np.allclose(np.linalg.norm(a, axis=1), 1.0, atol=1e-5)
+
+    q = HashingEmbedder().embed_query("pumps pressures")
+    # Char n-grams make morphological variants close
+    assert q @ a[0] > q @ a[1]
+
+def test_index_stores_float16_embeddings(db_path, tmp_path):
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo)
+    f = tmp_path / "notes.txt"
+    f.write_text("Line maintenance schedule for the packaging machine.", encoding="utf-8")
+
+    gen_before = repo.get_generation()
+    assert indexer.index_file(str(f)) == "indexed"
+    assert repo.get_generation() > gen_before
+
+    rows = list(repo.iter_chunk_embeddings())
+    assert len(rows) == 1
+    assert len(rows[0][2]) == EMBEDDING_DIM * 2 # float16
+
+    # Re-index replaces chunks instead of appending
+    indexer.index_file(str(f))
+    assert len(list(repo.iter_chunk_embeddings())) == 1
+
+def test_semantic_disabled_skips_chunks(db_path, tmp_path):
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo, {"semantic_enabled": False})
+    f = tmp_path / "plain.txt"
+    f.write_text("no vectors here", encoding="utf-8")
+    indexer.index_file(str(f))
+    assert list(repo.iter_chunk_embeddings()) == []
+
+def test_semantic_search_ranks_related_document(db_path, tmp_path):
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo)
+    docs = {
+        "maintenance.txt": "Preventive maintenance of the hydraulic press: check oil pressure and seals weekly.",
+        "finance.txt": "Quarterly invoice reconciliation and payment terms for suppliers.",
+        "hr.txt": "Holiday requests must be approved by the team lead two weeks in advance.",
+    }
+    for name, text in docs.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+        indexer.index_file(str(tmp_path / name))
+
+    service = SearchService(repo)
+    results = service.search("hydraulic presses oil", limit=2, mode="semantic")
+
+    assert len(results) == 2
+    assert Path(results[0].source_path).name == "maintenance.txt"
+    assert results[0].search_mode == "SEMANTIC"
+    assert results[0].score >= results[1].score
+    assert "hydraulic" in results[0].snippet
+
+def test_unknown_mode_rejected(db_path):
+    with pytest.raises(ValueError):
+        SearchService(ArtifactsRepo(db_path)).search("x", mode="bogus")
+
+def test_legacy_chunks_fk_rebuilt(tmp_path):
+    db = tmp_path / "legacy_chunks.db"
+    repo_root = Path(__file__).resolve().parents[1]
+    from app.db.migrator import init_or_upgrade_db
+    init_or_upgrade_db(db, repo_root / "db" / "migrations")
+
+    with sqlite3.connect(db) as conn:
+        fks = conn.execute("PRAGMA foreign_key_list(chunks)").fetchall()
+        assert [(fk[2], fk[3], fk[4]) for fk in fks] == [("artifacts", "artifact_id", "id")]
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name='idx_chunks_artifact_id'").fetchone()
@@ -0,0 +1,124 @@
+
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.core.search.standing import StandingQueryService
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "standing.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+def _add(repo, name, text, ext=".txt"):
+    path = f"/tmp/{name}"
+    aid = repo.upsert_artifact({"path": path, "filename": name, "ext": ext})
+    repo.save_extracted_text(aid, text, "Plain", len(text), name, path)
+    return aid
+
+def test_only_artifacts_indexed_after_saving_produce_hits(db_path):
+    repo = ArtifactsRepo(db_path)
+    service = StandingQueryService(repo)
+    _add(repo, "old.txt", "pump failure report")
+
+    qid = service.add("Pumps", "pump")
+    assert service.evaluate() == {}
+
+    new_id = _add(repo, "new.txt", "pump overhaul")
+    _add(repo, "other.txt", "motor overhaul")
+    assert service.evaluate() == {qid: 1}
+
+    [q] = service.list()
+    assert q.new_hits == 1
+    assert q.last_evaluated_generation == repo.get_generation()
+    assert [h["artifact_id"] for h in service.hits(qid)] == [new_id]
+
+def test_evaluation_is_incremental(db_path, monkeypatch):
+    repo = ArtifactsRepo(db_path)
+    service = StandingQueryService(repo)
+    qid = service.add("Pumps", "pump")
+    _add(repo, "a.txt", "pump one")
+    service.evaluate()
+
+    calls = []
+    original = repo.match_new_artifacts
+    def spy(query, filters, after, up_to):
+        calls.append((after, up_to))
+        return original(query, filters, after, up_to)
+    monkeypatch.setattr(repo, "match_new_artifacts", spy)
+
+    # Nothing indexed since: no matching at all
+    assert service.evaluate() == {}
+    assert calls == []
+
+    gen_before = repo.get_generation()
+    _add(repo, "b.txt", "pump two")
+    assert service.evaluate() == {qid: 1}
+    assert calls == [(gen_before, repo.get_generation())]
+
+def test_new_artifact_match_is_bounded_by_generation(db_path):
+    repo = ArtifactsRepo(db_path, pooled=True)
+    for i in range(20):
+        _add(repo, f"old_{i}.txt", f"pump log {i}")
+    after = repo.get_generation()
+    new_id = _add(repo, "new.txt", "pump overhaul")
+
+    statements = []
+    repo._get_conn().set_trace_callback(statements.append)
+    for filters in ({}, {"ext": ".txt"}):
+        assert repo.match_new_artifacts("pump", filters, after, repo.get_generation()) == [new_id]
+    repo._get_conn().set_trace_callback(None)
+
+    # FTS5 seeks to the generation's rowids (":=" constraint) instead of matching the whole corpus
+    for sql in [s for s in statements if "MATCH" in s]:
+        plan = " ".join(row[3] for row in repo._get_conn().execute(f"EXPLAIN QUERY PLAN {sql}"))
+        assert "VIRTUAL TABLE INDEX 0:=" in plan
+        assert "idx_artifacts_index_generation" in plan
+    repo.close()
+
+def test_seen_flags_reindex_and_filters(db_path):
+    repo = ArtifactsRepo(db_path)
+    service = StandingQueryService(repo)
+    pdf_q = service.add("PDF valves", "valve", {"ext": ".pdf"})
+    any_q = service.add("Valves", "valve")
+
+    aid = _add(repo, "v.pdf", "valve spec", ext=".pdf")
+    _add(repo, "v.txt", "valve notes")
+    assert service.evaluate() == {pdf_q: 1, any_q: 2}
+
+    service.mark_seen(any_q)
+    counts = {q.id: q.new_hits for q in service.list()}
+    assert counts == {pdf_q: 1, any_q: 0}
+
+    # Re-indexing an already reported artifact does not notify again
+    repo.save_extracted_text(aid, "valve spec rev B", "Plain", 16, "v.pdf", "/tmp/v.pdf")
+    service.evaluate()
+    assert {q.id: q.new_hits for q in service.list()} == {pdf_q: 1, any_q: 0}
+    assert service.hits(any_q, unseen_only=False)[0]["seen"] == 1
+
+    service.remove(pdf_q)
+    assert [q.id for q in service.list()] == [any_q]
+
+def test_invalid_queries_rejected(db_path):
+    service = StandingQueryService(ArtifactsRepo(db_path))
+    with pytest.raises(ValueError):
+        service.add("empty", "  ")
+    with pytest.raises(ValueError):
+        service.add("punctuation", "---")
+
+def test_index_all_evaluates_standing_queries(db_path, tmp_path):
+    repo = ArtifactsRepo(db_path)
+    service = StandingQueryService(repo)
+    qid = service.add("Turbines", "turbine")
+
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    (ingest / "t.txt").write_text("turbine blade inspection", encoding="utf-8")
+    (ingest / "m.txt").write_text("motor inspection", encoding="utf-8")
+
+    IndexingService(repo, {"semantic_enabled": False}).index_all(str(ingest))
+    [q] = service.list()
+    assert q.id == qid and q.new_hits == 1
@@ -0,0 +1,83 @@
+
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.search.service import SearchService
+from app.core.search.suggest import SuggestionIndex
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "suggest.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+def _add(repo, name, text):
+    path = f"/tmp/{name}"
+    aid = repo.upsert_artifact({"path": path, "filename": name, "ext": ".txt"})
+    repo.save_extracted_text(aid, text, "Plain", len(text), name, path)
+    return aid
+
+@pytest.fixture
+def repo(db_path):
+    repo = ArtifactsRepo(db_path)
+    _add(repo, "pressure_log.txt", "pressure pressure pump")
+    _add(repo, "report.txt", "pressure valve")
+    _add(repo, "notes.txt", "preset presentation pump")
+    return repo
+
+def test_fts_has_prefix_index_and_vocab(db_path, repo):
+    with sqlite3.connect(db_path) as conn:
+        ddl = conn.execute("SELECT sql FROM sqlite_master WHERE name='artifact_fts'").fetchone()[0]
+        assert "prefix='2 3'" in ddl
+        # ref_id is not tokenized: artifact ids do not leak into the vocabulary
+        terms = {r[0] for r in conn.execute("SELECT term FROM artifact_fts_vocab")}
+        assert "1" not in terms
+    # Prefix queries work through the index
+    assert len(repo.search_artifacts("pre*")) == 3
+
+def test_suggest_ranks_by_document_frequency(repo):
+    index = SuggestionIndex(repo)
+    terms = [s for s in index.suggest("pre") if s.kind == "term"]
+
+    assert terms[0].text == "pressure"
+    assert terms[0].doc_count == 2
+    assert {s.text for s in terms} >= {"pressure", "preset", "presentation"}
+
+def test_suggest_keeps_earlier_words_and_covers_filenames(repo):
+    service = SearchService(repo)
+    results = service.suggest("pump pres")
+    assert results[0].text == "pump pressure"
+
+    filenames = [s for s in service.suggest("pressure_") if s.kind == "filename"]
+    assert [s.text for s in filenames] == ["pressure_log.txt"]
+
+    assert service.suggest("pump ") == []
+    assert service.suggest("") == []
+
+def test_snapshot_refreshes_on_generation_change(repo):
+    index = SuggestionIndex(repo, min_refresh_seconds=0)
+    assert index.suggest("tur") == []
+
+    _add(repo, "turbine.txt", "turbine blades")
+    assert index.suggest("turb")[0].text == "turbine"
+
+def test_legacy_fts_table_is_rebuilt(tmp_path):
+    db = tmp_path / "legacy_fts.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+        conn.execute("DROP TABLE artifact_fts_vocab")
+        conn.execute("DROP TABLE artifact_fts")
+        conn.execute("CREATE VIRTUAL TABLE artifact_fts USING fts5(filename, path, text, ref_id)")
+        conn.execute("INSERT INTO artifacts (id, path, filename, ext) VALUES (7, '/tmp/old.txt', 'old.txt', '.txt')")
+        conn.execute("INSERT INTO artifact_fts (filename, path, text, ref_id) VALUES ('old.txt', '/tmp/old.txt', 'stale', 7)")
+        conn.execute("INSERT INTO artifact_fts (filename, path, text, ref_id) VALUES ('old.txt', '/tmp/old.txt', 'legacy words', 7)")
+
+    repo = ArtifactsRepo(str(db))
+    assert repo.fts_enabled
+    with sqlite3.connect(db) as conn:
+        rows = conn.execute("SELECT rowid, ref_id, text FROM artifact_fts").fetchall()
+    assert rows == [(7, 7, "legacy words")]
+    assert [r["id"] for r in repo.search_artifacts("legacy")] == [7]
@@ -0,0 +1,88 @@
+
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.search.service import SearchService
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "two_phase.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def repo(db_path):
+    repo = ArtifactsRepo(db_path)
+    for i in range(5):
+        path = f"/tmp/doc{i}.txt"
+        aid = repo.upsert_artifact({"path": path, "filename": f"doc{i}.txt", "ext": ".txt"})
+        text = _doc_text(i)
+        repo.save_extracted_text(aid, text, "Plain", len(text), f"doc{i}.txt", path)
+    return repo
+
+def _doc_text(i):
+    return "needle " * (i + 1) + "haystack"
+
+def _trace_sql(repo, monkeypatch):
+    statements = []
+    original = ArtifactsRepo._get_conn
+
+    def traced(self):
+        conn = original(self)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(ArtifactsRepo, "_get_conn", traced)
+    return statements
+
+def test_rank_phase_does_not_read_text(repo, monkeypatch):
+    assert repo.fts_enabled
+    statements = _trace_sql(repo, monkeypatch)
+
+    ranked = repo.rank_artifact_ids("needle", limit=3)
+
+    assert len(ranked) == 3
+    assert all(score is not None for _, score in ranked)
+    # Higher score is better
+    scores = [s for _, s in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert not any("artifact_text" in s for s in statements)
+
+def test_hydrate_preserves_order_and_uses_chars(repo):
+    ranked = repo.rank_artifact_ids("needle", limit=5)
+    reversed_ranked = list(reversed(ranked))
+
+    rows = repo.hydrate_artifacts(reversed_ranked, "needle")
+
+    assert [r["id"] for r in rows] == [aid for aid, _ in reversed_ranked]
+    for r in rows:
+        assert r["text_len"] == len(_doc_text(int(r["filename"][3])))
+        assert "**needle**" in r["snippet"]
+
+def test_pages_are_disjoint(repo):
+    service = SearchService(repo)
+    page1 = service.search("needle", limit=2, offset=0)
+    page2 = service.search("needle", limit=2, offset=2)
+
+    ids1 = {ev.artifact_id for ev in page1}
+    ids2 = {ev.artifact_id for ev in page2}
+    assert len(ids1) == 2 and len(ids2) == 2
+    assert not ids1 & ids2
+    assert all(ev.score is not None for ev in page1)
+
+def test_like_fallback_two_phase(db_path, monkeypatch):
+    def mock_init(self):
+        self._fts_enabled = False
+    monkeypatch.setattr(ArtifactsRepo, '_check_and_init_fts', mock_init)
+
+    repo = ArtifactsRepo(db_path)
+    aid = repo.upsert_artifact({"path": "/tmp/like.txt", "filename": "like.txt", "ext": ".txt"})
+    repo.save_extracted_text(aid, "like fallback text", "Plain", 18, "like.txt", "/tmp/like.txt")
+
+    rows = repo.search_artifacts("fallback", filters={"ext": ".txt"})
+    assert len(rows) == 1
+    assert rows[0]["text_len"] == 18
+    assert rows[0]["score"] is None
+    assert rows[0]["snippet"].startswith("like fallback")
@@ -0,0 +1,109 @@
+
+import os
+import pytest
+import sqlite3
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "inbox.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def workspace(db_path, tmp_path):
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    for i in range(120):
+        ext = ".txt" if i % 2 else ".md"
+        (ingest / f"file_{i:03d}{ext}").write_text(f"document number {i}", encoding="utf-8")
+    (ingest / "Report_100%_final.txt").write_text("report", encoding="utf-8")
+    repo = ArtifactsRepo(db_path)
+    indexer = IndexingService(repo, {"semantic_enabled": False})
+    return repo, indexer, str(ingest)
+
+def test_snapshot_pages_and_filters(workspace):
+    repo, indexer, ingest = workspace
+    assert indexer.snapshot_workspace(ingest) == 121
+
+    rows, total = repo.workspace_page(ingest, limit=50, offset=0)
+    assert total == 121 and len(rows) == 50
+    assert rows[0]["filename"] == "file_000.md"
+    assert {r["status"] for r in rows} == {"NEW"}
+
+    last, _ = repo.workspace_page(ingest, limit=50, offset=100)
+    assert len(last) == 21
+
+    md, total_md = repo.workspace_page(ingest, ext=".md", limit=10)
+    assert total_md == 60 and all(r["ext"] == ".md" for r in md)
+
+    found, n = repo.workspace_page(ingest, search="100%")
+    assert n == 1 and found[0]["filename"] == "Report_100%_final.txt"
+    _, n = repo.workspace_page(ingest, search="FILE_01")
+    assert n == 10
+
+    with pytest.raises(ValueError):
+        repo.workspace_page(ingest, sort="filename; DROP TABLE artifacts")
+
+def test_status_tracks_index_without_rescan(workspace):
+    repo, indexer, ingest = workspace
+    indexer.snapshot_workspace(ingest)
+    target = os.path.join(ingest, "file_001.txt")
+    indexer.index_file(target)
+
+    assert repo.get_workspace_file(target)["status"] == "INDEXED"
+    counts = repo.workspace_counts(ingest)
+    assert counts["status"] == {"NEW": 120, "INDEXED": 1}
+    assert counts["ext"] == {".md": 60, ".txt": 61}
+
+    indexed, n = repo.workspace_page(ingest, status="INDEXED")
+    assert n == 1 and indexed[0]["path"] == target
+
+    # Modified on disk: DIRTY once the folder is re-read
+    with open(target, "a", encoding="utf-8") as f:
+        f.write(" changed")
+    indexer.snapshot_workspace(ingest)
+    assert repo.get_workspace_file(target)["status"] == "DIRTY"
+    assert len(repo.workspace_paths(ingest, ["NEW", "DIRTY"])) == 121
+
+def test_snapshot_drops_deleted_files(workspace):
+    repo, indexer, ingest = workspace
+    indexer.snapshot_workspace(ingest)
+    os.remove(os.path.join(ingest, "file_000.md"))
+    assert indexer.snapshot_workspace(ingest) == 120
+    assert repo.get_workspace_file(os.path.join(ingest, "file_000.md")) is None
+
+def test_versions_track_per_path_changes(workspace):
+    repo, indexer, ingest = workspace
+    indexer.snapshot_workspace(ingest)
+    target = os.path.join(ingest, "file_001.txt")
+    other = os.path.join(ingest, "file_002.md")
+    assert repo.get_workspace_file(target)["version"] == 0
+
+    # Unchanged rescan keeps every version
+    indexer.snapshot_workspace(ingest)
+    indexer.snapshot_workspace(ingest)
+    assert repo.get_workspace_file(target)["version"] == 0
+
+    # Editing + indexing one file updates its row only, with no folder rescan
+    with open(target, "a", encoding="utf-8") as f:
+        f.write(" and more")
+    generation = repo.get_generation()
+    assert indexer.index_file(target) == "indexed"
+    assert repo.get_generation() > generation
+    row = repo.get_workspace_file(target)
+    assert row["version"] == 1 and row["status"] == "INDEXED"
+    assert row["size_bytes"] == os.path.getsize(target)
+    assert repo.get_workspace_file(other)["version"] == 0
+
+def test_status_change_bumps_generation(workspace):
+    repo, indexer, ingest = workspace
+    path = os.path.join(ingest, "blob.bin")
+    with open(path, "wb") as f:
+        f.write(b"\x00\x01")
+    generation = repo.get_generation()
+    assert indexer.index_file(path) == "not_extractable"
+    assert repo.get_generation() > generation
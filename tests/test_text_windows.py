@@ -0,0 +1,67 @@
+
+import os
+import pytest
+from app.services import sources_service, text_windows
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # Tiny blocks so every test crosses many index checkpoints
+    monkeypatch.setattr(text_windows, "INDEX_BLOCK", 256)
+    text_windows._build_line_index.cache_clear()
+    yield
+    text_windows._build_line_index.cache_clear()
+
+@pytest.fixture
+def log_file(tmp_path):
+    lines = [f"{i:06d} zażółć pump {'x' * (i % 37)}" for i in range(5000)]
+    path = tmp_path / "big.log"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path), lines
+
+def test_line_windows_match_file(log_file):
+    path, lines = log_file
+    for start in (0, 1, 255, 1234, 4990):
+        window = text_windows.read_lines(path, start, 20)
+        expected = lines[start:start + 20]
+        assert window.text.splitlines() == expected
+        assert window.start_line == start and window.line_count == len(expected)
+        assert window.total_lines == 5000 and not window.truncated
+
+    # Past the end: clamped to the last line
+    last = sources_service.preview_lines(path, 10_000)
+    assert last.text == lines[-1] + "\n" and last.start_line == 4999
+
+def test_index_is_built_once_and_rebuilt_on_change(log_file):
+    path, _ = log_file
+    text_windows.read_lines(path, 4000, 10)
+    text_windows.read_lines(path, 10, 10)
+    assert sources_service.line_count(path) == 5000
+    assert text_windows._build_line_index.cache_info().misses == 1
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("tail without newline")
+    assert text_windows.read_lines(path, 5000, 5).text == "tail without newline"
+    assert text_windows.line_index(path).total_lines == 5001
+
+def test_byte_window_aligns_to_characters(log_file):
+    path, lines = log_file
+    raw = open(path, "rb").read()
+    offset = raw.index("ż".encode("utf-8"), 3000) + 1 # Inside a 2-byte character
+    window = text_windows.read_bytes(path, offset, 100)
+    assert window.start_offset == offset + 1
+    assert window.text == raw[offset + 1:window.end_offset].decode("utf-8")
+    assert window.start_line == raw[:offset].count(b"\n")
+
+def test_long_line_is_capped(tmp_path):
+    path = tmp_path / "one_line.json"
+    path.write_text('{"data": "' + "a" * 5000 + '"}', encoding="utf-8")
+    window = text_windows.read_lines(str(path), 0, 10, max_bytes=1000)
+    assert window.truncated and len(window.text) == 1000
+    assert window.line_count == 1
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("", encoding="utf-8")
+    window = text_windows.read_lines(str(path), 0, 10)
+    assert window.text == "" and window.total_lines == 0
+    assert text_windows.read_bytes(str(path), 0, 10).text == ""
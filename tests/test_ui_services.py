@@ -0,0 +1,156 @@
+
+import pytest
+import sqlite3
+from unittest.mock import patch
+from streamlit.testing.v1 import AppTest
+from app.core.external_tools import ExternalTools
+from app.core.artifacts_repo import ArtifactsRepo
+from app.core.indexing_service import IndexingService
+from app.ui.services import get_services, invalidate_services
+
+PAGE_SCRIPT = """
+from app.ui.pages import {page}
+
+class _State:
+    config = {{"db_path": {db_path!r}, "data": {{"paths": {{"ingest_dir": {ingest!r}}},
+               "features": {{"search_enabled": True, "semantic_enabled": False}}}}}}
+
+    @property
+    def services(self):
+        from app.ui.services import get_services
+        return get_services(self.config)
+
+{page}.render(_State())
+"""
+
+@pytest.fixture
+def db_path(tmp_path):
+    db = tmp_path / "ui.db"
+    from app.db.migrator import ensure_schema
+    with sqlite3.connect(db) as conn:
+        ensure_schema(conn)
+    return str(db)
+
+@pytest.fixture
+def page_app(db_path, tmp_path):
+    ingest = tmp_path / "ingest"
+    ingest.mkdir()
+    (ingest / "notes.txt").write_text("pump notes", encoding="utf-8")
+
+    def make(page):
+        script = tmp_path / f"{page}_page.py"
+        script.write_text(PAGE_SCRIPT.format(page=page, db_path=db_path, ingest=str(ingest)), encoding="utf-8")
+        return AppTest.from_file(str(script), default_timeout=30)
+
+    invalidate_services()
+    yield make
+    invalidate_services()
+
+@pytest.mark.parametrize("page", ["search", "sources", "open_loops"])
+def test_rerun_constructs_no_services(page_app, page):
+    at = page_app(page)
+    repo_init = ArtifactsRepo.__init__
+    counts = {"repo": 0, "binaries": 0}
+
+    def counting_init(self, *args, **kwargs):
+        counts["repo"] += 1
+        repo_init(self, *args, **kwargs)
+
+    check = ExternalTools.check_binaries
+    def counting_check(*args, **kwargs):
+        counts["binaries"] += 1
+        return check(*args, **kwargs)
+
+    with patch.object(ArtifactsRepo, "__init__", counting_init), \
+         patch.object(ExternalTools, "check_binaries", staticmethod(counting_check)):
+        at.run()
+        assert not at.exception
+        assert counts == {"repo": 1, "binaries": 1}
+
+        at.run()
+        at.run()
+        assert not at.exception
+        assert counts == {"repo": 1, "binaries": 1}
+
+def test_config_change_builds_new_container(db_path):
+    invalidate_services()
+    config = {"db_path": db_path, "data": {"features": {"semantic_enabled": False}}}
+    first = get_services(config)
+    assert get_services(config) is first
+
+    changed = {"db_path": db_path, "data": {"features": {"semantic_enabled": True}}}
+    assert get_services(changed) is not first
+
+    invalidate_services()
+    assert get_services(config) is not first
+    assert get_services({"db_path": db_path, "db_init_error": "boom"}) is None
+    invalidate_services()
+
+def test_hasher_shared_across_rebuilds(db_path):
+    invalidate_services()
+    config = {"db_path": db_path, "data": {"features": {"semantic_enabled": False}}}
+    hasher = get_services(config).hasher
+
+    # Feature change and "Reload configuration": new containers, same pool and backfill
+    assert get_services({"db_path": db_path, "data": {"features": {"semantic_enabled": True}}}).hasher is hasher
+    invalidate_services()
+    assert get_services(config).hasher is hasher
+    assert not hasher._pool._shutdown
+    invalidate_services()
+
+def test_search_preview_never_renders_document_markdown(page_app, db_path, tmp_path):
+    (tmp_path / "ingest" / "notes.txt").write_text("pump notes\n\n# Heading\n\n*emph* and `code`\n", encoding="utf-8")
+    IndexingService(ArtifactsRepo(db_path), {"semantic_enabled": False}).index_all(str(tmp_path / "ingest"))
+
+    at = page_app("search")
+    at.run()
+    at.text_input(key="search_query").input("pump").run()
+    at.button(key=next(b.key for b in at.button if b.key and b.key.startswith("prev_"))).click().run()
+    assert not at.exception
+
+    # Blank lines in the text must not end the HTML block and hand the rest to the Markdown parser
+    previews = [el.proto.body for el in at.get("html")]
+    assert len(previews) == 1
+    assert "<mark>pump</mark> notes\n\n# Heading\n\n*emph* and `code`" in previews[0]
+
+def test_filename_suggestions_show_the_whole_name(page_app, db_path, tmp_path):
+    (tmp_path / "ingest" / "pump inspection report.txt").write_text("seal check", encoding="utf-8")
+    IndexingService(ArtifactsRepo(db_path), {"semantic_enabled": False}).index_all(str(tmp_path / "ingest"))
+
+    at = page_app("search")
+    at.run()
+    at.text_input(key="search_query").input("seal pu").run()
+    assert not at.exception
+    labels = {b.key: b.label for b in at.button if b.key and b.key.startswith("sug_")}
+    assert labels["sug_filename_seal pump inspection report.txt"] == "📄 pump inspection report.txt"
+    assert labels["sug_term_seal pump"] == "pump"
+
+def test_sources_selection_and_paging_rerun_one_panel(page_app, tmp_path):
+    from app.ui.pages.sources import PAGE_SIZE
+    for i in range(PAGE_SIZE + 5):
+        (tmp_path / "ingest" / f"file_{i:03d}.txt").write_text(f"pump {i}", encoding="utf-8")
+    at = page_app("sources")
+    at.run()
+    assert not at.exception
+
+    calls = []
+    page_query, detail_query = ArtifactsRepo.workspace_page, ArtifactsRepo.get_workspace_file
+    def counting_page(self, *args, **kwargs):
+        calls.append("list")
+        return page_query(self, *args, **kwargs)
+    def counting_detail(self, *args, **kwargs):
+        calls.append("detail")
+        return detail_query(self, *args, **kwargs)
+
+    with patch.object(ArtifactsRepo, "workspace_page", counting_page), \
+         patch.object(ArtifactsRepo, "get_workspace_file", counting_detail):
+        # Paging: only the inbox reruns, not the detail panel next to it
+        next(b for b in at.button if b.label == "Next ▶").click().run()
+        assert not at.exception and calls == ["list"]
+
+        # View: only the detail panel reruns, the inbox page is not queried again
+        calls.clear()
+        next(b for b in at.button if b.key and b.key.startswith("view_")).click().run()
+        assert not at.exception and calls == ["detail"]
+        assert at.session_state["selected_artifact_path"].endswith(f"file_{PAGE_SIZE:03d}.txt")
+        assert f"### file_{PAGE_SIZE:03d}.txt" in [m.value for m in at.markdown]